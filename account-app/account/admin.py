@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Account, Transaction, TransactionPreset, Budget
+from .models import Account, Transaction, TransactionPreset, Budget, MonthlyAccountBalance, InstallmentPlan, PresetPosting
 
 # Account 모델을 관리자 페이지에서 볼 수 있도록 등록합니다.
 @admin.register(Account)
@@ -24,4 +24,20 @@ class TransactionPresetAdmin(admin.ModelAdmin):
 @admin.register(Budget)
 class BudgetAdmin(admin.ModelAdmin):
     list_display = ('owner', 'year', 'month', 'account', 'amount')
-    list_filter = ('owner', 'year', 'month')
\ No newline at end of file
+    list_filter = ('owner', 'year', 'month')
+
+@admin.register(MonthlyAccountBalance)
+class MonthlyAccountBalanceAdmin(admin.ModelAdmin):
+    list_display = ('owner', 'year', 'month', 'account', 'debit_total', 'credit_total', 'closing_balance')
+    list_filter = ('owner', 'year', 'month')
+
+@admin.register(InstallmentPlan)
+class InstallmentPlanAdmin(admin.ModelAdmin):
+    list_display = ('owner', 'item', 'total_amount', 'months', 'start_date')
+    list_filter = ('owner',)
+    search_fields = ('item',)
+
+@admin.register(PresetPosting)
+class PresetPostingAdmin(admin.ModelAdmin):
+    list_display = ('preset', 'year', 'month', 'posted_at')
+    list_filter = ('year', 'month')
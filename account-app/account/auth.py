@@ -0,0 +1,39 @@
+# account/auth.py
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+
+def _user_cache():
+    return caches[getattr(settings, 'AUTH_USER_CACHE_ALIAS', 'default')]
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def forget_user(user_id):
+    """캐시된 사용자를 지운다. User 저장/삭제 신호에서 호출한다 (signals.py)."""
+    _user_cache().delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """요청마다 AuthenticationMiddleware 가 실행하는 auth_user 조회를 캐시로 대신한다.
+
+    AUTH_USER_CACHE_TIMEOUT 이 0 이면 ModelBackend 와 같다. 사용자가 저장/삭제되면 캐시를 지우지만,
+    워커마다 따로인 locmem 캐시에서는 다른 워커가 타임아웃까지 이전 사용자(비밀번호 해시, is_active)를 볼 수 있다.
+    """
+
+    def get_user(self, user_id):
+        timeout = getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 0)
+        if not timeout:
+            return super().get_user(user_id)
+        key = user_cache_key(user_id)
+        cache = _user_cache()
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, timeout)
+        return user
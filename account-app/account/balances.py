@@ -0,0 +1,107 @@
+# account/balances.py
+
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+from .ledger import in_period_range
+from .models import MonthlyAccountBalance, Transaction
+
+
+def _from_period(year, month):
+    return Q(year__gt=year) | Q(year=year, month__gte=month)
+
+
+def _ensure_row(owner_id, account_id, year, month):
+    """해당 월 스냅샷 행이 없으면 직전 월의 월말 잔액을 이월해 만든다."""
+    if MonthlyAccountBalance.objects.filter(account_id=account_id, year=year, month=month).exists():
+        return
+    previous = MonthlyAccountBalance.objects.filter(
+        account_id=account_id
+    ).filter(
+        Q(year__lt=year) | Q(year=year, month__lt=month)
+    ).order_by('-year', '-month').values_list('closing_balance', flat=True).first()
+    # 동시에 같은 달 첫 거래가 들어오면 먼저 만든 행을 그대로 사용
+    MonthlyAccountBalance.objects.get_or_create(
+        account_id=account_id, year=year, month=month,
+        defaults={'owner_id': owner_id, 'closing_balance': previous or Decimal(0)},
+    )
+
+
+def apply_transactions(entries):
+    """(거래, 부호) 목록을 월별 스냅샷에 증분 반영한다. 부호가 -1 이면 거래를 되돌린다."""
+    deltas = defaultdict(lambda: [Decimal(0), Decimal(0)])
+    additions = set()
+    for tx, sign in entries:
+        amount = Decimal(tx.amount) * sign
+        debit_key = (tx.owner_id, tx.debit_account_id, tx.date.year, tx.date.month)
+        credit_key = (tx.owner_id, tx.credit_account_id, tx.date.year, tx.date.month)
+        deltas[debit_key][0] += amount
+        deltas[credit_key][1] += amount
+        if sign > 0:
+            additions.update([debit_key, credit_key])
+
+    with transaction.atomic():
+        for key, (debit, credit) in sorted(deltas.items()):
+            owner_id, account_id, year, month = key
+            if not debit and not credit:
+                continue
+            # 되돌리기만 하는 경우 행을 새로 만들지 않는다 (계정/사용자 연쇄 삭제 중일 수 있음)
+            if key in additions:
+                _ensure_row(owner_id, account_id, year, month)
+            MonthlyAccountBalance.objects.filter(account_id=account_id, year=year, month=month).update(
+                debit_total=F('debit_total') + debit,
+                credit_total=F('credit_total') + credit,
+            )
+            MonthlyAccountBalance.objects.filter(account_id=account_id).filter(_from_period(year, month)).update(
+                closing_balance=F('closing_balance') + (debit - credit)
+            )
+
+
+def rebuild_monthly_balances(owner):
+    """사용자의 스냅샷을 원장 전체에서 다시 계산한다. bulk_create 등 신호가 발생하지 않는 작업 후에 호출한다."""
+    owner_id = getattr(owner, 'pk', owner)
+    totals = defaultdict(lambda: [Decimal(0), Decimal(0)])
+    ledger = Transaction.objects.filter(owner_id=owner_id).annotate(year=ExtractYear('date'), month=ExtractMonth('date'))
+    for row in ledger.values('debit_account_id', 'year', 'month').annotate(total=Sum('amount')).order_by():
+        totals[(row['debit_account_id'], row['year'], row['month'])][0] += row['total']
+    for row in ledger.values('credit_account_id', 'year', 'month').annotate(total=Sum('amount')).order_by():
+        totals[(row['credit_account_id'], row['year'], row['month'])][1] += row['total']
+
+    rows = []
+    closing = defaultdict(Decimal)
+    for (account_id, year, month), (debit, credit) in sorted(totals.items()):
+        closing[account_id] += debit - credit
+        rows.append(MonthlyAccountBalance(
+            owner_id=owner_id, account_id=account_id, year=year, month=month,
+            debit_total=debit, credit_total=credit, closing_balance=closing[account_id],
+        ))
+
+    with transaction.atomic():
+        MonthlyAccountBalance.objects.filter(owner_id=owner_id).delete()
+        MonthlyAccountBalance.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def latest_closing_balances(owner):
+    """계정별 가장 최근 스냅샷의 월말 잔액 (미래 거래 포함 최종 잔액)."""
+    balances = {}
+    rows = MonthlyAccountBalance.objects.filter(owner=owner).order_by('account_id', '-year', '-month')
+    for account_id, closing in rows.values_list('account_id', 'closing_balance'):
+        balances.setdefault(account_id, closing)
+    return balances
+
+
+def monthly_spending(owner, start, end):
+    """start~end 월의 비용 계정별 월 지출 {(account_id, year, month): 차변 합계}.
+
+    거래 원장 대신 스냅샷의 debit_total 을 (owner, year, month) 인덱스 범위 조회 한 번으로 읽는다.
+    거래가 없는 달은 행이 없으므로 0 으로 본다.
+    """
+    rows = MonthlyAccountBalance.objects.filter(owner=owner, account__type='비용').filter(in_period_range(start, end))
+    return {
+        (account_id, year, month): debit_total
+        for account_id, year, month, debit_total in rows.values_list('account_id', 'year', 'month', 'debit_total')
+    }
+
@@ -0,0 +1,89 @@
+# account/budgets.py
+
+from decimal import Decimal, InvalidOperation
+from dateutil.relativedelta import relativedelta
+from django.db import connection, transaction
+from .models import Account, Budget
+from .cache import bump_ledger_version
+from .ledger import in_period_range
+from .signals import signals_suspended
+
+MAX_COPY_MONTHS = 60
+MAX_BUDGET_AMOUNT = Decimal('1e12')  # Budget.amount: max_digits=12
+
+
+def parse_budget_amount(value):
+    """예산 입력값. 비어 있으면 None (예산 삭제). 음수/소수/범위 밖이면 ValueError."""
+    if value is None or str(value).strip() == '':
+        return None
+    try:
+        amount = Decimal(str(value).replace(',', '').strip())
+    except InvalidOperation:
+        raise ValueError(value)
+    if not amount.is_finite() or amount < 0 or amount != amount.to_integral_value() or amount >= MAX_BUDGET_AMOUNT:
+        raise ValueError(value)
+    return amount
+
+
+def save_month_budgets(owner, year, month, amounts):
+    """한 달치 {비용 계정 id: 금액} 을 한 번의 upsert 로 저장한다. 금액이 None 인 계정은 예산을 지운다.
+
+    사용자의 비용 계정이 아닌 id 가 있으면 아무것도 저장하지 않고 ValueError. 저장/삭제한 계정 수를 반환한다.
+    """
+    expense_ids = set(Account.objects.filter(owner=owner, type='비용', pk__in=amounts).values_list('pk', flat=True))
+    unknown = set(amounts) - expense_ids
+    if unknown:
+        raise ValueError(sorted(unknown))
+
+    upserts = [
+        Budget(owner=owner, account_id=account_id, year=year, month=month, amount=amount)
+        for account_id, amount in amounts.items() if amount is not None
+    ]
+    cleared = [account_id for account_id, amount in amounts.items() if amount is None]
+    with transaction.atomic():
+        if upserts:
+            Budget.objects.bulk_create(
+                upserts, update_conflicts=True,
+                unique_fields=['owner', 'year', 'month', 'account'], update_fields=['amount'],
+            )
+        if cleared:
+            with signals_suspended():
+                Budget.objects.filter(owner=owner, year=year, month=month, account_id__in=cleared).delete()
+        # bulk_create 는 신호를 발생시키지 않으므로 리포트 캐시를 직접 무효화
+        bump_ledger_version(owner)
+    return len(amounts)
+
+
+def copy_budgets(owner, source, first, months=1):
+    """source 월의 예산을 first 월부터 months 개월에 복사한다. 대상 월의 기존 예산은 모두 대체된다.
+
+    대상 월 삭제 한 번 + INSERT ... SELECT 한 번으로 처리한다. 복사한 행 수를 반환한다 (원본이 없으면 0, 대상은 그대로).
+    """
+    if not 1 <= months <= MAX_COPY_MONTHS:
+        raise ValueError(months)
+    targets = [first + relativedelta(months=i) for i in range(months)]
+    if (source.year, source.month) in {(t.year, t.month) for t in targets}:
+        raise ValueError(source)
+
+    qn = connection.ops.quote_name
+    table = qn(Budget._meta.db_table)
+    # 대상 (연, 월) 목록을 파생 테이블로 만들어 원본 예산과 곱한다 (SQLite/PostgreSQL 공통 문법)
+    periods = ' UNION ALL '.join(['SELECT CAST(%s AS INTEGER) AS target_year, CAST(%s AS INTEGER) AS target_month'] * len(targets))
+    sql = (
+        f"INSERT INTO {table} ({qn('owner_id')}, {qn('account_id')}, {qn('year')}, {qn('month')}, {qn('amount')}) "
+        f"SELECT b.{qn('owner_id')}, b.{qn('account_id')}, p.target_year, p.target_month, b.{qn('amount')} "
+        f"FROM {table} b CROSS JOIN ({periods}) p "
+        f"WHERE b.{qn('owner_id')} = %s AND b.{qn('year')} = %s AND b.{qn('month')} = %s"
+    )
+    params = [value for t in targets for value in (t.year, t.month)] + [getattr(owner, 'pk', owner), source.year, source.month]
+
+    with transaction.atomic():
+        if not Budget.objects.filter(owner=owner, year=source.year, month=source.month).exists():
+            return 0
+        with signals_suspended():
+            Budget.objects.filter(in_period_range(targets[0], targets[-1]), owner=owner).delete()
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            copied = cursor.rowcount
+        bump_ledger_version(owner)
+    return copied
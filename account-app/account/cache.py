@@ -0,0 +1,66 @@
+# account/cache.py
+
+import hashlib
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from django.utils import timezone
+from .models import LedgerVersion
+
+
+def report_cache():
+    """리포트와 계정 목록을 담는 캐시 (REPORT_CACHE_ALIAS, 기본 default)."""
+    return caches[getattr(settings, 'REPORT_CACHE_ALIAS', 'default')]
+
+
+def ledger_version(user):
+    """사용자 원장의 현재 버전. 아직 변경 이력이 없으면 0."""
+    return LedgerVersion.objects.filter(owner_id=user.pk).values_list('version', flat=True).first() or 0
+
+
+def bump_ledger_version(owner, accounts=False):
+    """거래/계정/예산이 바뀌었음을 기록한다. 신호가 발생하지 않는 대량 작업 후에는 직접 호출해야 한다.
+
+    계정이 바뀌었으면 accounts=True 로 계정 목록 캐시(account_directory)도 무효화한다.
+    """
+    owner_id = getattr(owner, 'pk', owner)
+    changes = {'version': F('version') + 1, 'updated_at': timezone.now()}
+    if accounts:
+        changes['accounts_version'] = F('accounts_version') + 1
+    updated = LedgerVersion.objects.filter(owner_id=owner_id).update(**changes)
+    if not updated:
+        LedgerVersion.objects.get_or_create(owner_id=owner_id, defaults={'version': 1, 'accounts_version': int(accounts)})
+
+
+def _report_key(user, view_name, params, version=None):
+    digest = hashlib.md5(repr(sorted(params.items())).encode()).hexdigest()
+    if version is None:
+        version = ledger_version(user)
+    return f'report:{user.pk}:{view_name}:{version}:{digest}'
+
+
+def cached_report(user, view_name, params, compute, version=None):
+    """(사용자, 화면, 파라미터, 원장 버전) 단위로 리포트 context 를 캐시한다.
+
+    원장 버전이 바뀌면 키가 달라지므로 별도의 삭제 없이 이전 결과가 무효화된다.
+    같은 요청에서 이미 읽은 버전(conditional_report 의 request.ledger_version)이 있으면 version 으로 넘긴다.
+    """
+    key = _report_key(user, view_name, params, version)
+    cache = report_cache()
+    context = cache.get(key)
+    if context is None:
+        context = compute()
+        cache.set(key, context, getattr(settings, 'REPORT_CACHE_TIMEOUT', 60 * 60))
+    return context
+
+
+async def acached_report(user, view_name, params, compute, version=None):
+    """async 뷰용 cached_report. compute 는 context 를 돌려주는 코루틴 함수이다."""
+    key = await sync_to_async(_report_key)(user, view_name, params, version)
+    cache = report_cache()
+    context = await cache.aget(key)
+    if context is None:
+        context = await compute()
+        await cache.aset(key, context, getattr(settings, 'REPORT_CACHE_TIMEOUT', 60 * 60))
+    return context
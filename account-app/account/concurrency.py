@@ -0,0 +1,45 @@
+# account/concurrency.py
+
+import asyncio
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.db import close_old_connections
+
+
+def async_login_required(view):
+    """async 뷰용 login_required. (Django 5.0 의 login_required 는 async 뷰를 감싸지 못한다)"""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        # request.user 를 여기서 한 번 불러 두면 뷰와 템플릿(auth context processor)이 같은 객체를 쓴다
+        is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+        if not is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def _in_own_connection(func):
+    # 요청 스레드 밖에서 실행되므로 요청 시작/종료 때처럼 오래된 연결을 직접 정리한다
+    @wraps(func)
+    def wrapper():
+        close_old_connections()
+        try:
+            return func()
+        finally:
+            close_old_connections()
+    return wrapper
+
+
+async def gather_queries(*funcs):
+    """서로 독립적인 동기 집계 함수들을 실행해 결과 목록을 돌려준다.
+
+    REPORT_PARALLEL_QUERIES 가 켜져 있으면 각 함수를 별도 스레드(별도 DB 연결)에서 동시에 실행하고,
+    꺼져 있으면 요청 스레드에서 차례로 실행한다 (테스트의 트랜잭션 안에서도 같은 데이터를 보도록).
+    """
+    if not getattr(settings, 'REPORT_PARALLEL_QUERIES', False):
+        return [await sync_to_async(func)() for func in funcs]
+    return await asyncio.gather(*(
+        sync_to_async(_in_own_connection(func), thread_sensitive=False)() for func in funcs
+    ))
@@ -0,0 +1,74 @@
+# account/conditional.py
+
+import hashlib
+from datetime import date, datetime, time
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib import messages
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from .models import LedgerVersion
+
+
+def ledger_marker(user):
+    """사용자 원장의 (버전, 마지막 변경 시각). 거래/계정/예산이 바뀔 때마다 함께 갱신된다. 변경 이력이 없으면 (0, None)."""
+    return LedgerVersion.objects.filter(owner_id=user.pk).values_list('version', 'updated_at').first() or (0, None)
+
+
+def report_validators(request, view_name, version, updated_at):
+    """(강한 ETag, Last-Modified 타임스탬프).
+
+    ETag 는 화면, 사용자, 원장 버전, 오늘 날짜(기본 기간), 쿼리 파라미터, CSRF 토큰(페이지의 폼에 들어간다)으로 만든다.
+    Last-Modified 는 원장 마지막 변경 시각과 오늘 0시 중 늦은 쪽이다.
+    """
+    today = date.today()
+    parts = (
+        view_name, request.user.pk, request.user.get_username(), version, today.isoformat(),
+        sorted(request.GET.lists()), request.META.get('CSRF_COOKIE', ''),
+    )
+    etag = '"%s"' % hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+    last_modified = datetime.combine(today, time.min).timestamp()
+    if updated_at is not None:
+        last_modified = max(last_modified, updated_at.timestamp())
+    return etag, int(last_modified)
+
+
+def conditional_report(view_name):
+    """읽기 전용 리포트 화면의 조건부 GET. 원장이 그대로면 집계 전에 304 를 돌려준다 (세션/사용자/원장 버전 쿼리만 실행).
+
+    login_required 안쪽에 둔다. 조회한 원장 버전은 request.ledger_version 에 남겨 cached_report 가 다시 읽지 않게 한다.
+    브라우저가 매번 다시 확인하도록 Cache-Control: private, no-cache 를 붙인다.
+    보여줄 메시지(messages)가 남아 있으면 검증값 없이 화면을 새로 그린다 (POST 후 리다이렉트가 304 로 메시지를 잃지 않도록).
+    """
+    def decorator(view):
+        def check(request):
+            if request.method not in ('GET', 'HEAD') or len(messages.get_messages(request)):
+                return None, None, None
+            version, updated_at = ledger_marker(request.user)
+            request.ledger_version = version
+            etag, last_modified = report_validators(request, view_name, version, updated_at)
+            return get_conditional_response(request, etag=etag, last_modified=last_modified), etag, last_modified
+
+        def finish(response, etag, last_modified):
+            if etag and response.status_code in (200, 304):
+                response.headers.setdefault('ETag', etag)
+                response.headers.setdefault('Last-Modified', http_date(last_modified))
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                response, etag, last_modified = await sync_to_async(check)(request)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return finish(response, etag, last_modified)
+        else:
+            @wraps(view)
+            def wrapper(request, *args, **kwargs):
+                response, etag, last_modified = check(request)
+                if response is None:
+                    response = view(request, *args, **kwargs)
+                return finish(response, etag, last_modified)
+        return wrapper
+    return decorator
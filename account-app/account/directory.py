@@ -0,0 +1,56 @@
+# account/directory.py
+
+from django.conf import settings
+from .cache import report_cache
+from .models import Account, LedgerVersion
+
+# 차변/대변 선택 목록에서 빼는 계정 타입 (수익은 차변, 비용은 대변에 오지 않는다)
+DEBIT_EXCLUDED_TYPE = '수익'
+CREDIT_EXCLUDED_TYPE = '비용'
+
+
+class AccountDirectory:
+    """사용자 계정 목록을 이름순으로 담고 id/이름/타입/유형별로 찾아 주는 구조. 캐시에 통째로 저장된다."""
+
+    def __init__(self, accounts):
+        self.accounts = accounts
+        self.by_id = {account.pk: account for account in accounts}
+        self.by_name = {account.name: account for account in accounts}
+        self.by_type = {}
+        self.by_category = {}
+        for account in accounts:
+            self.by_type.setdefault(account.type, []).append(account)
+            self.by_category.setdefault((account.type, account.category), []).append(account)
+        # 거래 입력 화면의 <optgroup> 용 {타입: [계정, ...]}
+        self.debit_accounts = self._grouped(exclude=DEBIT_EXCLUDED_TYPE)
+        self.credit_accounts = self._grouped(exclude=CREDIT_EXCLUDED_TYPE)
+
+    def _grouped(self, exclude):
+        grouped = {}
+        for account in self.accounts:
+            if account.type != exclude:
+                grouped.setdefault(account.type, []).append(account)
+        return grouped
+
+    def get(self, pk):
+        """id 로 계정을 찾는다. 문자열 id 도 받으며 없으면 None."""
+        try:
+            return self.by_id.get(int(pk))
+        except (TypeError, ValueError):
+            return None
+
+
+def account_directory(user):
+    """사용자의 계정 디렉터리. (사용자, 계정 버전) 단위로 캐시하므로 요청마다 버전 조회 한 번만 실행한다.
+
+    계정 버전은 Account 저장/삭제 신호(또는 대량 작업 후 bump_ledger_version(accounts=True))로 올라가며,
+    DB 에 있으므로 locmem 캐시를 여러 워커에서 써도 오래된 목록을 보여주지 않는다.
+    """
+    version = LedgerVersion.objects.filter(owner_id=user.pk).values_list('accounts_version', flat=True).first() or 0
+    key = f'accounts:{user.pk}:{version}'
+    cache = report_cache()
+    directory = cache.get(key)
+    if directory is None:
+        directory = AccountDirectory(list(Account.objects.filter(owner_id=user.pk).order_by('name')))
+        cache.set(key, directory, getattr(settings, 'REPORT_CACHE_TIMEOUT', 60 * 60))
+    return directory
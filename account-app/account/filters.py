@@ -0,0 +1,50 @@
+# account/filters.py
+
+from datetime import date
+from dateutil.relativedelta import relativedelta
+from django.db.models import Q
+from .ledger import month_window
+from .search import search_transactions
+
+
+def filter_transactions(transactions, params, today):
+    """거래내역 화면의 검색 조건(계정/차변/대변/통합 검색/아이템/메모/기간)을 적용한다.
+
+    기간은 year+month > start_date+end_date > 최근 한 달 순으로 정한다.
+    반환값: (필터된 queryset, 시작일, 종료일)
+    """
+    q_year = params.get('year', '')
+    q_month = params.get('month', '')
+    q_start = params.get('start_date', '')
+    q_end = params.get('end_date', '')
+
+    if q_year and q_month:
+        try:
+            start_date_obj, next_month = month_window(int(q_year), int(q_month))
+        except (ValueError, TypeError):
+            start_date_obj, next_month = month_window(today.year, today.month)
+        end_date_obj = next_month - relativedelta(days=1)
+    elif q_start and q_end:
+        start_date_obj = date.fromisoformat(q_start)
+        end_date_obj = date.fromisoformat(q_end)
+    else:
+        start_date_obj = today - relativedelta(months=1)
+        end_date_obj = today
+
+    transactions = transactions.filter(date__range=[start_date_obj, end_date_obj])
+
+    if params.get('debit_account'):
+        transactions = transactions.filter(debit_account_id=params['debit_account'])
+    if params.get('credit_account'):
+        transactions = transactions.filter(credit_account_id=params['credit_account'])
+    if params.get('account'):
+        transactions = transactions.filter(
+            Q(debit_account_id=params['account']) | Q(credit_account_id=params['account'])
+        )
+    if params.get('q'):
+        transactions = search_transactions(transactions, params['q'])
+    if params.get('item'):
+        transactions = transactions.filter(item__icontains=params['item'])
+    if params.get('memo'):
+        transactions = transactions.filter(memo__icontains=params['memo'])
+    return transactions, start_date_obj, end_date_obj
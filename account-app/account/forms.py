@@ -2,6 +2,7 @@
 
 from django import forms
 from .models import Transaction, Account, TransactionPreset, Budget
+from .directory import account_directory
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm, PasswordChangeForm as AuthPasswordChangeForm
 
@@ -9,13 +10,40 @@ class CustomUserCreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
         fields = UserCreationForm.Meta.fields + ("first_name",)
 
+class DirectoryAccountField(forms.ChoiceField):
+    """계정 디렉터리(캐시)로 선택지를 만들고 검증하는 계정 선택 필드. ModelChoiceField 와 달리 쿼리를 실행하지 않는다."""
+
+    def __init__(self, directory, **kwargs):
+        self.directory = directory
+        super().__init__(choices=[('', '---------')] + [(acc.pk, str(acc)) for acc in directory.accounts], **kwargs)
+
+    def prepare_value(self, value):
+        return getattr(value, 'pk', value)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        account = self.directory.get(value)
+        if account is None:
+            raise forms.ValidationError(self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value})
+        return account
+
+    def validate(self, value):
+        if value is None and self.required:
+            raise forms.ValidationError(self.error_messages['required'], code='required')
+
+
 class TransactionForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         user = kwargs.pop('user', None)
+        directory = kwargs.pop('accounts', None)
         super(TransactionForm, self).__init__(*args, **kwargs)
-        if user:
-            self.fields['debit_account'].queryset = Account.objects.filter(owner=user)
-            self.fields['credit_account'].queryset = Account.objects.filter(owner=user)
+        if directory is None and user:
+            directory = account_directory(user)
+        if directory is not None:
+            for name in ('debit_account', 'credit_account'):
+                field = self.fields[name]
+                self.fields[name] = DirectoryAccountField(directory, label=field.label, required=field.required)
 
     class Meta:
         model = Transaction
@@ -99,6 +127,17 @@ class AccountForm(forms.ModelForm):
 
         return cleaned_data
 
+class InstallmentUpdateForm(forms.Form):
+    """남은 할부 회차 일괄 수정. 비워 둔 칸은 그대로 둔다."""
+    amount = forms.DecimalField(label='회차 금액', required=False, min_value=1, max_digits=12, decimal_places=0)
+    months = forms.IntegerField(label='전체 할부 개월수', required=False, min_value=1, max_value=360)
+
+    def __init__(self, *args, **kwargs):
+        directory = kwargs.pop('accounts')
+        super().__init__(*args, **kwargs)
+        self.fields['debit_account'] = DirectoryAccountField(directory, label='차변 계정', required=False)
+        self.fields['credit_account'] = DirectoryAccountField(directory, label='대변 계정', required=False)
+
 class TransactionPresetForm(forms.ModelForm):
     class Meta:
         model = TransactionPreset
@@ -0,0 +1,126 @@
+# account/installments.py
+
+from dateutil.relativedelta import relativedelta
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from .models import InstallmentPlan, Transaction
+from .balances import apply_transactions
+from .cache import bump_ledger_version
+from .items import apply_item_usage
+from .signals import signals_suspended
+
+
+def parse_installment_item(item):
+    """'아이템//개월수' 형식이면 (아이템, 개월수), 할부가 아니면 None. 형식이 잘못되면 ValueError."""
+    if '//' not in item:
+        return None
+    parts = item.split('//')
+    if len(parts) != 2:
+        raise ValueError(item)
+    months = int(parts[1])
+    if months <= 0:
+        raise ValueError(item)
+    return parts[0].strip(), months
+
+
+def _sync(owner, entries):
+    # bulk_create/신호 중단 delete 는 스냅샷, 아이템 사용 빈도, 원장 버전을 직접 맞춰야 한다 (바뀐 회차만 증분 반영)
+    apply_transactions(entries)
+    apply_item_usage(entries)
+    bump_ledger_version(owner)
+
+
+def create_installment_plan(owner, item, total_amount, months, start_date, debit_account, credit_account, is_repayment=False):
+    """할부 계획과 회차별 거래를 한 트랜잭션에서 bulk_create 로 만든다."""
+    monthly_amount = round(total_amount / months)
+    with transaction.atomic():
+        plan = InstallmentPlan.objects.create(
+            owner=owner, item=item, total_amount=total_amount, months=months, start_date=start_date,
+            debit_account=debit_account, credit_account=credit_account, is_repayment=is_repayment,
+        )
+        installments = Transaction.objects.bulk_create([
+            Transaction(
+                owner=owner,
+                date=start_date + relativedelta(months=i), item=item,
+                memo=f"{item} ({i+1}/{months}회차)", amount=monthly_amount,
+                debit_account=debit_account, credit_account=credit_account,
+                is_repayment=is_repayment, installment_plan=plan,
+            )
+            for i in range(months)
+        ])
+        _sync(owner, [(tx, 1) for tx in installments])
+    return plan
+
+
+def remaining_installments(plan, from_date):
+    """from_date 이후(포함) 회차들."""
+    return Transaction.objects.filter(installment_plan=plan, owner=plan.owner_id, date__gte=from_date)
+
+
+def cancel_remaining_installments(plan, from_date):
+    """남은 회차를 한 번의 DELETE 로 지운다. 지운 회차 수를 반환한다. 남은 회차가 없으면 계획도 지운다."""
+    with transaction.atomic():
+        cancelled = list(remaining_installments(plan, from_date).only(
+            'owner', 'date', 'item', 'amount', 'debit_account', 'credit_account'
+        ).select_for_update())
+        with signals_suspended():
+            deleted, _ = Transaction.objects.filter(pk__in=[tx.pk for tx in cancelled]).delete()
+        if deleted:
+            _sync(plan.owner_id, [(tx, -1) for tx in cancelled])
+        if not plan.installments.exists():
+            plan.delete()
+    return deleted
+
+
+def update_remaining_installments(plan, from_date, amount=None, months=None, debit_account=None, credit_account=None):
+    """남은 회차의 금액/계정을 한 번의 UPDATE 로 바꾸고, months(전체 회차 수)가 주어지면 뒤 회차를 지우거나 이어 붙인다.
+
+    이미 지난 회차(from_date 이전)는 건드리지 않으므로 months 는 지난 회차 수보다 작을 수 없다(ValueError).
+    바뀐 회차 수를 반환한다.
+    """
+    fields = {name: value for name, value in (
+        ('amount', amount), ('debit_account', debit_account), ('credit_account', credit_account),
+    ) if value is not None}
+    with transaction.atomic():
+        plan = InstallmentPlan.objects.select_for_update().get(pk=plan.pk)
+        installments = list(plan.installments.order_by('date', 'id').only(
+            'owner', 'date', 'item', 'amount', 'debit_account', 'credit_account'
+        ).select_for_update())
+        paid = sum(1 for tx in installments if tx.date < from_date)
+        if months is not None and months < max(paid, 1):
+            raise ValueError(months)
+        before = installments[paid:]
+        with signals_suspended():
+            if fields:
+                Transaction.objects.filter(pk__in=[tx.pk for tx in before]).update(updated_at=timezone.now(), **fields)
+            if months is not None and months < len(installments):
+                Transaction.objects.filter(pk__in=[tx.pk for tx in installments[months:]]).delete()
+        added = []
+        if months is not None and months > len(installments):
+            last = installments[-1] if installments else None
+            added = Transaction.objects.bulk_create([
+                Transaction(
+                    owner_id=plan.owner_id,
+                    date=plan.start_date + relativedelta(months=i), item=plan.item,
+                    memo=f"{plan.item} ({i+1}/{months}회차)",
+                    amount=fields.get('amount', last.amount if last else round(plan.total_amount / plan.months)),
+                    debit_account=fields.get('debit_account', plan.debit_account),
+                    credit_account=fields.get('credit_account', plan.credit_account),
+                    is_repayment=plan.is_repayment, installment_plan=plan,
+                )
+                for i in range(len(installments), months)
+            ])
+        # 바뀐 회차만 옛 값을 빼고 새 값을 더한다
+        after = list(Transaction.objects.filter(pk__in=[tx.pk for tx in before]).only(
+            'owner', 'date', 'item', 'amount', 'debit_account', 'credit_account'
+        )) + added
+        if before or added:
+            _sync(plan.owner_id, [(tx, -1) for tx in before] + [(tx, 1) for tx in after])
+
+        plan.months = months if months is not None else plan.months
+        plan.debit_account = fields.get('debit_account', plan.debit_account)
+        plan.credit_account = fields.get('credit_account', plan.credit_account)
+        plan.total_amount = plan.installments.aggregate(total=Sum('amount'))['total']
+        plan.save(update_fields=['months', 'debit_account', 'credit_account', 'total_amount'])
+    return len(before) + len(added)
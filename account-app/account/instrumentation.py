@@ -0,0 +1,247 @@
+# account/instrumentation.py
+
+import json
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger('account.metrics')
+
+# 현재 요청의 측정값. async 뷰의 sync_to_async 스레드에도 그대로 전달된다.
+_current = ContextVar('request_metrics', default=None)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class RequestMetrics:
+    # gather_queries 는 집계를 여러 스레드(thread_sensitive=False)에서 동시에 실행하므로 누적은 잠금 안에서 한다
+    __slots__ = ('queries', 'db_time', 'template_time', 'view_started', '_lock')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.view_started = None
+        self._lock = threading.Lock()
+
+    def add_query(self, duration):
+        with self._lock:
+            self.db_time += duration
+            self.queries += 1
+
+    def add_template(self, duration):
+        with self._lock:
+            self.template_time += duration
+
+
+# --- SQL 측정: 모든 DB 연결에 execute wrapper 를 한 번씩 설치 ---
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(time.perf_counter() - started)
+
+
+def _install_query_recorder(sender=None, connection=None, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _install_on_thread_connections(**kwargs):
+    # 미들웨어 로드 전에 열린 연결용. request_started 는 뷰(동기 코드)가 실행될 스레드에서 호출된다
+    for connection in connections.all(initialized_only=True):
+        _install_query_recorder(connection=connection)
+
+
+# --- 템플릿 측정: 최상위 render 시간만 잰다 (include 등 하위 렌더링은 그 안에 포함) ---
+
+class _TimedTemplate:
+    def __init__(self, template):
+        self._template = template
+
+    def __getattr__(self, name):
+        return getattr(self._template, name)
+
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return self._template.render(context, request)
+        started = time.perf_counter()
+        try:
+            return self._template.render(context, request)
+        finally:
+            metrics.add_template(time.perf_counter() - started)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """렌더링 시간을 요청 측정값에 더하는 DjangoTemplates. REQUEST_METRICS_ENABLED 일 때 settings 에서 사용한다."""
+
+    def from_string(self, template_code):
+        return _TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return _TimedTemplate(super().get_template(template_name))
+
+
+# --- Prometheus 텍스트 형식으로 내보낼 프로세스 내 집계 ---
+
+class MetricsRegistry:
+    """워커 프로세스별 카운터/히스토그램. /metrics/ 는 요청을 받은 워커의 값을 보여준다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def inc(self, name, labels, value=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, labels, value, buckets):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {'buckets': buckets, 'counts': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram['counts'][i] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name in sorted({key[0] for key in self.counters}):
+                lines.append(f'# TYPE {name} counter')
+                for (metric, labels), value in sorted(self.counters.items()):
+                    if metric == name:
+                        lines.append(f'{name}{_labels(labels)} {value}')
+            for name in sorted({key[0] for key in self.histograms}):
+                lines.append(f'# TYPE {name} histogram')
+                for (metric, labels), histogram in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+                    for bound, count in zip(histogram['buckets'], histogram['counts']):
+                        lines.append(f'{name}_bucket{_labels(labels + (("le", str(bound)),))} {count}')
+                    lines.append(f'{name}_bucket{_labels(labels + (("le", "+Inf"),))} {histogram["count"]}')
+                    lines.append(f'{name}_sum{_labels(labels)} {histogram["sum"]:.6f}')
+                    lines.append(f'{name}_count{_labels(labels)} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels):
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+
+registry = MetricsRegistry()
+
+
+def _mark_view_started():
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.view_started = time.perf_counter()
+
+
+class RequestMetricsMiddleware:
+    """요청별 SQL 개수/DB 시간/템플릿 시간/뷰 시간/전체 시간을 잰다. (REQUEST_METRICS_ENABLED 일 때만 동작)
+
+    뷰 시간은 process_view 부터 응답이 이 미들웨어로 돌아올 때까지이며, 뷰 안의 DB/템플릿 시간을 포함한다.
+    전체 시간과의 차이가 URL 해석과 안쪽 미들웨어의 비용이다.
+
+    표본 추출된 요청은 Server-Timing 헤더, account.metrics 로그(JSON 한 줄), /metrics/ 히스토그램에 반영된다.
+    요청 수 카운터는 표본과 관계없이 모든 요청에 대해 센다.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'REQUEST_METRICS_SAMPLE_RATE', 1.0)
+        connection_created.connect(_install_query_recorder, dispatch_uid='account_request_metrics')
+        request_started.connect(_install_on_thread_connections, dispatch_uid='account_request_metrics')
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+            # ASGI 에서 동기 process_view 는 요청마다 sync_to_async 로 감싸지므로 async 버전을 쓴다
+            self.process_view = self._aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics, token, started = self._begin()
+        try:
+            response = self.get_response(request)
+        finally:
+            if token is not None:
+                _current.reset(token)
+        return self._finish(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        metrics, token, started = self._begin()
+        try:
+            response = await self.get_response(request)
+        finally:
+            if token is not None:
+                _current.reset(token)
+        return self._finish(request, response, metrics, started)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        _mark_view_started()
+
+    async def _aprocess_view(self, request, view_func, view_args, view_kwargs):
+        _mark_view_started()
+
+    def _begin(self):
+        if random.random() >= self.sample_rate:
+            return None, None, time.perf_counter()
+        metrics = RequestMetrics()
+        return metrics, _current.set(metrics), time.perf_counter()
+
+    def _finish(self, request, response, metrics, started):
+        finished = time.perf_counter()
+        duration = finished - started
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else '<unresolved>'
+        registry.inc('account_http_requests_total', {'view': view, 'method': request.method, 'status': response.status_code})
+        if metrics is None:
+            return response
+
+        labels = {'view': view}
+        view_time = finished - metrics.view_started if metrics.view_started is not None else 0.0
+        registry.observe('account_request_duration_seconds', labels, duration, DURATION_BUCKETS)
+        registry.observe('account_db_duration_seconds', labels, metrics.db_time, DURATION_BUCKETS)
+        registry.observe('account_template_duration_seconds', labels, metrics.template_time, DURATION_BUCKETS)
+        registry.observe('account_view_duration_seconds', labels, view_time, DURATION_BUCKETS)
+        registry.observe('account_db_queries_per_request', labels, metrics.queries, QUERY_BUCKETS)
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+            f'tpl;dur={metrics.template_time * 1000:.1f}',
+            f'view;dur={view_time * 1000:.1f}',
+            f'total;dur={duration * 1000:.1f}',
+        ])
+        logger.info(json.dumps({
+            'view': view, 'method': request.method, 'path': request.path, 'status': response.status_code,
+            'duration_ms': round(duration * 1000, 1), 'db_ms': round(metrics.db_time * 1000, 1),
+            'queries': metrics.queries, 'template_ms': round(metrics.template_time * 1000, 1),
+            'view_ms': round(view_time * 1000, 1),
+        }, ensure_ascii=False))
+        return response
@@ -0,0 +1,126 @@
+# account/items.py
+
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import Case, Count, DateField, DecimalField, F, Max, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Greatest
+from .models import ItemUsage, Transaction
+
+SUGGEST_LIMIT = 10
+MAX_SUGGEST_LIMIT = 50
+
+
+def _latest_for(key):
+    # 한 (사용자, 아이템, 차변, 대변) 의 가장 최근 거래. 거래 수정/삭제 때만 쓴다
+    owner_id, item, debit_id, credit_id = key
+    return Transaction.objects.filter(
+        owner_id=owner_id, item=item, debit_account_id=debit_id, credit_account_id=credit_id,
+    ).order_by('-date', '-created_at')
+
+
+def apply_item_usage(entries):
+    """(거래, 부호) 목록을 아이템 사용 빈도에 증분 반영한다. 부호가 -1 이면 거래 수를 줄이고 0 이 되면 지운다.
+
+    되돌리는 거래가 있는 조합은 마지막 거래일/금액을 원장에서 그 조합만 다시 읽는다.
+    """
+    deltas = defaultdict(lambda: [0, None, False])  # key -> [거래 수 증감, 가장 최근 (날짜, 금액), 되돌림 여부]
+    for tx, sign in entries:
+        if not tx.item:
+            continue
+        key = (tx.owner_id, tx.item, tx.debit_account_id, tx.credit_account_id)
+        deltas[key][0] += sign
+        if sign < 0:
+            deltas[key][2] = True
+        elif deltas[key][1] is None or tx.date >= deltas[key][1][0]:
+            deltas[key][1] = (tx.date, tx.amount)
+
+    with transaction.atomic():
+        for key, (delta, latest, reverted) in sorted(deltas.items()):
+            owner_id, item, debit_id, credit_id = key
+            rows = ItemUsage.objects.filter(owner_id=owner_id, item=item, debit_account_id=debit_id, credit_account_id=credit_id)
+            if reverted:
+                rows.filter(count__lte=-delta).delete()
+                recent = _latest_for(key)
+                rows.update(
+                    count=F('count') + delta,
+                    last_used=Subquery(recent.values('date')[:1]),
+                    last_amount=Subquery(recent.values('amount')[:1]),
+                )
+                continue
+            last_used, last_amount = Value(latest[0], DateField()), Value(latest[1], DecimalField())
+            changes = {
+                'count': F('count') + delta,
+                # SET 의 우변은 모두 갱신 전 값을 본다
+                'last_amount': Case(When(last_used__lte=last_used, then=last_amount), default=F('last_amount')),
+                'last_used': Greatest(F('last_used'), last_used),
+            }
+            if rows.update(**changes):
+                continue
+            _, created = ItemUsage.objects.get_or_create(
+                owner_id=owner_id, item=item, debit_account_id=debit_id, credit_account_id=credit_id,
+                defaults={'count': delta, 'last_used': latest[0], 'last_amount': latest[1]},
+            )
+            if not created:  # 동시에 다른 요청이 먼저 만든 경우
+                rows.update(**changes)
+
+
+def rebuild_item_usage(owner):
+    """사용자의 아이템 사용 빈도를 원장에서 다시 계산한다. bulk_create 등 신호가 발생하지 않는 작업 후에 호출한다."""
+    owner_id = getattr(owner, 'pk', owner)
+    ledger = Transaction.objects.filter(owner_id=owner_id).exclude(item='')
+    latest = Transaction.objects.filter(
+        owner_id=owner_id, item=OuterRef('item'),
+        debit_account_id=OuterRef('debit_account_id'), credit_account_id=OuterRef('credit_account_id'),
+    ).order_by('-date', '-created_at').values('amount')[:1]
+    groups = ledger.values('item', 'debit_account_id', 'credit_account_id').annotate(
+        count=Count('pk'), last_used=Max('date'), last_amount=Subquery(latest),
+    ).order_by()
+    rows = [
+        ItemUsage(owner_id=owner_id, item=group['item'], debit_account_id=group['debit_account_id'],
+                  credit_account_id=group['credit_account_id'], count=group['count'],
+                  last_used=group['last_used'], last_amount=group['last_amount'])
+        for group in groups.iterator(chunk_size=2000)
+    ]
+    with transaction.atomic():
+        ItemUsage.objects.filter(owner_id=owner_id).delete()
+        ItemUsage.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def suggest_items(owner, prefix, limit=SUGGEST_LIMIT):
+    """prefix 로 시작하는 아이템을 거래 수가 많은 순으로 limit 개 돌려준다.
+
+    각 아이템에는 가장 많이 쓴 차변/대변 계정과 가장 최근 금액을 붙인다.
+    ItemUsage 의 (owner, item) 접두어 인덱스만 읽으며 거래 원장은 보지 않는다 (쿼리 두 번).
+    """
+    usages = ItemUsage.objects.filter(owner=owner, count__gt=0)
+    prefix = prefix.strip()
+    if prefix:
+        usages = usages.filter(item__startswith=prefix)
+    top = list(
+        usages.values('item').annotate(total=Sum('count'), last_used=Max('last_used'))
+        .order_by('-total', '-last_used', 'item')[:limit]
+    )
+    if not top:
+        return []
+
+    pairs = usages.filter(item__in=[row['item'] for row in top]).order_by('-count', '-last_used').values(
+        'item', 'count', 'last_used', 'last_amount',
+        'debit_account_id', 'debit_account__name', 'credit_account_id', 'credit_account__name',
+    )
+    common, recent = {}, {}
+    for pair in pairs:
+        common.setdefault(pair['item'], pair)
+        if pair['item'] not in recent or pair['last_used'] > recent[pair['item']]['last_used']:
+            recent[pair['item']] = pair
+    return [
+        {
+            'item': row['item'],
+            'count': row['total'],
+            'last_used': row['last_used'],
+            'last_amount': recent[row['item']]['last_amount'],
+            'debit_account': {'id': common[row['item']]['debit_account_id'], 'name': common[row['item']]['debit_account__name']},
+            'credit_account': {'id': common[row['item']]['credit_account_id'], 'name': common[row['item']]['credit_account__name']},
+        }
+        for row in top
+    ]
@@ -0,0 +1,99 @@
+# account/ledger.py
+
+from datetime import date
+from decimal import Decimal
+from dateutil.relativedelta import relativedelta
+from django.db.models import Case, DecimalField, F, FilteredRelation, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from .models import Account, Transaction
+
+
+def _to_decimal(value):
+    if value is None:
+        return Decimal(0)
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def month_window(year, month):
+    """해당 월의 반개구간 [1일, 다음 달 1일). 잘못된 연/월이면 ValueError."""
+    start = date(int(year), int(month), 1)
+    return start, start + relativedelta(months=1)
+
+
+def in_month(year, month, field='date'):
+    """월 필터. date__year/date__month 대신 인덱스를 탈 수 있는 범위 조건을 만든다."""
+    start, end = month_window(year, month)
+    return Q(**{f'{field}__gte': start, f'{field}__lt': end})
+
+
+def in_period_range(start, end):
+    """(year, month) 필드를 가진 모델(스냅샷/예산)의 start~end 월 필터 (양 끝 포함)."""
+    return (
+        (Q(year__gt=start.year) | Q(year=start.year, month__gte=start.month))
+        & (Q(year__lt=end.year) | Q(year=end.year, month__lte=end.month))
+    )
+
+
+def account_totals(owner, cutoffs=(), since=None, account_ids=None):
+    """계정별 (차변 합계, 대변 합계)를 여러 기준일에 대해 한 번의 쿼리로 구한다.
+
+    차변/대변 다리(leg)별로 계정 단위 조건부 합계(Sum(filter=Q(date__lt=cutoff)))를 내고 UNION ALL 로 합친다.
+    - cutoffs: 각 날짜 *이전*(date < cutoff) 거래만 합산한 값을 해당 날짜 키에 담는다.
+    - since: 주어지면 since 이후(date >= since) 거래만 대상으로 한다.
+    - account_ids: 주어지면 해당 계정들만 계산한다.
+
+    반환값: {account_id: {None: (debit, credit), cutoff: (debit, credit), ...}}
+    None 키는 (since 이후) 전체 합계이다.
+    """
+    if account_ids is not None and not account_ids:
+        return {}
+    cutoffs = list(cutoffs)
+    ledger = Transaction.objects.filter(owner_id=getattr(owner, 'pk', owner))
+    if since is not None:
+        ledger = ledger.filter(date__gte=since)
+
+    def leg(side):
+        legs = ledger if account_ids is None else ledger.filter(**{f'{side}_account_id__in': account_ids})
+        sums = {'total': Sum('amount')}
+        for i, cutoff in enumerate(cutoffs):
+            sums[f'before_{i}'] = Sum('amount', filter=Q(date__lt=cutoff))
+        return legs.order_by().values(account=F(f'{side}_account_id')).annotate(
+            is_debit=Value(side == 'debit'), **sums,
+        ).values_list('account', 'is_debit', *sums)
+
+    zero = (Decimal(0), Decimal(0))
+    totals = {}
+    for account_id, is_debit, *values in leg('debit').union(leg('credit'), all=True):
+        result = totals.setdefault(account_id, dict.fromkeys([None, *cutoffs], zero))
+        for key, value in zip([None, *cutoffs], values):
+            debit, credit = result[key]
+            value = _to_decimal(value)
+            result[key] = (debit + value, credit) if is_debit else (debit, credit + value)
+    return totals
+
+
+def budget_vs_actual(owner, year, month):
+    """비용/수익 계정별 해당 월 예산과 실적을 한 번의 쿼리로 구한다. {account_id: Account} (이름순)
+
+    각 Account 에 budget_amount(예산, 없으면 0), budget_id(예산 행 id, 없으면 None),
+    actual(비용은 차변, 수익은 대변 합계)이 붙는다.
+    예산은 (계정, 연, 월) 조건의 LEFT JOIN, 실적은 계정별 월 합계 서브쿼리(tx_*_date_amount 인덱스)로 계산한다.
+    """
+    start, end = month_window(year, month)
+
+    def month_total(side):
+        legs = Transaction.objects.filter(**{f'{side}_account': OuterRef('pk')}, date__gte=start, date__lt=end)
+        return Subquery(legs.order_by().values(f'{side}_account').annotate(total=Sum('amount')).values('total'))
+
+    amount = DecimalField(max_digits=14, decimal_places=0)
+    accounts = Account.objects.filter(owner=owner, type__in=['비용', '수익']).annotate(
+        month_budget=FilteredRelation('budget', condition=Q(budget__year=year, budget__month=month)),
+    ).annotate(
+        budget_amount=Coalesce(F('month_budget__amount'), Decimal(0), output_field=amount),
+        budget_id=F('month_budget__id'),
+        actual=Coalesce(
+            Case(When(type='비용', then=month_total('debit')), default=month_total('credit'), output_field=amount),
+            Decimal(0), output_field=amount,
+        ),
+    ).order_by('name')
+    return {account.id: account for account in accounts}
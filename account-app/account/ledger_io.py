@@ -0,0 +1,88 @@
+# account/ledger_io.py
+
+import csv
+import io
+from datetime import date
+from decimal import Decimal
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.utils import timezone
+from .models import Transaction
+
+# import_data / export_data 가 공유하는 거래내역 CSV 열 구성
+TRANSACTION_COLUMNS = ['거래일', '항목', '메모', '금액', '차변계정명', '대변계정명']
+ACCOUNT_COLUMNS = ['계정', '계좌명']
+EXPORT_CHUNK_SIZE = 2000
+
+
+def parse_amount(value):
+    """'₩1,234' 형식의 금액. 비어 있으면 0. 숫자가 아니면 InvalidOperation."""
+    amount_str = (value or '0').replace('₩', '').replace(',', '').strip()
+    return Decimal(amount_str) if amount_str else Decimal('0')
+
+
+def parse_tx_date(value):
+    """'2024. 1. 5.' (은행 내보내기) 또는 '2024-01-05' 형식의 거래일. 잘못되면 ValueError/IndexError."""
+    value = value.strip()
+    if '-' in value:
+        return date.fromisoformat(value)
+    date_parts = [p.strip() for p in value.replace('.', '').split()]
+    return date(int(date_parts[0]), int(date_parts[1]), int(date_parts[2]))
+
+
+def transaction_rows(transactions, chunk_size=EXPORT_CHUNK_SIZE):
+    """헤더와 거래 행을 하나씩 만든다. 전체 결과를 메모리에 올리지 않도록 iterator 로 나눠 읽는다."""
+    yield TRANSACTION_COLUMNS
+    rows = transactions.order_by('date', 'created_at', 'id').values_list(
+        'date', 'item', 'memo', 'amount', 'debit_account__name', 'credit_account__name'
+    )
+    for tx_date, item, memo, amount, debit_name, credit_name in rows.iterator(chunk_size=chunk_size):
+        yield [tx_date.isoformat(), item, memo or '', amount, debit_name, credit_name]
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    """행마다 CSV 한 줄 문자열을 돌려준다 (StreamingHttpResponse 용)."""
+    writer = csv.writer(_Echo())
+    for row in rows:
+        yield writer.writerow(row)
+
+
+async def achunked(lines, chunk_size=EXPORT_CHUNK_SIZE):
+    """ASGI 용 async iterator. chunk_size 줄씩 요청 스레드(thread_sensitive)에서 읽어 한 덩어리로 보낸다.
+
+    Django 5.0 의 StreamingHttpResponse 는 ASGI 에서 sync iterator 를 sync_to_async(list) 로 통째로 읽으므로
+    (내보내기 전체가 메모리에 쌓인다) ASGI 요청에는 이 iterator 를 넘긴다.
+    """
+    lines = iter(lines)
+    read = sync_to_async(lambda: ''.join(islice(lines, chunk_size)))
+    while chunk := await read():
+        yield chunk
+
+
+def copy_transactions(batch):
+    """Transaction 객체 배치를 메모리 CSV 로 만들어 COPY FROM STDIN 으로 적재한다 (PostgreSQL 전용, 신호 없음)."""
+    columns = ['owner_id', 'date', 'item', 'memo', 'amount', 'debit_account_id', 'credit_account_id',
+               'is_repayment', 'installment_plan_id', 'created_at', 'updated_at']
+    now = timezone.now().isoformat()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for tx in batch:
+        writer.writerow([
+            tx.owner_id, tx.date.isoformat(), tx.item, tx.memo or '', tx.amount, tx.debit_account_id,
+            tx.credit_account_id, 't' if tx.is_repayment else 'f', tx.installment_plan_id or '', now, now,
+        ])
+    buffer.seek(0)
+    qn = connection.ops.quote_name
+    # csv 형식의 COPY 는 따옴표 없는 빈 값을 NULL 로 읽는다. 빈 아이템/메모는 bulk_create 경로처럼 '' 로 넣는다
+    sql = (
+        f"COPY {qn(Transaction._meta.db_table)} ({', '.join(qn(c) for c in columns)}) FROM STDIN "
+        f"WITH (FORMAT csv, FORCE_NOT_NULL ({qn('item')}, {qn('memo')}))"
+    )
+    with connection.cursor() as cursor:
+        cursor.copy_expert(sql, buffer)
@@ -1,15 +1,26 @@
 from django.core.management.base import BaseCommand
-from account.models import Transaction, Account
+from django.db.models import F
+from account.models import Transaction, Account, InstallmentPlan, LedgerVersion
+from account.signals import signals_suspended
 
 class Command(BaseCommand):
     help = 'Deletes all transaction and account data.'
 
     def handle(self, *args, **options):
         # 외래 키 제약 조건 때문에 Transaction을 먼저 삭제해야 합니다.
-        t_deleted, _ = Transaction.objects.all().delete()
+        # 월별 스냅샷은 계정 삭제 시 함께 지워지므로 거래 단위 갱신은 생략
+        with signals_suspended():
+            t_deleted, _ = Transaction.objects.all().delete()
         self.stdout.write(self.style.SUCCESS(f'Successfully deleted {t_deleted} transactions.'))
 
+        # 할부 계획도 계정을 참조하므로 계정보다 먼저 삭제
+        p_deleted, _ = InstallmentPlan.objects.all().delete()
+        self.stdout.write(self.style.SUCCESS(f'Successfully deleted {p_deleted} installment plans.'))
+
         a_deleted, _ = Account.objects.all().delete()
         self.stdout.write(self.style.SUCCESS(f'Successfully deleted {a_deleted} accounts.'))
 
+        # 캐시된 리포트 무효화
+        LedgerVersion.objects.update(version=F('version') + 1, accounts_version=F('accounts_version') + 1)
+
         self.stdout.write(self.style.WARNING('All data has been cleared.'))
\ No newline at end of file
@@ -0,0 +1,68 @@
+# account/management/commands/export_data.py
+
+import csv
+import sys
+from datetime import date
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+from account.models import Account, Transaction
+from account.filters import filter_transactions
+from account.ledger_io import ACCOUNT_COLUMNS, EXPORT_CHUNK_SIZE, transaction_rows
+from django.contrib.auth.models import User
+
+class Command(BaseCommand):
+    help = '사용자의 거래 내역을 import_data 와 같은 형식의 CSV 로 내보냅니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', type=str, help='내보낼 사용자의 아이디')
+        parser.add_argument('--output', help='거래 내역 CSV 경로 (기본: 표준 출력)')
+        parser.add_argument('--accounts-output', help='계정 목록 CSV 경로 (지정 시 함께 내보냄)')
+        parser.add_argument('--start-date', default='', help='시작일 YYYY-MM-DD (기본: 첫 거래일)')
+        parser.add_argument('--end-date', default='', help='종료일 YYYY-MM-DD (기본: 마지막 거래일)')
+        parser.add_argument('--account', default='', help='차변 또는 대변이 이 계정명인 거래만')
+        parser.add_argument('--item', default='', help='아이템 검색어')
+        parser.add_argument('--memo', default='', help='메모 검색어')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help='DB 에서 한 번에 읽을 행 수')
+
+    def handle(self, *args, **options):
+        username = options['username']
+        try:
+            user = User.objects.get(username=username)
+        except User.DoesNotExist:
+            self.stderr.write(self.style.ERROR(f"'{username}' 사용자가 존재하지 않습니다."))
+            return
+
+        transactions = Transaction.objects.filter(owner=user)
+        params = {key: options[key] for key in ('item', 'memo')}
+        if options['account']:
+            account = Account.objects.filter(owner=user, name=options['account']).first()
+            if account is None:
+                self.stderr.write(self.style.ERROR(f"'{options['account']}' 계정을 찾을 수 없습니다."))
+                return
+            params['account'] = account.pk
+
+        # 기간을 지정하지 않으면 원장 전체
+        bounds = transactions.aggregate(first=Min('date'), last=Max('date'))
+        params['start_date'] = options['start_date'] or (bounds['first'] or date.today()).isoformat()
+        params['end_date'] = options['end_date'] or (bounds['last'] or date.today()).isoformat()
+        transactions, _, _ = filter_transactions(transactions, params, date.today())
+
+        if options['accounts_output']:
+            with open(options['accounts_output'], 'w', encoding='utf-8', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(ACCOUNT_COLUMNS)
+                writer.writerows(Account.objects.filter(owner=user).order_by('id').values_list('type', 'name'))
+
+        file = open(options['output'], 'w', encoding='utf-8', newline='') if options['output'] else sys.stdout
+        try:
+            writer = csv.writer(file)
+            exported = -1  # 헤더 제외
+            for row in transaction_rows(transactions, chunk_size=options['chunk_size']):
+                writer.writerow(row)
+                exported += 1
+        finally:
+            if file is not sys.stdout:
+                file.close()
+
+        if options['output']:
+            self.stdout.write(self.style.SUCCESS(f"거래 내역 {exported}건을 {options['output']} 로 내보냈습니다."))
@@ -1,16 +1,28 @@
 # account/management/commands/import_data.py
 
 import csv
-from django.core.management.base import BaseCommand
+import time
+from itertools import islice
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
 from account.models import Account, Transaction
+from account.balances import rebuild_monthly_balances
+from account.items import rebuild_item_usage
+from account.cache import bump_ledger_version
+from account.ledger_io import TRANSACTION_COLUMNS, copy_transactions, parse_amount, parse_tx_date
 from django.contrib.auth.models import User
-from decimal import Decimal, InvalidOperation
+from decimal import InvalidOperation
 
 class Command(BaseCommand):
     help = '특정 사용자의 계정으로 CSV 파일의 금융 데이터를 가져옵니다.'
 
     def add_arguments(self, parser):
         parser.add_argument('username', type=str, help='데이터를 추가할 사용자의 아이디')
+        parser.add_argument('--accounts', default='_계정목록.csv', help='계정 목록 CSV 경로 (기본: _계정목록.csv)')
+        parser.add_argument('--transactions', default='_거래내역.csv', help='거래 내역 CSV 경로 (기본: _거래내역.csv)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='한 번에 넣을 거래 수 (기본: 5000)')
+        parser.add_argument('--copy', action='store_true', help='PostgreSQL COPY FROM STDIN 으로 적재 (가장 빠름)')
+        parser.add_argument('--encoding', default='utf-8', help='CSV 인코딩 (기본: utf-8, 엑셀 저장본은 utf-8-sig/cp949)')
 
     def handle(self, *args, **options):
         username = options['username']
@@ -19,59 +31,87 @@ class Command(BaseCommand):
         except User.DoesNotExist:
             self.stdout.write(self.style.ERROR(f"'{username}' 사용자가 존재하지 않습니다."))
             return
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size 는 1 이상이어야 합니다.')
+        if options['copy'] and connection.vendor != 'postgresql':
+            raise CommandError('--copy 는 PostgreSQL 에서만 사용할 수 있습니다.')
 
-        # --- 1. 계정 정보(_계정목록.csv) 가져오기 ---
+        # --- 1. 계정 정보 가져오기 ---
         try:
-            with open('_계정목록.csv', 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    Account.objects.get_or_create(
-                        owner=user,
-                        type=row['계정'],
-                        name=row['계좌명']
-                    )
-            self.stdout.write(self.style.SUCCESS('계정 목록을 성공적으로 가져왔습니다.'))
+            account_ids = self.import_accounts(user, options['accounts'], options['encoding'])
         except FileNotFoundError:
-            self.stdout.write(self.style.ERROR('_계정목록.csv 파일을 찾을 수 없습니다. manage.py와 같은 위치에 파일을 두세요.'))
+            self.stdout.write(self.style.ERROR(f"{options['accounts']} 파일을 찾을 수 없습니다."))
             return
+        self.stdout.write(self.style.SUCCESS('계정 목록을 성공적으로 가져왔습니다.'))
 
-        # --- 2. 거래 내역(_거래내역.csv) 가져오기 ---
-        transactions_to_create = []
+        # --- 2. 거래 내역 가져오기 (스트리밍, 배치 단위 적재) ---
+        insert = copy_transactions if options['copy'] else self.bulk_create_batch
+        started = time.perf_counter()
+        imported = 0
         try:
-            with open('_거래내역.csv', 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    try:
-                        amount_str = row.get('금액', '0').replace('₩', '').replace(',', '').strip()
-
-                        if not amount_str:
-                            amount_val = Decimal('0')
-                        else:
-                            amount_val = Decimal(amount_str)
-
-                        debit_account = Account.objects.get(owner=user, name=row['차변계정명'])
-                        credit_account = Account.objects.get(owner=user, name=row['대변계정명'])
+            with open(options['transactions'], 'r', encoding=options['encoding'], newline='') as file:
+                rows = self.parse_transactions(user, csv.DictReader(file), account_ids)
+                with transaction.atomic():
+                    while batch := list(islice(rows, options['batch_size'])):
+                        insert(batch)
+                        imported += len(batch)
+                        self.stdout.write(f'  {imported}건 적재...')
+        except FileNotFoundError:
+            self.stdout.write(self.style.ERROR(f"{options['transactions']} 파일을 찾을 수 없습니다."))
+            return
+        elapsed = time.perf_counter() - started
 
-                        date_parts = [p.strip() for p in row['거래일'].replace('.', '').split()]
-                        formatted_date = f"{date_parts[0]}-{int(date_parts[1]):02d}-{int(date_parts[2]):02d}"
+        # bulk_create/COPY 는 신호를 발생시키지 않으므로 월별 스냅샷과 아이템 사용 빈도를 다시 계산
+        rebuild_monthly_balances(user)
+        rebuild_item_usage(user)
+        bump_ledger_version(user)
+        rate = imported / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'거래 내역 {imported}건을 성공적으로 가져왔습니다. ({elapsed:.1f}초, 초당 {rate:,.0f}건)'
+        ))
 
-                        transaction = Transaction(
-                            owner=user,
-                            date=formatted_date,
-                            item=row['항목'],
-                            memo=row['메모'],
-                            amount=amount_val,
-                            debit_account=debit_account,
-                            credit_account=credit_account
-                        )
-                        transactions_to_create.append(transaction)
+    def import_accounts(self, user, path, encoding):
+        """계정 목록을 한 번에 반영하고 {계정명: id} 맵을 돌려준다."""
+        account_ids = dict(Account.objects.filter(owner=user).values_list('name', 'id'))
+        new_accounts = {}
+        with open(path, 'r', encoding=encoding, newline='') as file:
+            for row in csv.DictReader(file):
+                name = row['계좌명']
+                if name not in account_ids and name not in new_accounts:
+                    new_accounts[name] = Account(owner=user, type=row['계정'], name=name)
+        if not new_accounts:
+            return account_ids
+        Account.objects.bulk_create(new_accounts.values())
+        # bulk_create 는 신호를 발생시키지 않으므로 계정 목록 캐시를 직접 무효화
+        bump_ledger_version(user, accounts=True)
+        return dict(Account.objects.filter(owner=user).values_list('name', 'id'))
 
-                    except Account.DoesNotExist as e:
-                        self.stdout.write(self.style.ERROR(f"'{e}' 계정을 찾을 수 없습니다. 건너뜁니다: {row}"))
-                    except (InvalidOperation, IndexError, ValueError):
-                        self.stdout.write(self.style.WARNING(f"데이터 형식 오류. 건너뜁니다: {row}"))
+    def parse_transactions(self, user, reader, account_ids):
+        """CSV 행을 Transaction 객체로 하나씩 변환한다. 잘못된 행은 경고 후 건너뛴다. 필수 열이 없으면 CommandError."""
+        # 금액 열은 없으면 0 으로 본다
+        missing = [column for column in TRANSACTION_COLUMNS if column != '금액' and column not in (reader.fieldnames or [])]
+        if missing:
+            raise CommandError(f"거래 내역 CSV 에 {', '.join(missing)} 열이 없습니다.")
+        for row in reader:
+            names = (row['차변계정명'], row['대변계정명'])
+            unknown = [name for name in names if name not in account_ids]
+            if unknown:
+                self.stdout.write(self.style.ERROR(f"'{unknown[0]}' 계정을 찾을 수 없습니다. 건너뜁니다: {row}"))
+                continue
+            try:
+                tx = Transaction(
+                    owner=user,
+                    date=parse_tx_date(row['거래일'] or ''),
+                    item=row['항목'] or '',
+                    memo=row['메모'] or '',
+                    amount=parse_amount(row.get('금액')),
+                    debit_account_id=account_ids[names[0]],
+                    credit_account_id=account_ids[names[1]],
+                )
+            except (InvalidOperation, IndexError, ValueError):
+                self.stdout.write(self.style.WARNING(f"데이터 형식 오류. 건너뜁니다: {row}"))
+                continue
+            yield tx
 
-            Transaction.objects.bulk_create(transactions_to_create)
-            self.stdout.write(self.style.SUCCESS(f'거래 내역 {len(transactions_to_create)}건을 성공적으로 가져왔습니다.'))
-        except FileNotFoundError:
-            self.stdout.write(self.style.ERROR('_거래내역.csv 파일을 찾을 수 없습니다. manage.py와 같은 위치에 파일을 두세요.'))
\ No newline at end of file
+    def bulk_create_batch(self, batch):
+        Transaction.objects.bulk_create(batch)
@@ -0,0 +1,97 @@
+# account/management/commands/post_fixed_presets.py
+
+import calendar
+from datetime import date
+from itertools import islice
+from dateutil.relativedelta import relativedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from account.models import PresetPosting, Transaction, TransactionPreset
+from account.balances import apply_transactions
+from account.items import apply_item_usage
+from account.cache import bump_ledger_version
+
+class Command(BaseCommand):
+    help = '입력일이 지난 고정항목 프리셋을 전체 사용자에 대해 거래로 자동 입력합니다. (cron 용, 여러 번 실행해도 안전)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', default='', help='이 달(YYYY-MM)부터 밀린 달까지 모두 입력 (기본: 이번 달만)')
+        parser.add_argument('--date', default='', help='기준일 YYYY-MM-DD (기본: 오늘)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='한 번에 입력할 거래 수 (기본: 1000)')
+        parser.add_argument('--dry-run', action='store_true', help='입력하지 않고 대상 건수만 출력')
+
+    def handle(self, *args, **options):
+        try:
+            today = date.fromisoformat(options['date']) if options['date'] else date.today()
+            period = date.fromisoformat(f"{options['since']}-01") if options['since'] else today.replace(day=1)
+        except ValueError:
+            raise CommandError('--date 는 YYYY-MM-DD, --since 는 YYYY-MM 형식이어야 합니다.')
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size 는 1 이상이어야 합니다.')
+
+        total = skipped = 0
+        owners = set()
+        while period <= today:
+            due = self.due_presets(period, today)
+            while batch := list(islice(due, options['batch_size'])):
+                if not options['dry_run'] and not self.post(batch, period):
+                    skipped += len(batch)
+                    continue
+                total += len(batch)
+                owners.update(preset.owner_id for preset in batch)
+            period += relativedelta(months=1)
+
+        if skipped:
+            self.stdout.write(self.style.WARNING(f'동시에 실행된 작업과 겹친 {skipped}건은 건너뛰었습니다. (다음 실행에서 남은 건을 입력)'))
+        verb = '입력 대상' if options['dry_run'] else '자동 입력'
+        self.stdout.write(self.style.SUCCESS(f'고정항목 {total}건 {verb} (사용자 {len(owners)}명).'))
+
+    def due_presets(self, period, today):
+        """해당 월에 입력일이 지났고 아직 입력되지 않은 고정항목 프리셋 (한 번의 쿼리).
+
+        사용자가 그 달에 같은 아이템/차변/대변으로 직접 입력한 거래가 있으면 입력된 것으로 본다.
+        """
+        presets = TransactionPreset.objects.filter(
+            preset_type='FIXED', day_of_month__isnull=False, amount__isnull=False,
+        ).exclude(
+            Exists(PresetPosting.objects.filter(preset=OuterRef('pk'), year=period.year, month=period.month))
+        ).exclude(
+            Exists(Transaction.objects.filter(
+                owner_id=OuterRef('owner_id'), item=OuterRef('item'),
+                debit_account_id=OuterRef('debit_account_id'), credit_account_id=OuterRef('credit_account_id'),
+                date__gte=period, date__lt=period + relativedelta(months=1),
+            ))
+        )
+        last_day = calendar.monthrange(period.year, period.month)[1]
+        if (period.year, period.month) == (today.year, today.month) and today.day < last_day:
+            presets = presets.filter(day_of_month__lte=today.day)
+        return presets.order_by('pk').iterator(chunk_size=2000)
+
+    def post(self, batch, period):
+        """배치 하나를 입력한다. 동시에 실행된 다른 작업이 먼저 표식을 넣었으면 배치 전체를 롤백하고 False 를 반환한다."""
+        last_day = calendar.monthrange(period.year, period.month)[1]
+        transactions = [
+            Transaction(
+                owner_id=preset.owner_id,
+                date=period.replace(day=max(1, min(preset.day_of_month, last_day))),
+                item=preset.item, memo=f'{preset.name} (고정항목 자동입력)', amount=preset.amount,
+                debit_account_id=preset.debit_account_id, credit_account_id=preset.credit_account_id,
+            )
+            for preset in batch
+        ]
+        try:
+            with transaction.atomic():
+                # 표식을 먼저 넣어 동시에 실행된 다른 작업과 겹치면 배치 전체가 롤백되도록 한다
+                PresetPosting.objects.bulk_create([
+                    PresetPosting(preset=preset, year=period.year, month=period.month) for preset in batch
+                ])
+                Transaction.objects.bulk_create(transactions)
+                apply_transactions([(tx, 1) for tx in transactions])
+                apply_item_usage([(tx, 1) for tx in transactions])
+                # bulk_create 는 신호를 발생시키지 않으므로 캐시된 리포트를 직접 무효화
+                for owner_id in {preset.owner_id for preset in batch}:
+                    bump_ledger_version(owner_id)
+        except IntegrityError:
+            return False
+        return True
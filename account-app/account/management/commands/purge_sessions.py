@@ -0,0 +1,38 @@
+# account/management/commands/purge_sessions.py
+
+import time
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = ('만료된 세션 행을 batch 단위로 나눠 지웁니다. (cron 용) '
+            'clearsessions 는 DELETE 한 번으로 지워 세션이 많으면 테이블을 오래 잡고 있습니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='DELETE 한 번에 지울 세션 수 (기본: 5000)')
+        parser.add_argument('--sleep', type=float, default=0, help='batch 사이에 쉴 초 (기본: 0)')
+        parser.add_argument('--dry-run', action='store_true', help='지우지 않고 만료된 세션 수만 출력')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] <= 0 or options['sleep'] < 0:
+            raise CommandError('--batch-size 는 1 이상, --sleep 은 0 이상이어야 합니다.')
+        if settings.SESSION_ENGINE.endswith('signed_cookies'):
+            self.stdout.write('signed_cookies 세션은 DB 에 저장되지 않으므로 지울 것이 없습니다.')
+            return
+
+        # 실행 중에 만료되는 세션은 다음 실행에서 지운다 (expire_date 인덱스 범위만 읽는다)
+        expired = Session.objects.filter(expire_date__lt=timezone.now())
+        if options['dry_run']:
+            self.stdout.write(f'만료된 세션 {expired.count()}개 (삭제하지 않음).')
+            return
+
+        total = 0
+        while keys := list(expired.values_list('session_key', flat=True)[:options['batch_size']]):
+            deleted, _ = Session.objects.filter(session_key__in=keys).delete()
+            total += deleted
+            if options['sleep']:
+                time.sleep(options['sleep'])
+        self.stdout.write(self.style.SUCCESS(f'만료된 세션 {total}개를 지웠습니다.'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+from account.balances import rebuild_monthly_balances
+from account.items import rebuild_item_usage
+
+class Command(BaseCommand):
+    help = '원장으로부터 월별 계정 잔액 스냅샷과 아이템 자동완성 빈도를 다시 계산합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*', type=str, help='대상 사용자 아이디 (생략 시 전체 사용자)')
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+
+        for user in users:
+            count = rebuild_monthly_balances(user)
+            items = rebuild_item_usage(user)
+            self.stdout.write(self.style.SUCCESS(f"'{user.username}' 사용자의 스냅샷 {count}건, 아이템 {items}건을 다시 계산했습니다."))
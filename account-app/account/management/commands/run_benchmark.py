@@ -0,0 +1,165 @@
+# account/management/commands/run_benchmark.py
+
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from account.models import Account, Transaction, TransactionPreset
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def rss_mb():
+    """현재 RSS (리눅스 /proc 기준). 없으면 최대 RSS 로 대신한다."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize() / 2**20
+    except OSError:
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    # ru_maxrss 단위: 리눅스는 KB, macOS 는 byte
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+class Command(BaseCommand):
+    help = ('테스트 클라이언트로 각 화면(GET)을 여러 번 요청해 지연 시간 백분위, 요청당 쿼리 수, RSS 를 JSON 으로 출력합니다. '
+            '커밋별 결과를 --compare 로 비교합니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', default='bench_0', help='측정할 사용자 (기본: seed_benchmark_data 의 bench_0)')
+        parser.add_argument('--repeat', type=int, default=20, help='화면별 측정 횟수 (기본: 20)')
+        parser.add_argument('--warmup', type=int, default=2, help='측정 전 버릴 요청 수 (기본: 2)')
+        parser.add_argument('--cold', action='store_true', help='요청마다 리포트 캐시를 비워 캐시 없는 경로를 잰다')
+        parser.add_argument('--label', default='', help='결과 JSON 에 남길 이름 (기본: 현재 커밋)')
+        parser.add_argument('--output', default='', help='결과 JSON 파일 경로 (기본: 표준출력)')
+        parser.add_argument('--compare', default='', help='이전 결과 JSON 과 p50/쿼리 수를 비교해 출력')
+
+    def handle(self, *args, **options):
+        if options['repeat'] <= 0 or options['warmup'] < 0:
+            raise CommandError('--repeat 는 1 이상, --warmup 은 0 이상이어야 합니다.')
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"'{options['username']}' 사용자가 없습니다. seed_benchmark_data 로 먼저 만드세요.")
+
+        commit = git_commit()
+        report = {
+            'label': options['label'] or commit, 'commit': commit, 'database': connection.vendor,
+            'username': user.username, 'transactions': Transaction.objects.filter(owner=user).count(),
+            'repeat': options['repeat'], 'cold': options['cold'],
+            'session_engine': settings.SESSION_ENGINE.rsplit('.', 1)[-1],
+            'auth_user_cache_timeout': getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 0), 'views': {},
+        }
+        rss_start = rss_mb()
+        client = Client()
+        client.force_login(user)
+        # 테스트 클라이언트의 Host(testserver) 허용
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for name, url in self.targets(user):
+                report['views'][name] = self.measure(client, url, options)
+                result = report['views'][name]
+                self.stderr.write(f"{name:<28} p50 {result['p50_ms']:>8} ms  p99 {result['p99_ms']:>8} ms  쿼리 {result['queries']:>3}")
+        report['rss_mb'] = {'start': round(rss_start, 1), 'end': round(rss_mb(), 1), 'peak': round(peak_rss_mb(), 1)}
+
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f"결과를 {options['output']} 에 저장했습니다."))
+        else:
+            self.stdout.write(output)
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as file:
+                self.compare(json.load(file), report)
+
+    def targets(self, user):
+        """(이름, URL) 목록. 사용자 데이터가 필요한 화면은 첫 번째 객체로 요청한다."""
+        today = date.today()
+        expense = Account.objects.filter(owner=user, type='비용').order_by('pk').first()
+        tx = Transaction.objects.filter(owner=user).order_by('pk').first()
+        preset = TransactionPreset.objects.filter(owner=user).order_by('pk').first()
+        targets = [
+            ('index', reverse('account:index')),
+            ('transaction_create', reverse('account:transaction_create')),
+            ('transaction_list', reverse('account:transaction_list')),
+            ('transaction_list_year', f"{reverse('account:transaction_list')}?year={today.year}"),
+            ('transaction_export', reverse('account:transaction_export')),
+            ('asset_status', reverse('account:asset_status')),
+            ('asset_status_chart_1y', reverse('account:asset_status_chart')),
+            ('asset_status_chart_10y_day', f"{reverse('account:asset_status_chart')}?range=10Y&granularity=day"),
+            ('budget_view', reverse('account:budget_view')),
+            ('reports', reverse('account:reports')),
+            ('budget_trend_60', f"{reverse('account:budget_trend')}?months=60"),
+            ('settings', reverse('account:settings')),
+        ]
+        if expense:
+            targets += [
+                ('transaction_list_account', f"{reverse('account:transaction_list')}?account={expense.pk}&year={today.year}"),
+                ('account_update', reverse('account:account_update', kwargs={'pk': expense.pk})),
+            ]
+        if tx:
+            targets.append(('transaction_update', reverse('account:transaction_update', kwargs={'pk': tx.pk})))
+        if preset:
+            targets.append(('preset_update', reverse('account:preset_update', kwargs={'pk': preset.pk})))
+        return targets
+
+    def measure(self, client, url, options):
+        latencies, queries, size, status = [], [], 0, 0
+        for i in range(options['warmup'] + options['repeat']):
+            if options['cold']:
+                cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                response = client.get(url)
+                body = b''.join(response.streaming_content) if response.streaming else response.content
+                elapsed = (time.perf_counter() - started) * 1000
+            if i < options['warmup']:
+                continue
+            latencies.append(elapsed)
+            queries.append(len(ctx.captured_queries))
+            size, status = len(body), response.status_code
+        return {
+            'p50_ms': round(statistics.median(latencies), 2),
+            'p90_ms': round(percentile(latencies, 90), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'max_ms': round(max(latencies), 2),
+            'queries': max(queries),
+            'status': status,
+            'bytes': size,
+        }
+
+    def compare(self, baseline, report):
+        self.stderr.write(f"\n{baseline.get('label')} -> {report['label']}")
+        for name, result in report['views'].items():
+            before = baseline.get('views', {}).get(name)
+            if not before:
+                continue
+            change = (result['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100 if before['p50_ms'] else 0
+            self.stderr.write(
+                f"{name:<28} p50 {before['p50_ms']:>8} -> {result['p50_ms']:>8} ms ({change:+.0f}%)  "
+                f"쿼리 {before['queries']:>3} -> {result['queries']:>3}"
+            )
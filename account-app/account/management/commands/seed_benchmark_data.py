@@ -0,0 +1,193 @@
+# account/management/commands/seed_benchmark_data.py
+
+import random
+import time
+from collections import defaultdict
+from datetime import date
+from itertools import islice
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from account.models import Account, Budget, InstallmentPlan, Transaction, TransactionPreset
+from account.balances import rebuild_monthly_balances
+from account.items import rebuild_item_usage
+from account.cache import bump_ledger_version
+from account.ledger_io import copy_transactions
+from account.signals import signals_suspended
+
+# (계정, 계좌명, 유형) - signup_view 의 기본 계정 + 카드/통장
+BASE_ACCOUNTS = [
+    ('순자산', '기초잔액', 'GENERAL'), ('자산', '현금', 'VARIABLE'), ('자산', '통장', 'VARIABLE'),
+    ('자산', '적금', 'SAVING'), ('부채', '신용카드', 'VARIABLE'), ('부채', '체크카드', 'VARIABLE'),
+    ('수익', '급여', 'FIXED'), ('수익', '부수입', 'VARIABLE'),
+]
+EXPENSE_NAMES = ['식비', '교통비', '통신비', '주거비', '보험료', '의료비', '교육비', '문화생활', '의류', '경조사', '생활용품', '여행']
+FIXED_EXPENSES = {'통신비', '주거비', '보험료', '교육비'}
+INSTALLMENT_MONTHS = [2, 3, 6, 10, 12, 24]
+
+
+class Command(BaseCommand):
+    help = '성능 측정용 가상 사용자/계정/거래(할부, 체크카드 자동출금, 카드대금 상환 포함)를 대량으로 만듭니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10, help='만들 사용자 수 (기본: 10)')
+        parser.add_argument('--accounts', type=int, default=12, help='사용자별 비용 계정 수 (기본: 12)')
+        parser.add_argument('--years', type=int, default=3, help='거래를 만들 기간(년, 올해까지) (기본: 3)')
+        parser.add_argument('--tx-per-month', type=int, default=80, help='사용자별 월 평균 지출 거래 수 (기본: 80)')
+        parser.add_argument('--prefix', default='bench', help='사용자 이름 접두사. <prefix>_0, <prefix>_1 ... (기본: bench)')
+        parser.add_argument('--password', default='bench', help='생성한 사용자의 비밀번호 (기본: bench)')
+        parser.add_argument('--seed', type=int, default=0, help='난수 시드. 같은 값이면 같은 데이터를 만든다 (기본: 0)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='한 번에 넣을 거래 수 (기본: 5000)')
+        parser.add_argument('--copy', action='store_true', help='PostgreSQL COPY FROM STDIN 으로 적재 (가장 빠름)')
+        parser.add_argument('--reset', action='store_true', help='같은 접두사의 기존 사용자를 먼저 삭제')
+
+    def handle(self, *args, **options):
+        if min(options['users'], options['years'], options['batch_size']) <= 0 or options['accounts'] < 0:
+            raise CommandError('--users, --years, --batch-size 는 1 이상, --accounts 는 0 이상이어야 합니다.')
+        if options['copy'] and connection.vendor != 'postgresql':
+            raise CommandError('--copy 는 PostgreSQL 에서만 사용할 수 있습니다.')
+
+        prefix = options['prefix']
+        if options['reset']:
+            self.reset(prefix)
+        elif User.objects.filter(username__startswith=f'{prefix}_').exists():
+            raise CommandError(f"'{prefix}_' 사용자가 이미 있습니다. --reset 으로 지우거나 다른 --prefix 를 쓰세요.")
+
+        insert = copy_transactions if options['copy'] else Transaction.objects.bulk_create
+        end = date.today().replace(day=1)
+        start = end - relativedelta(years=options['years'] - 1, months=end.month - 1)
+        started = time.perf_counter()
+        total = 0
+        for n in range(options['users']):
+            rng = random.Random(f"{options['seed']}:{n}")
+            user = User.objects.create_user(f'{prefix}_{n}', password=options['password'])
+            with transaction.atomic():
+                accounts = self.create_accounts(user, options['accounts'])
+                rows = self.ledger(user, accounts, start, end, options['tx_per_month'], rng)
+                while batch := list(islice(rows, options['batch_size'])):
+                    insert(batch)
+                    total += len(batch)
+                self.create_budgets_and_presets(user, accounts, start, end, rng)
+            # bulk_create/COPY 는 신호를 발생시키지 않으므로 사용자별로 스냅샷, 아이템 사용 빈도, 원장 버전을 맞춘다
+            rebuild_monthly_balances(user)
+            rebuild_item_usage(user)
+            bump_ledger_version(user, accounts=True)
+            self.stdout.write(f'  {user.username}: 누적 {total:,}건')
+
+        elapsed = time.perf_counter() - started
+        rate = total / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"사용자 {options['users']}명, 거래 {total:,}건 생성 ({start:%Y-%m} ~ {end:%Y-%m}, {elapsed:.1f}초, 초당 {rate:,.0f}건)"
+        ))
+
+    def reset(self, prefix):
+        users = User.objects.filter(username__startswith=f'{prefix}_')
+        # 거래가 계정을 PROTECT 하므로 먼저 지운다. 스냅샷은 사용자와 함께 지워지므로 신호 처리는 생략
+        with signals_suspended():
+            Transaction.objects.filter(owner__in=users).delete()
+        InstallmentPlan.objects.filter(owner__in=users).delete()
+        users.delete()
+
+    def create_accounts(self, user, expense_count):
+        expenses = [
+            (name, 'FIXED' if name in FIXED_EXPENSES else 'VARIABLE')
+            for name in (EXPENSE_NAMES[i] if i < len(EXPENSE_NAMES) else f'비용{i + 1}' for i in range(expense_count))
+        ]
+        Account.objects.bulk_create(
+            [Account(owner=user, type=type_, name=name, category=category) for type_, name, category in BASE_ACCOUNTS]
+            + [Account(owner=user, type='비용', name=name, category=category) for name, category in expenses]
+        )
+        return {account.name: account for account in Account.objects.filter(owner=user)}
+
+    def ledger(self, user, accounts, start, end, tx_per_month, rng):
+        """월 단위로 거래를 하나씩 만든다. 할부 계획은 만들어질 때 바로 저장해 회차 거래가 id 를 가리키게 한다."""
+        cash, bank, saving = accounts['현금'], accounts['통장'], accounts['적금']
+        credit_card, check_card = accounts['신용카드'], accounts['체크카드']
+        fixed = [a for a in accounts.values() if a.type == '비용' and a.category == 'FIXED']
+        variable = [a for a in accounts.values() if a.type == '비용' and a.category == 'VARIABLE'] or fixed
+        salary = rng.randrange(250, 600) * 10000
+
+        def tx(day, item, amount, debit, credit, memo='', is_repayment=False, plan=None):
+            return Transaction(
+                owner=user, date=day, item=item, memo=memo, amount=amount, debit_account=debit,
+                credit_account=credit, is_repayment=is_repayment, installment_plan=plan,
+            )
+
+        card_bills = defaultdict(int)  # (연, 월) -> 신용카드 사용액 (할부 회차 포함)
+        yield tx(start, '기초잔액', salary * 3, bank, accounts['기초잔액'])
+        period = start
+        while period <= end:
+            days = (period + relativedelta(months=1) - period).days
+            cash_spent = 0
+            # 14일에 지난달 카드대금 상환
+            previous = period - relativedelta(months=1)
+            if (bill := card_bills.pop((previous.year, previous.month), 0)) and period.replace(day=14) <= date.today():
+                yield tx(period.replace(day=14), '신용카드 대금', bill, credit_card, bank, is_repayment=True)
+            yield tx(period.replace(day=min(25, days)), '급여', salary, bank, accounts['급여'])
+            if rng.random() < 0.3:
+                yield tx(period.replace(day=rng.randint(1, days)), '부수입', rng.randrange(5, 50) * 10000, cash, accounts['부수입'])
+            yield tx(period.replace(day=min(10, days)), '적금 납입', salary // 10, saving, bank)
+            for account in fixed:
+                yield tx(period.replace(day=rng.randint(1, 28)), account.name, rng.randrange(3, 30) * 10000, account, bank)
+
+            if variable and rng.random() < 0.35:
+                months = rng.choice(INSTALLMENT_MONTHS)
+                total = rng.randrange(30, 300) * 10000
+                first = period.replace(day=rng.randint(1, 28))
+                debit = rng.choice(variable)
+                plan = InstallmentPlan.objects.create(
+                    owner=user, item=f'{debit.name} 할부', total_amount=total, months=months, start_date=first,
+                    debit_account=debit, credit_account=credit_card,
+                )
+                for i in range(months):
+                    day = first + relativedelta(months=i)
+                    card_bills[(day.year, day.month)] += round(total / months)
+                    yield tx(day, plan.item, round(total / months), debit, credit_card,
+                             memo=f'{plan.item} ({i + 1}/{months}회차)', plan=plan)
+
+            for _ in range(max(0, int(rng.gauss(tx_per_month, tx_per_month / 5)))):
+                day = period.replace(day=rng.randint(1, days))
+                debit = rng.choice(variable)
+                amount = rng.randrange(1, 200) * 500
+                payment = rng.random()
+                if payment < 0.5:
+                    card_bills[(day.year, day.month)] += amount
+                    yield tx(day, debit.name, amount, debit, credit_card)
+                elif payment < 0.8:
+                    # transaction_create 와 같이 체크카드 결제는 현금 자동출금 거래를 함께 만든다
+                    cash_spent += amount
+                    yield tx(day, debit.name, amount, debit, check_card)
+                    yield tx(day, debit.name, amount, check_card, cash, memo='체크카드 자동출금')
+                else:
+                    cash_spent += amount
+                    yield tx(day, debit.name, amount, debit, cash)
+
+            # 월말에 쓴 만큼 통장에서 현금으로 옮긴다
+            if cash_spent:
+                yield tx(period.replace(day=days), 'ATM 출금', cash_spent, cash, bank)
+            period += relativedelta(months=1)
+
+    def create_budgets_and_presets(self, user, accounts, start, end, rng):
+        expenses = [a for a in accounts.values() if a.type == '비용']
+        budgets = []
+        period = start
+        while period <= end:
+            budgets += [
+                Budget(owner=user, account=account, year=period.year, month=period.month, amount=rng.randrange(10, 100) * 10000)
+                for account in expenses
+            ]
+            period += relativedelta(months=1)
+        Budget.objects.bulk_create(budgets)
+        TransactionPreset.objects.bulk_create(
+            [
+                TransactionPreset(owner=user, name=account.name, preset_type='FIXED', item=account.name,
+                                  amount=rng.randrange(3, 30) * 10000, day_of_month=rng.randint(1, 28),
+                                  debit_account=account, credit_account=accounts['통장'])
+                for account in expenses if account.category == 'FIXED'
+            ] + [
+                TransactionPreset(owner=user, name=f'{account.name} (자주)', preset_type='FREQUENT', item=account.name,
+                                  debit_account=account, credit_account=accounts['체크카드'])
+                for account in expenses if account.category == 'VARIABLE'
+            ]
+        )
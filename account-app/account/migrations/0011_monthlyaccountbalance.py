@@ -0,0 +1,61 @@
+# Generated by Django 5.0.6 on 2026-10-17 20:43
+
+import django.db.models.deletion
+from django.conf import settings
+from collections import defaultdict
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def populate_monthly_balances(apps, schema_editor):
+    # 기존 원장으로부터 월별 스냅샷 초기 데이터 생성
+    Transaction = apps.get_model('account', 'Transaction')
+    MonthlyAccountBalance = apps.get_model('account', 'MonthlyAccountBalance')
+
+    totals = defaultdict(lambda: [Decimal(0), Decimal(0)])
+    ledger = Transaction.objects.annotate(year=ExtractYear('date'), month=ExtractMonth('date'))
+    for row in ledger.values('owner_id', 'debit_account_id', 'year', 'month').annotate(total=Sum('amount')).order_by():
+        totals[(row['owner_id'], row['debit_account_id'], row['year'], row['month'])][0] += row['total']
+    for row in ledger.values('owner_id', 'credit_account_id', 'year', 'month').annotate(total=Sum('amount')).order_by():
+        totals[(row['owner_id'], row['credit_account_id'], row['year'], row['month'])][1] += row['total']
+
+    rows = []
+    closing = defaultdict(Decimal)
+    for (owner_id, account_id, year, month), (debit, credit) in sorted(totals.items()):
+        closing[account_id] += debit - credit
+        rows.append(MonthlyAccountBalance(
+            owner_id=owner_id, account_id=account_id, year=year, month=month,
+            debit_total=debit, credit_total=credit, closing_balance=closing[account_id],
+        ))
+    MonthlyAccountBalance.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0010_transaction_is_repayment'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyAccountBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField(verbose_name='연도')),
+                ('month', models.IntegerField(verbose_name='월')),
+                ('debit_total', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='월 차변 합계')),
+                ('credit_total', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='월 대변 합계')),
+                ('closing_balance', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='월말 누적 잔액')),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_balances', to='account.account', verbose_name='계정')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='소유자')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['owner', 'year', 'month'], name='monthly_balance_owner_period')],
+                'unique_together': {('account', 'year', 'month')},
+            },
+        ),
+        migrations.RunPython(populate_monthly_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.0.6 on 2026-10-17 20:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+# 큰 거래 테이블에서 쓰기를 막지 않도록 PostgreSQL 에서는 CONCURRENTLY 로 만들기 때문에 트랜잭션 밖에서 실행한다.
+# (0017_transaction_search_indexes 와 같은 방식. 모델 상태는 AddIndex 로 기록한다)
+INDEXES = [
+    ('transaction', models.Index(fields=['owner', 'date', 'created_at'], name='tx_owner_date_created')),
+    ('transaction', models.Index(fields=['debit_account', 'date'], include=('amount',), name='tx_debit_date_amount')),
+    ('transaction', models.Index(fields=['credit_account', 'date'], include=('amount',), name='tx_credit_date_amount')),
+    ('transaction', models.Index(fields=['owner', '-created_at'], name='tx_owner_recent')),
+    ('transaction', models.Index(condition=models.Q(('is_repayment', True)), fields=['owner', 'date'], name='tx_owner_repayment')),
+    ('transactionpreset', models.Index(fields=['owner', 'preset_type'], name='preset_owner_type')),
+]
+
+
+def create_indexes(apps, schema_editor):
+    concurrently = schema_editor.connection.vendor == 'postgresql'
+    for model_name, index in INDEXES:
+        model = apps.get_model('account', model_name)
+        if concurrently:
+            # 중단된 이전 실행이 남긴 INVALID 인덱스를 지우고 다시 만든다
+            schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {schema_editor.quote_name(index.name)}')
+            schema_editor.add_index(model, index, concurrently=True)
+        else:
+            schema_editor.add_index(model, index)
+
+
+def drop_indexes(apps, schema_editor):
+    concurrently = schema_editor.connection.vendor == 'postgresql'
+    for model_name, index in INDEXES:
+        model = apps.get_model('account', model_name)
+        if concurrently:
+            schema_editor.remove_index(model, index, concurrently=True)
+        else:
+            schema_editor.remove_index(model, index)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('account', '0011_monthlyaccountbalance'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(create_indexes, drop_indexes)],
+            state_operations=[
+                migrations.AddIndex(model_name=model_name, index=index) for model_name, index in INDEXES
+            ],
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.6 on 2026-10-17 20:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0012_transaction_indexes'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerVersion',
+            fields=[
+                ('owner', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='ledger_version', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='소유자')),
+                ('version', models.BigIntegerField(default=0, verbose_name='버전')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='마지막 변경 시각')),
+            ],
+        ),
+    ]
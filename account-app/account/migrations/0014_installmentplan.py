@@ -0,0 +1,36 @@
+# Generated by Django 5.0.6 on 2026-10-17 20:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0013_ledgerversion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InstallmentPlan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item', models.CharField(max_length=100, verbose_name='아이템')),
+                ('total_amount', models.DecimalField(decimal_places=0, max_digits=12, verbose_name='총 금액')),
+                ('months', models.PositiveIntegerField(verbose_name='할부 개월수')),
+                ('start_date', models.DateField(verbose_name='첫 회차 날짜')),
+                ('is_repayment', models.BooleanField(default=False, verbose_name='부채상환 거래')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('credit_account', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='credit_installment_plans', to='account.account', verbose_name='대변 계정')),
+                ('debit_account', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='debit_installment_plans', to='account.account', verbose_name='차변 계정')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='소유자')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='installment_plan',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='installments', to='account.installmentplan', verbose_name='할부 계획'),
+        ),
+    ]
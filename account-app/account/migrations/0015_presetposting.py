@@ -0,0 +1,27 @@
+# Generated by Django 5.0.6 on 2026-10-17 20:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0014_installmentplan'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PresetPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField(verbose_name='연도')),
+                ('month', models.IntegerField(verbose_name='월')),
+                ('posted_at', models.DateTimeField(auto_now_add=True, verbose_name='입력 시각')),
+                ('preset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='postings', to='account.transactionpreset', verbose_name='프리셋')),
+            ],
+            options={
+                'unique_together': {('preset', 'year', 'month')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-17 21:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0015_presetposting'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ledgerversion',
+            name='accounts_version',
+            field=models.BigIntegerField(default=0, verbose_name='계정 버전'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations
+
+# 거래 검색 인덱스 (PostgreSQL 전용, 다른 DB 에서는 아무것도 하지 않는다)
+# - tx_item_trgm / tx_memo_trgm: icontains 가 만드는 UPPER("item"::text) LIKE '%...%' 를 pg_trgm GIN 인덱스로 찾는다.
+# - tx_search_vector: to_tsvector('simple', COALESCE(item, '') || ' ' || COALESCE(memo, '')) GIN 인덱스 (단어 접두어 검색).
+#   식은 이 파일에 그대로 적어 둔다. account.search.search_vector() 를 바꾸면 새 마이그레이션으로 인덱스를 다시 만든다.
+# 큰 거래 테이블에서 쓰기를 막지 않도록 CONCURRENTLY 로 만들기 때문에 트랜잭션 밖에서 실행한다.
+SEARCH_INDEXES = ('tx_item_trgm', 'tx_memo_trgm', 'tx_search_vector')
+
+
+def search_indexes():
+    from django.contrib.postgres.indexes import GinIndex, OpClass
+    from django.contrib.postgres.search import SearchVector
+    from django.db.models import TextField
+    from django.db.models.functions import Cast, Upper
+
+    return [
+        GinIndex(OpClass(Upper(Cast('item', TextField())), name='gin_trgm_ops'), name='tx_item_trgm'),
+        GinIndex(OpClass(Upper(Cast('memo', TextField())), name='gin_trgm_ops'), name='tx_memo_trgm'),
+        GinIndex(SearchVector('item', 'memo', config='simple'), name='tx_search_vector'),
+    ]
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    Transaction = apps.get_model('account', 'Transaction')
+    for index in search_indexes():
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {schema_editor.quote_name(index.name)}')
+        schema_editor.add_index(Transaction, index, concurrently=True)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in SEARCH_INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {schema_editor.quote_name(name)}')
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('account', '0016_ledgerversion_accounts_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.0.6 on 2026-10-17 21:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+
+
+def populate_item_usage(apps, schema_editor):
+    # 기존 원장으로부터 아이템 사용 빈도 초기 데이터 생성
+    Transaction = apps.get_model('account', 'Transaction')
+    ItemUsage = apps.get_model('account', 'ItemUsage')
+
+    latest = Transaction.objects.filter(
+        owner_id=OuterRef('owner_id'), item=OuterRef('item'),
+        debit_account_id=OuterRef('debit_account_id'), credit_account_id=OuterRef('credit_account_id'),
+    ).order_by('-date', '-created_at').values('amount')[:1]
+    groups = Transaction.objects.exclude(item='').values('owner_id', 'item', 'debit_account_id', 'credit_account_id').annotate(
+        count=Count('pk'), last_used=Max('date'), last_amount=Subquery(latest),
+    ).order_by()
+    ItemUsage.objects.bulk_create([ItemUsage(**group) for group in groups.iterator(chunk_size=2000)], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0017_transaction_search_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item', models.CharField(max_length=100, verbose_name='아이템')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='거래 수')),
+                ('last_used', models.DateField(verbose_name='마지막 거래일')),
+                ('last_amount', models.DecimalField(decimal_places=0, max_digits=12, verbose_name='마지막 금액')),
+                ('credit_account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='account.account', verbose_name='대변 계정')),
+                ('debit_account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='account.account', verbose_name='차변 계정')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='소유자')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['owner', 'item'], name='item_usage_owner_prefix', opclasses=['int4_ops', 'varchar_pattern_ops'])],
+                'unique_together': {('owner', 'item', 'debit_account', 'credit_account')},
+            },
+        ),
+        migrations.RunPython(populate_item_usage, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.6 on 2026-10-17 22:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0018_itemusage'),
+    ]
+
+    operations = [
+        # 기존 거래는 마이그레이션 시각으로 채운다 (상수 기본값이라 PostgreSQL 11+ 에서 테이블을 다시 쓰지 않는다)
+        migrations.AddField(
+            model_name='transaction',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='수정 시각'),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.6 on 2026-10-17 21:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0019_transaction_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='installmentplan',
+            name='credit_account',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='credit_installment_plans', to='account.account', verbose_name='대변 계정'),
+        ),
+        migrations.AlterField(
+            model_name='installmentplan',
+            name='debit_account',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='debit_installment_plans', to='account.account', verbose_name='차변 계정'),
+        ),
+    ]
@@ -37,6 +37,23 @@ class Account(models.Model):
     class Meta:
         unique_together = ('owner', 'name')    
 
+class InstallmentPlan(models.Model):
+    """할부 거래 묶음. 회차별 Transaction 이 installment_plan 으로 이 계획을 가리킨다."""
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="소유자")
+    item = models.CharField(max_length=100, verbose_name="아이템")
+    total_amount = models.DecimalField(max_digits=12, decimal_places=0, verbose_name="총 금액")
+    months = models.PositiveIntegerField(verbose_name="할부 개월수")
+    start_date = models.DateField(verbose_name="첫 회차 날짜")
+    # 계정은 회차 거래가 PROTECT 로 지킨다. 회차가 모두 지워진 뒤 계정을 지우면 계획도 함께 지운다
+    debit_account = models.ForeignKey(Account, related_name='debit_installment_plans', on_delete=models.CASCADE, verbose_name="차변 계정")
+    credit_account = models.ForeignKey(Account, related_name='credit_installment_plans', on_delete=models.CASCADE, verbose_name="대변 계정")
+    is_repayment = models.BooleanField(default=False, verbose_name="부채상환 거래")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.item} ({self.months}개월, {self.total_amount})"
+
+
 class Transaction(models.Model):
     date = models.DateField(default=timezone.now, verbose_name="날짜")
     item = models.CharField(max_length=100, verbose_name="아이템")
@@ -47,13 +64,27 @@ class Transaction(models.Model):
     credit_account = models.ForeignKey(Account, related_name='credits', on_delete=models.PROTECT, verbose_name="대변 계정")
     
     is_repayment = models.BooleanField(default=False, verbose_name="부채상환 거래")
+    installment_plan = models.ForeignKey(InstallmentPlan, related_name='installments', on_delete=models.SET_NULL, null=True, blank=True, verbose_name="할부 계획")
 
     created_at = models.DateTimeField(auto_now_add=True)
+    # 마지막 수정 시각. QuerySet.update() 로 바꿀 때는 직접 넣어야 한다
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="수정 시각")
     owner = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="소유자")
 
     class Meta:
         # ▼▼▼▼▼ [수정됨] 기본 정렬 순서를 날짜 내림차순, 생성일 내림차순으로 지정 ▼▼▼▼▼
         ordering = ['-date', '-created_at']
+        indexes = [
+            # 사용자별 기간 조회 (거래내역, 월별 리포트)
+            models.Index(fields=['owner', 'date', 'created_at'], name='tx_owner_date_created'),
+            # 계정별 기간 이전 합계 (기초잔액, 원장 집계) - amount 포함으로 index-only scan
+            models.Index(fields=['debit_account', 'date'], include=['amount'], name='tx_debit_date_amount'),
+            models.Index(fields=['credit_account', 'date'], include=['amount'], name='tx_credit_date_amount'),
+            # 최근 입력 내역 (transaction_create)
+            models.Index(fields=['owner', '-created_at'], name='tx_owner_recent'),
+            # 부채상환 거래만 대상으로 하는 부분 인덱스
+            models.Index(fields=['owner', 'date'], condition=models.Q(is_repayment=True), name='tx_owner_repayment'),
+        ]
 
     def __str__(self):
         return f"{self.date} | {self.item} | {self.amount}"
@@ -75,9 +106,27 @@ class TransactionPreset(models.Model):
     
     day_of_month = models.IntegerField(null=True, blank=True, verbose_name="고정 일자 (예: 25)")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'preset_type'], name='preset_owner_type'),
+        ]
+
     def __str__(self):
         return f"[{self.get_preset_type_display()}] {self.name}"   
 
+class PresetPosting(models.Model):
+    """고정항목 자동입력 기록. (프리셋, 연, 월) 당 한 번만 거래를 만들도록 하는 표식이다."""
+    preset = models.ForeignKey(TransactionPreset, related_name='postings', on_delete=models.CASCADE, verbose_name="프리셋")
+    year = models.IntegerField(verbose_name="연도")
+    month = models.IntegerField(verbose_name="월")
+    posted_at = models.DateTimeField(auto_now_add=True, verbose_name="입력 시각")
+
+    class Meta:
+        unique_together = ('preset', 'year', 'month')
+
+    def __str__(self):
+        return f"{self.year}년 {self.month}월 - {self.preset.name}"
+
 class Budget(models.Model):
     owner = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="소유자")
     account = models.ForeignKey(Account, on_delete=models.CASCADE, limit_choices_to={'type': '비용'}, verbose_name="비용 계정")
@@ -90,3 +139,67 @@ class Budget(models.Model):
 
     def __str__(self):
         return f"{self.year}년 {self.month}월 - {self.account.name}: {self.amount}"
+
+
+class MonthlyAccountBalance(models.Model):
+    """계정별 월간 잔액 스냅샷. Transaction 저장/삭제 시 signals.py 에서 갱신된다.
+
+    closing_balance 는 해당 월말까지의 누적 (차변 - 대변) 값이다.
+    부채/수익/순자산 계정은 부호를 뒤집어 읽어야 한다.
+    """
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="소유자")
+    account = models.ForeignKey(Account, related_name='monthly_balances', on_delete=models.CASCADE, verbose_name="계정")
+    year = models.IntegerField(verbose_name="연도")
+    month = models.IntegerField(verbose_name="월")
+    debit_total = models.DecimalField(max_digits=14, decimal_places=0, default=0, verbose_name="월 차변 합계")
+    credit_total = models.DecimalField(max_digits=14, decimal_places=0, default=0, verbose_name="월 대변 합계")
+    closing_balance = models.DecimalField(max_digits=14, decimal_places=0, default=0, verbose_name="월말 누적 잔액")
+
+    class Meta:
+        unique_together = ('account', 'year', 'month')
+        indexes = [
+            models.Index(fields=['owner', 'year', 'month'], name='monthly_balance_owner_period'),
+        ]
+
+    def __str__(self):
+        return f"{self.year}년 {self.month}월 - {self.account.name}: {self.closing_balance}"
+
+
+class ItemUsage(models.Model):
+    """아이템 자동완성용 사용 빈도. (사용자, 아이템, 차변, 대변) 별 거래 수와 마지막 사용일/금액.
+
+    Transaction 저장/삭제 시 signals.py 에서 증분 갱신되고, 대량 작업 후에는 items.rebuild_item_usage 로 다시 만든다.
+    """
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="소유자")
+    item = models.CharField(max_length=100, verbose_name="아이템")
+    debit_account = models.ForeignKey(Account, related_name='+', on_delete=models.CASCADE, verbose_name="차변 계정")
+    credit_account = models.ForeignKey(Account, related_name='+', on_delete=models.CASCADE, verbose_name="대변 계정")
+    count = models.PositiveIntegerField(default=0, verbose_name="거래 수")
+    last_used = models.DateField(verbose_name="마지막 거래일")
+    last_amount = models.DecimalField(max_digits=12, decimal_places=0, verbose_name="마지막 금액")
+
+    class Meta:
+        unique_together = ('owner', 'item', 'debit_account', 'credit_account')
+        indexes = [
+            # 접두어 검색 (item LIKE '...%'). PostgreSQL 은 varchar_pattern_ops 여야 로케일과 무관하게 인덱스를 탄다
+            models.Index(fields=['owner', 'item'], opclasses=['int4_ops', 'varchar_pattern_ops'], name='item_usage_owner_prefix'),
+        ]
+
+    def __str__(self):
+        return f"{self.item} ({self.count})"
+
+
+class LedgerVersion(models.Model):
+    """사용자 원장(거래/계정/예산)의 변경 카운터. 변경될 때마다 version 이 증가한다.
+
+    리포트 캐시 키에 포함되어, 값이 바뀌면 이전에 계산된 리포트가 자동으로 무효화된다.
+    사용자 삭제 시 연쇄 삭제되는 거래의 신호가 다시 행을 만들 수 있으므로 FK 제약은 두지 않는다.
+    """
+    owner = models.OneToOneField(User, on_delete=models.DO_NOTHING, db_constraint=False, primary_key=True, related_name='ledger_version', verbose_name="소유자")
+    version = models.BigIntegerField(default=0, verbose_name="버전")
+    # 계정이 추가/수정/삭제될 때만 증가. 거래 입력 화면의 계정 목록 캐시 키에 쓴다
+    accounts_version = models.BigIntegerField(default=0, verbose_name="계정 버전")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="마지막 변경 시각")
+
+    def __str__(self):
+        return f"{self.owner} v{self.version}"
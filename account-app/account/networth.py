@@ -0,0 +1,144 @@
+# account/networth.py
+
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from dateutil.relativedelta import relativedelta
+from django.db import connection
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+from .models import Account, MonthlyAccountBalance, Transaction
+
+# 순자산 = 자산/부채 계정의 누적 (차변 - 대변) 합계 (부채는 음수로 쌓인다)
+NET_WORTH_TYPES = ('자산', '부채')
+RANGES = {
+    '1M': relativedelta(months=1), '3M': relativedelta(months=3), '6M': relativedelta(months=6),
+    '1Y': relativedelta(years=1), '3Y': relativedelta(years=3), '5Y': relativedelta(years=5), '10Y': relativedelta(years=10),
+}
+DEFAULT_RANGE = '1Y'
+GRANULARITIES = {'day': relativedelta(days=1), 'week': relativedelta(weeks=1), 'month': relativedelta(months=1)}
+MAX_POINTS = 400  # 이보다 많으면 서버에서 줄여 보낸다 (차트 폭보다 많은 점은 보이지 않는다)
+
+
+def default_granularity(start, end):
+    days = (end - start).days
+    if days <= 93:
+        return 'day'
+    return 'week' if days <= 731 else 'month'
+
+
+def bucket_start(day, granularity):
+    """날짜가 속한 구간의 첫날 (주는 월요일 시작, PostgreSQL date_trunc 와 같다)."""
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def _opening_balance(owner_id, first):
+    # first 가 속한 달 이전의 마지막 스냅샷 월말 잔액 합계
+    rows = MonthlyAccountBalance.objects.filter(
+        owner_id=owner_id, account__type__in=NET_WORTH_TYPES,
+    ).filter(
+        Q(year__lt=first.year) | Q(year=first.year, month__lt=first.month)
+    ).order_by('account_id', '-year', '-month').values_list('account_id', 'closing_balance')
+    latest = {}
+    for account_id, closing in rows:
+        latest.setdefault(account_id, closing)
+    return sum(latest.values(), Decimal(0))
+
+
+def _series_portable(owner_id, start, end, granularity):
+    first = start.replace(day=1)
+    opening = _opening_balance(owner_id, first)
+    daily = Transaction.objects.filter(owner_id=owner_id, date__gte=first, date__lte=end).values('date').annotate(
+        debit=Coalesce(Sum('amount', filter=Q(debit_account__type__in=NET_WORTH_TYPES)), Decimal(0)),
+        credit=Coalesce(Sum('amount', filter=Q(credit_account__type__in=NET_WORTH_TYPES)), Decimal(0)),
+    ).order_by()
+    deltas = defaultdict(Decimal)
+    for row in daily:
+        deltas[bucket_start(row['date'], granularity)] += row['debit'] - row['credit']
+
+    series, balance = [], opening
+    bucket, step = bucket_start(first, granularity), GRANULARITIES[granularity]
+    while bucket <= end:
+        balance += deltas.get(bucket, Decimal(0))
+        series.append((bucket, balance))
+        bucket += step
+    return series
+
+
+_POSTGRES_SQL = """
+WITH opening AS (
+    SELECT COALESCE(SUM(latest.closing_balance), 0) AS balance FROM (
+        SELECT DISTINCT ON (s.account_id) s.closing_balance
+        FROM {snapshot} s JOIN {account} a ON a.id = s.account_id
+        WHERE s.owner_id = %(owner)s AND a.type = ANY(%(types)s) AND (s.year, s.month) < (%(year)s, %(month)s)
+        ORDER BY s.account_id, s.year DESC, s.month DESC
+    ) latest
+), deltas AS (
+    SELECT date_trunc(%(unit)s, t.date::timestamp)::date AS bucket,
+           SUM(CASE WHEN d.type = ANY(%(types)s) THEN t.amount ELSE 0 END)
+           - SUM(CASE WHEN c.type = ANY(%(types)s) THEN t.amount ELSE 0 END) AS delta
+    FROM {transaction} t
+    JOIN {account} d ON d.id = t.debit_account_id
+    JOIN {account} c ON c.id = t.credit_account_id
+    WHERE t.owner_id = %(owner)s AND t.date >= %(first)s AND t.date <= %(end)s
+    GROUP BY 1
+)
+SELECT series.bucket::date, (SELECT balance FROM opening) + SUM(COALESCE(deltas.delta, 0)) OVER (ORDER BY series.bucket)
+FROM generate_series(date_trunc(%(unit)s, %(first)s::timestamp), %(end)s::timestamp, %(step)s::interval) AS series(bucket)
+LEFT JOIN deltas ON deltas.bucket = series.bucket::date
+ORDER BY series.bucket
+"""
+
+
+def _series_postgres(owner_id, start, end, granularity):
+    # 구간 생성(generate_series) + 구간별 증감 + 누적 합계(window)를 쿼리 한 번으로 계산
+    first = start.replace(day=1)
+    sql = _POSTGRES_SQL.format(
+        snapshot=MonthlyAccountBalance._meta.db_table, account=Account._meta.db_table, transaction=Transaction._meta.db_table,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {
+            'owner': owner_id, 'types': list(NET_WORTH_TYPES), 'year': first.year, 'month': first.month,
+            'unit': granularity, 'step': f'1 {granularity}', 'first': first, 'end': end,
+        })
+        return [(bucket, Decimal(balance)) for bucket, balance in cursor.fetchall()]
+
+
+def net_worth_points(owner, start, end, granularity):
+    """start~end 의 구간별 구간말 순자산 [(구간 첫날, 순자산), ...]. end 이후(미래) 거래는 포함하지 않는다.
+
+    시작 잔액은 월별 스냅샷에서, 이후 증감은 거래 원장에서 읽는다.
+    PostgreSQL 은 generate_series + window 쿼리 한 번, 그 밖의 DB 는 일별 합계를 읽어 파이썬에서 누적한다.
+    """
+    owner_id = getattr(owner, 'pk', owner)
+    compute = _series_postgres if connection.vendor == 'postgresql' else _series_portable
+    first_bucket = bucket_start(start, granularity)
+    return [point for point in compute(owner_id, start, end, granularity) if point[0] >= first_bucket]
+
+
+def downsample(points, max_points=MAX_POINTS):
+    """Largest-Triangle-Three-Buckets. 처음과 끝 점을 유지하고 급등락 지점을 남기며 max_points 개로 줄인다."""
+    if len(points) <= max_points or max_points < 3:
+        return points
+    values = [float(value) for _, value in points]
+    every = (len(points) - 2) / (max_points - 2)
+    sampled, selected = [points[0]], 0
+    for i in range(max_points - 2):
+        bucket_from, bucket_to = int(i * every) + 1, int((i + 1) * every) + 1
+        # 다음 구간의 평균점
+        next_from, next_to = bucket_to, min(int((i + 2) * every) + 1, len(points))
+        avg_x = (next_from + next_to - 1) / 2
+        avg_y = sum(values[next_from:next_to]) / (next_to - next_from)
+        best, best_area = bucket_from, -1
+        for j in range(bucket_from, bucket_to):
+            area = abs((selected - avg_x) * (values[j] - values[selected]) - (selected - j) * (avg_y - values[selected]))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(points[best])
+        selected = best
+    sampled.append(points[-1])
+    return sampled
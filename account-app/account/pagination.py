@@ -0,0 +1,36 @@
+# account/pagination.py
+
+import base64
+import binascii
+from datetime import date, datetime
+from django.db.models import Q
+
+# 거래 목록은 (-date, -created_at, -id) 순서로 정렬하고, 마지막 행의 키를 ?after= 토큰으로 넘긴다.
+KEYSET_ORDERING = ('-date', '-created_at', '-id')
+
+
+def encode_cursor(tx):
+    raw = f"{tx.date.isoformat()}|{tx.created_at.isoformat()}|{tx.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """토큰을 (date, created_at, id) 로 복원한다. 형식이 잘못되면 None (첫 페이지)."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        date_str, created_str, pk_str = raw.split('|')
+        return date.fromisoformat(date_str), datetime.fromisoformat(created_str), int(pk_str)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def after_cursor(cursor):
+    """정렬 순서상 커서 행보다 뒤(더 오래된)에 오는 거래 조건."""
+    cursor_date, cursor_created, cursor_pk = cursor
+    return (
+        Q(date__lt=cursor_date)
+        | Q(date=cursor_date, created_at__lt=cursor_created)
+        | Q(date=cursor_date, created_at=cursor_created, pk__lt=cursor_pk)
+    )
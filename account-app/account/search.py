@@ -0,0 +1,44 @@
+# account/search.py
+
+import re
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db import connection
+from django.db.models import Q
+
+SEARCH_CONFIG = 'simple'  # 형태소 분석 없이 공백 단위 (한국어 포함)
+SEARCH_FIELDS = ('item', 'memo')
+TRIGRAM_MIN_LENGTH = 3  # pg_trgm 은 3글자 미만 검색어를 인덱스로 찾지 못한다
+_TSQUERY_SPECIAL = re.compile(r"[&|!():*'\\<>\s]+")
+
+
+def search_vector():
+    """0017_transaction_search_indexes 의 tx_search_vector 인덱스와 같은 식. (바꾸면 새 마이그레이션으로 인덱스도 다시 만들어야 한다)"""
+    return SearchVector(*SEARCH_FIELDS, config=SEARCH_CONFIG)
+
+
+def _prefix_query(terms):
+    # 각 단어를 접두어로 찾고 모두 포함해야 한다: '쿠팡':* & '배송':*
+    return SearchQuery(' & '.join(f"'{term}':*" for term in terms), config=SEARCH_CONFIG, search_type='raw')
+
+
+def search_transactions(transactions, text):
+    """아이템/메모 통합 검색. 공백으로 나뉜 단어가 모두 (아이템 또는 메모에) 들어 있는 거래를 찾는다.
+
+    PostgreSQL: tsvector GIN 인덱스로 단어 접두어를 찾고, 검색어 전체가 3글자 이상이면
+    pg_trgm GIN 인덱스로 부분 문자열 일치도 함께 찾는다 (두 인덱스의 BitmapOr).
+    그 밖의 DB: 단어별 icontains (순차 검색).
+    """
+    terms = [term for term in _TSQUERY_SPECIAL.split(text) if term]
+    if not terms:
+        return transactions
+
+    if connection.vendor != 'postgresql':
+        for term in terms:
+            transactions = transactions.filter(Q(item__icontains=term) | Q(memo__icontains=term))
+        return transactions
+
+    condition = Q(search_vector=_prefix_query(terms))
+    phrase = text.strip()
+    if len(phrase) >= TRIGRAM_MIN_LENGTH:
+        condition |= Q(item__icontains=phrase) | Q(memo__icontains=phrase)
+    return transactions.annotate(search_vector=search_vector()).filter(condition)
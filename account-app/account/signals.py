@@ -0,0 +1,89 @@
+# account/signals.py
+
+import threading
+from contextlib import contextmanager
+from django.contrib.auth.models import User
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Transaction, Account, Budget, InstallmentPlan
+from .balances import apply_transactions
+from .items import apply_item_usage
+from .cache import bump_ledger_version
+from .auth import forget_user
+
+_state = threading.local()
+
+
+@contextmanager
+def signals_suspended():
+    """대량 작업 중에는 거래 단위 신호 처리를 건너뛴다.
+
+    작업 후 rebuild_monthly_balances, rebuild_item_usage, bump_ledger_version 을 직접 호출해야 한다.
+    """
+    previous = getattr(_state, 'suspended', False)
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = previous
+
+
+def _suspended():
+    return getattr(_state, 'suspended', False)
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_previous_transaction(sender, instance, raw=False, **kwargs):
+    # 수정 시 이전 금액/계정/날짜/아이템을 되돌리기 위해 저장 전 값을 보관
+    instance._previous = None
+    if raw or _suspended() or instance.pk is None:
+        return
+    instance._previous = Transaction.objects.filter(pk=instance.pk).only(
+        'owner', 'date', 'item', 'amount', 'debit_account', 'credit_account'
+    ).first()
+
+
+@receiver(post_save, sender=Transaction)
+def update_balances_on_save(sender, instance, raw=False, **kwargs):
+    if raw or _suspended():
+        return
+    if isinstance(instance.date, str):
+        # 문자열 날짜로 생성된 경우 DB 값으로 정규화
+        instance.refresh_from_db(fields=['date'])
+    entries = [(instance, 1)]
+    previous = getattr(instance, '_previous', None)
+    if previous is not None:
+        entries.append((previous, -1))
+    apply_transactions(entries)
+    apply_item_usage(entries)
+
+
+@receiver(post_delete, sender=Transaction)
+def update_balances_on_delete(sender, instance, **kwargs):
+    if _suspended():
+        return
+    apply_transactions([(instance, -1)])
+    apply_item_usage([(instance, -1)])
+    if instance.installment_plan_id:
+        # 마지막 회차가 지워지면 빈 할부 계획도 지운다
+        InstallmentPlan.objects.filter(pk=instance.installment_plan_id, installments__isnull=True).delete()
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+@receiver(post_save, sender=Budget)
+@receiver(post_delete, sender=Budget)
+def invalidate_reports(sender, instance, raw=False, **kwargs):
+    # 원장 버전을 올려 캐시된 리포트를 무효화
+    if raw or _suspended():
+        return
+    bump_ledger_version(instance.owner_id, accounts=sender is Account)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    # 비밀번호/활성 상태/last_login 이 바뀌면 CachedModelBackend 의 캐시를 지운다
+    forget_user(instance.pk)
@@ -1,3 +1,1206 @@
-from django.test import TestCase
+import base64
+import csv
+import json
+import os
+import random
+import tempfile
+import threading
+from datetime import date, timedelta
+from dateutil.relativedelta import relativedelta
+from decimal import Decimal
+from io import StringIO
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Q, Sum
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse, get_resolver
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+from .models import (Account, Transaction, InstallmentPlan, ItemUsage, LedgerVersion, MonthlyAccountBalance, PresetPosting,
+                     TransactionPreset, Budget)
+from .installments import cancel_remaining_installments, create_installment_plan, update_remaining_installments
+from .balances import rebuild_monthly_balances
+from .ledger import account_totals, budget_vs_actual
+from .cache import bump_ledger_version
+from .items import rebuild_item_usage, suggest_items
+from .networth import MAX_POINTS, downsample, net_worth_points
+from .instrumentation import RequestMetrics
+from .management.commands.post_fixed_presets import Command as PostFixedPresets
 
-# Create your tests here.
+
+class MonthlyFilterSqlTests(TestCase):
+    """월별 화면은 date__year/date__month(EXTRACT) 대신 [1일, 다음 달 1일) 범위 조건을 써야 한다."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='pw')
+        cash = Account.objects.create(owner=cls.user, type='자산', name='현금', category='VARIABLE')
+        food = Account.objects.create(owner=cls.user, type='비용', name='식비', category='VARIABLE')
+        salary = Account.objects.create(owner=cls.user, type='수익', name='급여', category='FIXED')
+        Transaction.objects.create(owner=cls.user, date=date(2025, 3, 25), item='급여', amount=3000000,
+                                   debit_account=cash, credit_account=salary)
+        Transaction.objects.create(owner=cls.user, date=date(2025, 3, 31), item='점심', amount=12000,
+                                   debit_account=food, credit_account=cash)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_monthly_views_do_not_extract_date_parts(self):
+        for name in ['account:asset_status', 'account:budget_view', 'account:reports', 'account:transaction_list']:
+            with self.subTest(view=name):
+                with CaptureQueriesContext(connection) as ctx:
+                    response = self.client.get(reverse(name), {'year': 2025, 'month': 3})
+                self.assertEqual(response.status_code, 200)
+                for query in ctx.captured_queries:
+                    self.assertNotIn('extract', query['sql'].lower())
+
+    def test_month_boundaries_are_half_open(self):
+        response = self.client.get(reverse('account:asset_status'), {'year': 2025, 'month': 3})
+        self.assertEqual(response.context['monthly_income'], 3000000)
+        self.assertEqual(response.context['monthly_expense'], 12000)
+
+        response = self.client.get(reverse('account:asset_status'), {'year': 2025, 'month': 4})
+        self.assertEqual(response.context['monthly_expense'], 0)
+
+
+class AccountTotalsTests(TestCase):
+    """account_totals 는 여러 기준일의 계정별 (차변, 대변) 합계를 쿼리 한 번으로 구한다."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = seed_ledger('tester', expense_accounts=3, transactions=300, years=1, seed=3)
+
+    def test_matches_python_sums_for_every_cutoff(self):
+        today = date.today()
+        cutoffs = [today - timedelta(days=200), today - timedelta(days=30), today + timedelta(days=1)]
+        since = today - timedelta(days=300)
+        with self.assertNumQueries(1):
+            totals = account_totals(self.user, cutoffs=cutoffs, since=since)
+
+        ledger = list(Transaction.objects.filter(owner=self.user, date__gte=since))
+        for account in Account.objects.filter(owner=self.user):
+            for key in [None, *cutoffs]:
+                rows = [tx for tx in ledger if key is None or tx.date < key]
+                expected = (sum(tx.amount for tx in rows if tx.debit_account_id == account.pk),
+                            sum(tx.amount for tx in rows if tx.credit_account_id == account.pk))
+                got = totals.get(account.pk, {}).get(key, (0, 0))
+                self.assertEqual(got, expected, (account.name, key))
+
+        cash = Account.objects.get(owner=self.user, name='현금')
+        self.assertEqual(set(account_totals(self.user, cutoffs=cutoffs, account_ids=[cash.pk])), {cash.pk})
+        self.assertEqual(account_totals(self.user, account_ids=[]), {})
+
+
+class MonthlyBalanceSignalTests(TestCase):
+    """거래 수정/삭제 신호로 증분 반영한 월별 스냅샷은 원장 전체를 다시 계산한 결과와 같아야 한다."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='pw')
+        cls.cash = Account.objects.create(owner=cls.user, type='자산', name='현금', category='VARIABLE')
+        cls.bank = Account.objects.create(owner=cls.user, type='자산', name='통장', category='VARIABLE')
+        cls.food = Account.objects.create(owner=cls.user, type='비용', name='식비', category='VARIABLE')
+        cls.taxi = Account.objects.create(owner=cls.user, type='비용', name='교통비', category='VARIABLE')
+        salary = Account.objects.create(owner=cls.user, type='수익', name='급여', category='VARIABLE')
+        for month in range(1, 5):
+            Transaction.objects.create(owner=cls.user, date=date(2025, month, 25), item='급여', amount=3000000,
+                                       debit_account=cls.bank, credit_account=salary)
+            Transaction.objects.create(owner=cls.user, date=date(2025, month, 3), item='점심', amount=9000 * month,
+                                       debit_account=cls.food, credit_account=cls.cash)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def snapshot(self):
+        # 되돌린 달에 남는 빈 행(이월 잔액만 있음)은 다시 계산하면 만들어지지 않으므로 비교에서 뺀다
+        rows = MonthlyAccountBalance.objects.exclude(debit_total=0, credit_total=0)
+        return sorted(rows.values_list('account_id', 'year', 'month', 'debit_total', 'credit_total', 'closing_balance'))
+
+    def test_edit_across_month_and_accounts_then_delete_matches_rebuild(self):
+        moved = Transaction.objects.get(item='점심', date=date(2025, 1, 3))
+        response = self.client.post(reverse('account:transaction_update', args=[moved.pk]), {
+            'date': '2025-03-15', 'item': '택시', 'memo': '', 'amount': '12000',
+            'debit_account': self.taxi.pk, 'credit_account': self.bank.pk,
+        })
+        self.assertEqual(response.status_code, 302)
+        deleted = Transaction.objects.get(item='점심', date=date(2025, 2, 3))
+        self.client.post(reverse('account:transaction_delete', args=[deleted.pk]))
+
+        # 빈 행을 포함한 모든 행의 이월 잔액도 맞아야 한다 (차변 - 대변 누계)
+        for row in MonthlyAccountBalance.objects.all():
+            ledger = Transaction.objects.filter(date__lt=date(row.year, row.month, 1) + relativedelta(months=1))
+            debit = ledger.filter(debit_account=row.account_id).aggregate(total=Sum('amount'))['total'] or 0
+            credit = ledger.filter(credit_account=row.account_id).aggregate(total=Sum('amount'))['total'] or 0
+            self.assertEqual(row.closing_balance, debit - credit, (row.account_id, row.year, row.month))
+        self.assertFalse(MonthlyAccountBalance.objects.filter(account=self.food, month=1).exclude(debit_total=0).exists())
+        self.assertTrue(MonthlyAccountBalance.objects.filter(account=self.taxi, month=3, debit_total=12000).exists())
+
+        incremental = self.snapshot()
+        rebuild_monthly_balances(self.user)
+        self.assertEqual(incremental, self.snapshot())
+
+
+class InstallmentPlanTests(TestCase):
+    """'아이템//N' 할부 입력은 계획 하나와 N개 회차를 한 번에 만들고, 스냅샷도 함께 맞춰야 한다."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='pw')
+        cls.card = Account.objects.create(owner=cls.user, type='부채', name='신용카드', category='VARIABLE')
+        cls.goods = Account.objects.create(owner=cls.user, type='비용', name='가전', category='VARIABLE')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def snapshot(self):
+        # 회차를 되돌린 달에 남는 빈 행(이월 잔액만 있음)은 다시 계산하면 만들어지지 않으므로 비교에서 뺀다
+        rows = MonthlyAccountBalance.objects.exclude(debit_total=0, credit_total=0)
+        return sorted(rows.values_list('account_id', 'year', 'month', 'debit_total', 'credit_total', 'closing_balance'))
+
+    def test_installments_are_created_in_bulk_and_linked(self):
+        self.client.post(reverse('account:transaction_create'), {
+            'date': '2025-11-10', 'item': '냉장고//12', 'memo': '', 'amount': '1200000',
+            'debit_account': self.goods.pk, 'credit_account': self.card.pk,
+        })
+        plan = InstallmentPlan.objects.get()
+        installments = plan.installments.order_by('date')
+        self.assertEqual(installments.count(), 12)
+        self.assertEqual(installments.first().date, date(2025, 11, 10))
+        self.assertEqual(installments.last().date, date(2026, 10, 10))
+        self.assertEqual(installments.last().memo, '냉장고 (12/12회차)')
+
+        incremental = self.snapshot()
+        rebuild_monthly_balances(self.user)
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_invalid_installment_count_creates_nothing(self):
+        self.client.post(reverse('account:transaction_create'), {
+            'date': '2025-11-10', 'item': '냉장고//0', 'memo': '', 'amount': '1200000',
+            'debit_account': self.goods.pk, 'credit_account': self.card.pk,
+        })
+        self.assertFalse(Transaction.objects.exists())
+        self.assertFalse(InstallmentPlan.objects.exists())
+
+    def test_cancel_remaining_installments(self):
+        self.client.post(reverse('account:transaction_create'), {
+            'date': '2025-01-05', 'item': '노트북//6', 'memo': '', 'amount': '600000',
+            'debit_account': self.goods.pk, 'credit_account': self.card.pk,
+        })
+        plan = InstallmentPlan.objects.get()
+        self.assertEqual(cancel_remaining_installments(plan, date(2025, 4, 1)), 3)
+        self.assertEqual(plan.installments.count(), 3)
+
+        incremental = self.snapshot()
+        rebuild_monthly_balances(self.user)
+        self.assertEqual(incremental, self.snapshot())
+
+        usage = ItemUsage.objects.get(item='노트북')
+        self.assertEqual((usage.count, usage.last_used), (3, date(2025, 3, 5)))
+
+        # 남은 회차를 모두 취소하면 계획도 지운다
+        self.assertEqual(cancel_remaining_installments(plan, date(2025, 1, 1)), 3)
+        self.assertFalse(InstallmentPlan.objects.exists())
+        self.assertFalse(ItemUsage.objects.exists())
+
+    def test_update_remaining_installments(self):
+        plan = create_installment_plan(self.user, '노트북', 600000, 6, date(2025, 1, 5), self.goods, self.card)
+        check = Account.objects.create(owner=self.user, type='자산', name='체크카드', category='VARIABLE')
+        other = Account.objects.create(owner=self.user, type='비용', name='기타', category='VARIABLE')
+        # 4월부터 남은 3회차를 금액/계정을 바꿔 8개월로 늘린다
+        self.assertEqual(update_remaining_installments(
+            plan, date(2025, 4, 1), amount=Decimal(80000), months=8, debit_account=other, credit_account=check,
+        ), 5)
+        installments = list(plan.installments.order_by('date'))
+        self.assertEqual(len(installments), 8)
+        self.assertEqual([tx.amount for tx in installments], [100000] * 3 + [80000] * 5)
+        self.assertEqual({tx.debit_account_id for tx in installments[3:]}, {other.pk})
+        self.assertEqual({tx.credit_account_id for tx in installments[:3]}, {self.card.pk})
+        self.assertEqual(installments[-1].date, date(2025, 8, 5))
+        plan.refresh_from_db()
+        self.assertEqual((plan.months, plan.total_amount, plan.credit_account_id), (8, 700000, check.pk))
+
+        incremental = self.snapshot()
+        rebuild_monthly_balances(self.user)
+        self.assertEqual(incremental, self.snapshot())
+
+        # 다시 5개월로 줄이면 뒤 회차를 지운다. 이미 지난 회차보다 줄일 수는 없다
+        self.assertEqual(update_remaining_installments(plan, date(2025, 4, 1), months=5), 5)
+        self.assertEqual(plan.installments.count(), 5)
+        with self.assertRaises(ValueError):
+            update_remaining_installments(plan, date(2025, 4, 1), months=2)
+        incremental = self.snapshot()
+        rebuild_monthly_balances(self.user)
+        self.assertEqual(incremental, self.snapshot())
+        usage = ItemUsage.objects.order_by('last_used').values_list('debit_account', 'count', 'last_used')
+        self.assertEqual(list(usage), [(self.goods.pk, 3, date(2025, 3, 5)), (other.pk, 2, date(2025, 5, 5))])
+
+    def test_deleting_last_installment_removes_plan(self):
+        plan = create_installment_plan(self.user, 'TV', 200000, 2, date(2025, 1, 5), self.goods, self.card)
+        first, last = plan.installments.order_by('date')
+        first.delete()
+        self.assertTrue(InstallmentPlan.objects.exists())
+        last.delete()
+        self.assertFalse(InstallmentPlan.objects.exists())
+
+    def test_accounts_with_plans_can_be_deleted(self):
+        plan = create_installment_plan(self.user, 'TV', 200000, 2, date(2025, 1, 5), self.goods, self.card)
+        other = Account.objects.create(owner=self.user, type='비용', name='기타', category='VARIABLE')
+        InstallmentPlan.objects.create(owner=self.user, item='빈 계획', total_amount=1000, months=1, start_date=date(2025, 1, 1),
+                                       debit_account=other, credit_account=self.card)
+        response = self.client.post(reverse('account:account_delete', args=[other.pk]))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(list(InstallmentPlan.objects.all()), [plan])
+
+        call_command('delete_all_data', stdout=StringIO())
+        self.assertFalse(Account.objects.exists())
+        self.assertFalse(InstallmentPlan.objects.exists())
+
+
+class TransactionExportTests(TestCase):
+    """export/ 는 거래내역 검색 조건을 그대로 받아 import_data 열 구성의 CSV 를 스트리밍한다."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='pw')
+        cash = Account.objects.create(owner=cls.user, type='자산', name='현금', category='VARIABLE')
+        food = Account.objects.create(owner=cls.user, type='비용', name='식비', category='VARIABLE')
+        Transaction.objects.create(owner=cls.user, date=date(2025, 3, 2), item='점심', memo='회사 앞', amount=9000,
+                                   debit_account=food, credit_account=cash)
+        Transaction.objects.create(owner=cls.user, date=date(2025, 4, 2), item='저녁', amount=15000,
+                                   debit_account=food, credit_account=cash)
+
+    def test_export_streams_filtered_rows(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('account:transaction_export'), {'year': 2025, 'month': 3})
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines, ['거래일,항목,메모,금액,차변계정명,대변계정명', '2025-03-02,점심,회사 앞,9000,식비,현금'])
+
+    async def test_asgi_export_streams_in_chunks(self):
+        # ASGI 에서 sync iterator 를 넘기면 Django 가 전체를 list 로 버퍼링하므로 async iterator 여야 한다
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('account:transaction_export'), {'year': 2025, 'month': 4})
+        self.assertTrue(response.is_async)
+        lines = b''.join([chunk async for chunk in response.streaming_content]).decode().splitlines()
+        self.assertEqual(lines, ['거래일,항목,메모,금액,차변계정명,대변계정명', '2025-04-02,저녁,,15000,식비,현금'])
+
+
+class TransactionListPaginationTests(TestCase):
+    """list/ 는 ?after= 커서로 페이지를 나누고, 자산/부채 계정 필터의 잔액은 페이지가 바뀌어도 이어져야 한다."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='pw')
+        cls.bank = Account.objects.create(owner=cls.user, type='자산', name='통장', category='VARIABLE')
+        cls.card = Account.objects.create(owner=cls.user, type='부채', name='신용카드', category='VARIABLE')
+        food = Account.objects.create(owner=cls.user, type='비용', name='식비', category='VARIABLE')
+        salary = Account.objects.create(owner=cls.user, type='수익', name='급여', category='VARIABLE')
+        legs = [(cls.bank, salary), (food, cls.bank), (food, cls.card), (cls.card, cls.bank)]
+        rng = random.Random(3)
+        # 기간 앞(2024년) 거래는 기초 잔액으로만 잡힌다. 하루 7건씩이라 같은 날짜 거래가 페이지 경계(100건)에 걸친다
+        rows = [(date(2024, 12, 1) + timedelta(days=i // 7), legs[rng.randrange(4)], rng.randrange(1, 500) * 100) for i in range(600)]
+        Transaction.objects.bulk_create([
+            Transaction(owner=cls.user, date=tx_date, item=f'거래{i}', amount=amount, debit_account=debit, credit_account=credit)
+            for i, (tx_date, (debit, credit), amount) in enumerate(rows)
+        ])
+        # 절반은 created_at 까지 같게 해서 id 로만 순서가 갈리게 한다
+        same = Transaction.objects.filter(owner=cls.user).order_by('id')[:300].values_list('id', flat=True)
+        Transaction.objects.filter(id__in=list(same)).update(created_at=timezone.now())
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def walk(self, **params):
+        """첫 페이지부터 next_query 를 따라가며 (pk 목록, 잔액 목록, 페이지 수) 를 모은다."""
+        params = {'start_date': '2025-01-01', 'end_date': '2025-12-31', **params}
+        pks, balances, pages = [], [], 0
+        query = None
+        while True:
+            response = self.client.get(reverse('account:transaction_list') + (f'?{query}' if query else ''), None if query else params)
+            pages += 1
+            page = response.context['transactions']
+            pks += [tx.pk for tx in page]
+            balances += [getattr(tx, 'balance', None) for tx in page]
+            query = response.context['next_query']
+            if not query:
+                return pks, balances, pages
+
+    def expected(self, account=None):
+        ledger = Transaction.objects.filter(owner=self.user, date__gte=date(2025, 1, 1))
+        if account:
+            ledger = ledger.filter(Q(debit_account=account) | Q(credit_account=account))
+        rows = sorted(ledger.values_list('date', 'created_at', 'id', 'debit_account', 'amount'), reverse=True)
+        return [pk for _, _, pk, _, _ in rows], rows
+
+    def test_pages_cover_every_row_once_in_order(self):
+        pks, _, pages = self.walk()
+        expected, _ = self.expected()
+        self.assertGreater(len(expected), 200)
+        self.assertEqual(pages, -(-len(expected) // 100))
+        self.assertEqual(pks, expected)
+
+    def test_malformed_cursor_falls_back_to_first_page(self):
+        url = reverse('account:transaction_list')
+        params = {'start_date': '2025-01-01', 'end_date': '2025-12-31'}
+        first = [tx.pk for tx in self.client.get(url, params).context['transactions']]
+        bad = base64.urlsafe_b64encode('2025-01-01|어제|1'.encode()).decode()
+        for token in ['!!!', 'bm90LWEtY3Vyc29y', bad]:
+            with self.subTest(token=token):
+                response = self.client.get(url, {**params, 'after': token})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual([tx.pk for tx in response.context['transactions']], first)
+                self.assertIsNone(response.context['first_query'])
+
+    def test_running_balance_continues_across_pages(self):
+        for account, sign in [(self.bank, 1), (self.card, -1)]:
+            with self.subTest(account=account.name):
+                pks, balances, pages = self.walk(account=account.pk)
+                expected, rows = self.expected(account)
+                self.assertGreater(pages, 1)
+                self.assertEqual(pks, expected)
+                opening = sum(
+                    (tx.amount if tx.debit_account_id == account.pk else -tx.amount)
+                    for tx in Transaction.objects.filter(Q(debit_account=account) | Q(credit_account=account), date__lt=date(2025, 1, 1))
+                )
+                running, python_balances = opening, []
+                for _, _, _, debit_id, amount in reversed(rows):
+                    running += amount if debit_id == account.pk else -amount
+                    python_balances.append(sign * running)
+                self.assertEqual(balances, python_balances[::-1])
+
+
+class PostFixedPresetsTests(TestCase):
+    """post_fixed_presets 는 입력일이 지난 고정항목만, (프리셋, 월) 당 한 번씩 입력해야 한다."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='pw')
+        cash = Account.objects.create(owner=cls.user, type='자산', name='현금', category='VARIABLE')
+        rent = Account.objects.create(owner=cls.user, type='비용', name='월세', category='FIXED')
+        for name, day in [('월세', 31), ('통신비', 20)]:
+            TransactionPreset.objects.create(owner=cls.user, name=name, preset_type='FIXED', item=name, amount=10000,
+                                             day_of_month=day, debit_account=rent, credit_account=cash)
+
+    def post(self, *args):
+        call_command('post_fixed_presets', *args, stdout=StringIO())
+
+    def test_posts_due_presets_once(self):
+        self.post('--date', '2025-03-25')
+        self.assertEqual(list(Transaction.objects.values_list('item', 'date')), [('통신비', date(2025, 3, 20))])
+        self.post('--date', '2025-03-25')
+        self.assertEqual(Transaction.objects.count(), 1)
+
+    def test_catch_up_clamps_to_month_end(self):
+        self.post('--date', '2025-03-25', '--since', '2025-01')
+        self.post('--date', '2025-03-25', '--since', '2025-01')
+        dates = sorted(Transaction.objects.filter(item='월세').values_list('date', flat=True))
+        self.assertEqual(dates, [date(2025, 1, 31), date(2025, 2, 28)])
+        self.assertEqual(Transaction.objects.filter(item='통신비').count(), 3)
+        self.assertEqual(MonthlyAccountBalance.objects.get(account__name='월세', year=2025, month=3).closing_balance, 50000)
+
+    def test_skips_presets_entered_by_hand(self):
+        preset = TransactionPreset.objects.get(name='통신비')
+        Transaction.objects.create(owner=self.user, date=date(2025, 3, 18), item='통신비', amount=12000,
+                                   debit_account=preset.debit_account, credit_account=preset.credit_account)
+        self.post('--date', '2025-03-25', '--since', '2025-02')
+        self.assertEqual(sorted(Transaction.objects.values_list('date', 'amount')),
+                         [(date(2025, 2, 20), 10000), (date(2025, 2, 28), 10000), (date(2025, 3, 18), 12000)])
+
+    def test_colliding_batch_rolls_back_and_others_still_post(self):
+        rent, phone = TransactionPreset.objects.get(name='월세'), TransactionPreset.objects.get(name='통신비')
+        period = date(2025, 2, 1)
+        # 다른 실행이 월세 표식을 먼저 넣은 상황
+        PresetPosting.objects.create(preset=rent, year=2025, month=2)
+        command = PostFixedPresets(stdout=StringIO())
+        version = LedgerVersion.objects.get(owner=self.user).version
+        self.assertFalse(command.post([phone, rent], period))
+        self.assertFalse(Transaction.objects.exists())
+        self.assertEqual(LedgerVersion.objects.get(owner=self.user).version, version)
+
+        # 입력된 배치는 바로 원장 버전을 올린다
+        self.assertTrue(command.post([phone], period))
+        self.assertEqual(LedgerVersion.objects.get(owner=self.user).version, version + 1)
+        self.assertEqual(Transaction.objects.get().item, '통신비')
+
+
+class ImportDataTests(TestCase):
+    """import_data 는 CSV 를 한 줄씩 읽어 배치 단위로 넣고, 잘못된 행만 건너뛴 뒤 스냅샷을 다시 계산한다."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='pw')
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write_csv(self, name, rows):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            csv.writer(file).writerows(rows)
+        return path
+
+    def import_data(self, transactions, *args):
+        accounts = self.write_csv('accounts.csv', [['계정', '계좌명'], ['자산', '현금'], ['비용', '식비'], ['수익', '급여']])
+        out = StringIO()
+        call_command('import_data', 'tester', '--accounts', accounts, '--transactions', transactions, *args, stdout=out)
+        return out.getvalue()
+
+    def test_streams_batches_and_skips_bad_rows(self):
+        path = self.write_csv('tx.csv', [
+            ['거래일', '항목', '메모', '금액', '차변계정명', '대변계정명'],
+            ['2025. 1. 25.', '급여', '', '₩3,000,000', '현금', '급여'],
+            ['2025-01-31', '점심', '회사 앞', '9,000', '식비', '현금'],
+            ['2025-02-01', '', '', '12000', '식비', '현금'],  # 빈 아이템도 들어가야 한다
+            ['2025-02-02', '택시', '', '8000', '교통비', '현금'],  # 없는 계정
+            ['2025-02-03', '커피', '', '사천원', '식비', '현금'],  # 금액 형식 오류
+            ['2025-02-04', '저녁', '', '15000', '식비', '현금'],
+        ])
+        out = self.import_data(path, '--batch-size', '2')
+
+        self.assertIn("'교통비' 계정을 찾을 수 없습니다", out)
+        self.assertIn('데이터 형식 오류', out)
+        self.assertIn('거래 내역 4건', out)
+        self.assertEqual(Transaction.objects.filter(owner=self.user).count(), 4)
+        self.assertTrue(Transaction.objects.filter(item='', amount=12000).exists())
+        snapshot = dict(
+            ((name, month), (debit, credit, closing))
+            for name, month, debit, credit, closing in MonthlyAccountBalance.objects.values_list(
+                'account__name', 'month', 'debit_total', 'credit_total', 'closing_balance')
+        )
+        self.assertEqual(snapshot[('현금', 1)], (3000000, 9000, 2991000))
+        self.assertEqual(snapshot[('현금', 2)], (0, 27000, 2964000))
+        self.assertEqual(snapshot[('식비', 2)], (27000, 0, 36000))
+        self.assertEqual(ItemUsage.objects.get(item='저녁').count, 1)
+
+    def test_missing_column_is_reported_before_importing(self):
+        path = self.write_csv('tx.csv', [
+            ['거래일', '항목', '금액', '차변계정명', '대변계정명'],
+            ['2025-01-31', '점심', '9000', '식비', '현금'],
+        ])
+        with self.assertRaisesMessage(CommandError, '메모 열이 없습니다'):
+            self.import_data(path)
+        self.assertFalse(Transaction.objects.exists())
+
+
+@override_settings(
+    REQUEST_METRICS_ENABLED=True, REQUEST_METRICS_SAMPLE_RATE=1.0, REQUEST_METRICS_TOKEN='secret',
+    TEMPLATES=[{**settings.TEMPLATES[0], 'BACKEND': 'account.instrumentation.TimedDjangoTemplates'}],
+)
+class RequestMetricsTests(TestCase):
+    """측정 미들웨어는 Server-Timing 헤더와 /metrics/ 에 뷰 이름별 값을 남긴다."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='pw')
+        Account.objects.create(owner=cls.user, type='자산', name='현금', category='VARIABLE')
+
+    def test_server_timing_and_metrics(self):
+        self.client.force_login(self.user)
+        with self.assertLogs('account.metrics') as logs, CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('account:transaction_list'))
+            self.assertEqual(self.client.get(reverse('account:metrics')).status_code, 404)
+            metrics = self.client.get(reverse('account:metrics'), HTTP_AUTHORIZATION='Bearer secret').content.decode()
+        self.assertIn(f'desc="{len(ctx.captured_queries)} queries"', response['Server-Timing'])
+        logged = json.loads(logs.records[0].getMessage())
+        self.assertEqual(logged['queries'], len(ctx.captured_queries))
+        self.assertGreater(logged['template_ms'], 0)
+        # 뷰 시간은 렌더링을 포함하고 전체 시간 안에 든다
+        self.assertIn('view;dur=', response['Server-Timing'])
+        self.assertGreaterEqual(logged['view_ms'], logged['template_ms'])
+        self.assertLessEqual(logged['view_ms'], logged['duration_ms'])
+
+        self.assertIn('account_http_requests_total{method="GET",status="200",view="account:transaction_list"}', metrics)
+        self.assertIn('account_db_queries_per_request_count{view="account:transaction_list"} 1', metrics)
+        self.assertIn('account_view_duration_seconds_count{view="account:transaction_list"} 1', metrics)
+
+    async def test_async_view_is_timed(self):
+        await self.async_client.aforce_login(self.user)
+        with self.assertLogs('account.metrics') as logs:
+            response = await self.async_client.get(reverse('account:asset_status'))
+        self.assertIn('view;dur=', response['Server-Timing'])
+        self.assertGreater(json.loads(logs.records[0].getMessage())['view_ms'], 0)
+
+    def test_counters_are_safe_across_threads(self):
+        # gather_queries 가 여러 스레드에서 같은 요청의 쿼리를 동시에 기록한다
+        metrics = RequestMetrics()
+        threads = [threading.Thread(target=lambda: [metrics.add_query(0.001) for _ in range(5000)]) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(metrics.queries, 40000)
+        self.assertAlmostEqual(metrics.db_time, 40.0)
+
+
+def seed_ledger(username, expense_accounts=12, transactions=20000, years=3, seed=0):
+    """bulk_create 로 여러 해의 원장(계정/거래/예산/프리셋)을 빠르게 만든다. 스냅샷, 아이템 사용 빈도, 원장 버전도 맞춘다."""
+    rng = random.Random(seed)
+    user = User.objects.create_user(username, password='pw')
+    specs = [
+        ('순자산', '기초잔액', 'GENERAL'), ('자산', '현금', 'VARIABLE'), ('자산', '통장', 'VARIABLE'),
+        ('자산', '적금', 'SAVING'), ('부채', '신용카드', 'VARIABLE'), ('부채', '체크카드', 'VARIABLE'),
+        ('수익', '급여', 'FIXED'), ('수익', '부수입', 'VARIABLE'),
+    ] + [('비용', f'비용{i}', 'FIXED' if i % 3 == 0 else 'VARIABLE') for i in range(expense_accounts)]
+    Account.objects.bulk_create([Account(owner=user, type=t, name=n, category=c) for t, n, c in specs])
+    by_type = {}
+    for account in Account.objects.filter(owner=user):
+        by_type.setdefault(account.type, []).append(account)
+
+    today = date.today()
+    start = today.replace(day=1) - timedelta(days=365 * years)
+    span = (today - start).days + 60  # 미래 거래 일부 포함
+    rows = []
+    for i in range(transactions):
+        kind = rng.random()
+        if kind < 0.6:
+            debit, credit = rng.choice(by_type['비용']), rng.choice(by_type['자산'] + by_type['부채'])
+        elif kind < 0.8:
+            debit, credit = rng.choice(by_type['자산']), rng.choice(by_type['수익'])
+        else:
+            debit, credit = rng.choice(by_type['부채']), rng.choice(by_type['자산'])
+        rows.append(Transaction(
+            owner=user, date=start + timedelta(days=rng.randrange(span)), item=f'아이템{i % 50}', memo='',
+            amount=rng.randint(1, 500) * 100, debit_account=debit, credit_account=credit, is_repayment=kind >= 0.8,
+        ))
+    Transaction.objects.bulk_create(rows, batch_size=2000)
+    Budget.objects.bulk_create([
+        Budget(owner=user, account=account, year=year, month=month, amount=300000)
+        for account in by_type['비용'] for year in (today.year - 1, today.year) for month in range(1, 13)
+    ])
+    TransactionPreset.objects.bulk_create([
+        TransactionPreset(owner=user, name=f'프리셋{i}', preset_type='FIXED' if i % 2 else 'FREQUENT', item=f'프리셋{i}',
+                          amount=10000, day_of_month=i + 1, debit_account=account, credit_account=by_type['자산'][0])
+        for i, account in enumerate(by_type['비용'])
+    ])
+    rebuild_monthly_balances(user)
+    rebuild_item_usage(user)
+    bump_ledger_version(user)
+    return user
+
+
+# 뷰별 쿼리 수 상한 (캐시 없는 첫 요청 기준, 세션/사용자 조회 포함). 데이터 크기와 무관해야 한다.
+QUERY_BUDGETS = {
+    'account:index': 2,
+    'account:login': 0,
+    'account:signup': 0,
+    'account:logout': 4,
+    'account:transaction_create': 7,
+    'account:transaction_list': 8,  # 잔액 열: 계정 조회 + account_totals 기초 잔액
+    'account:transaction_export': 3,
+    'account:item_suggest': 4,
+    'account:transaction_update': 5,
+    'account:transaction_delete': 3,
+    'account:installment_cancel': 0,  # POST 전용: test_installments_do_not_depend_on_ledger_size 에서 원장 크기와 무관한지 확인
+    'account:installment_update': 0,  # POST 전용: 위와 같음
+    'account:asset_status': 7,
+    'account:asset_status_chart': 5,
+    'account:budget_view': 4,
+    'account:budget_bulk': 4,
+    'account:settings': 6,
+    'account:preset_update': 5,
+    'account:preset_delete': 3,
+    'account:account_update': 3,
+    'account:account_delete': 3,
+    'account:metrics': 0,
+    'account:reports': 5,
+    'account:budget_trend': 6,
+}
+# 캐시된 리포트는 세션/사용자/원장 버전 (+ reports 의 예산 입력 폼) 만 조회한다
+CACHED_REPORT_BUDGETS = {'account:asset_status': 3, 'account:asset_status_chart': 3, 'account:budget_view': 3, 'account:reports': 4, 'account:budget_trend': 3}
+
+
+def view_requests(user):
+    """모든 URL 을 한 번씩 요청할 (URL 이름, kwargs, GET 파라미터) 목록과 로그인이 필요 없는 URL 이름."""
+    tx = Transaction.objects.filter(owner=user).first()
+    preset = TransactionPreset.objects.filter(owner=user).first()
+    account = Account.objects.filter(owner=user, type='비용').first()
+    asset = Account.objects.filter(owner=user, type='자산').first()
+    anonymous = {'account:login', 'account:signup', 'account:metrics'}
+    return [
+        ('account:index', {}, {}),
+        ('account:login', {}, {}),
+        ('account:signup', {}, {}),
+        ('account:transaction_create', {}, {}),
+        ('account:transaction_list', {}, {}),
+        ('account:transaction_list', {}, {'account': account.pk, 'year': date.today().year, 'month': date.today().month}),
+        ('account:transaction_list', {}, {'account': asset.pk}),  # 잔액 열 (기초 잔액 + 윈도 누적)
+        ('account:transaction_export', {}, {}),
+        ('account:item_suggest', {}, {'q': '아이템1'}),
+        ('account:transaction_update', {'pk': tx.pk}, {}),
+        ('account:transaction_delete', {'pk': tx.pk}, {}),
+        ('account:asset_status', {}, {}),
+        ('account:asset_status_chart', {}, {'range': '10Y', 'granularity': 'day'}),
+        ('account:budget_view', {}, {}),
+        ('account:budget_bulk', {}, {}),
+        ('account:reports', {}, {}),
+        ('account:budget_trend', {}, {'months': 60}),
+        ('account:settings', {}, {}),
+        ('account:preset_update', {'pk': preset.pk}, {}),
+        ('account:preset_delete', {'pk': preset.pk}, {}),
+        ('account:account_update', {'pk': account.pk}, {}),
+        ('account:account_delete', {'pk': account.pk}, {}),
+        ('account:metrics', {}, {}),
+        ('account:logout', {}, {}),
+    ], anonymous
+
+
+class QueryBudgetTests(TestCase):
+    """모든 URL 의 쿼리 수가 상한 이내이고, 작은 원장과 큰 원장에서 같아야 한다 (계정/월/거래 단위 반복 쿼리 방지)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.small = seed_ledger('small', expense_accounts=2, transactions=50, years=1, seed=1)
+        cls.large = seed_ledger('large', expense_accounts=15, transactions=20000, years=4, seed=2)
+
+    def setUp(self):
+        cache.clear()
+
+    def count_queries(self, user):
+        counts = {}
+        requests, anonymous = view_requests(user)
+        for name, kwargs, params in requests:
+            self.client.logout()
+            if name not in anonymous:
+                self.client.force_login(user)
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(reverse(name, kwargs=kwargs), params)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+            self.assertIn(response.status_code, (200, 302, 404), name)
+            counts[(name, tuple(params))] = len(ctx.captured_queries)
+        return counts
+
+    def test_every_url_has_a_budget(self):
+        names = {f'account:{p.name}' for p in get_resolver('account.urls').url_patterns}
+        self.assertEqual(names, set(QUERY_BUDGETS))
+
+    def test_get_views_stay_within_budget_regardless_of_data_size(self):
+        small = self.count_queries(self.small)
+        cache.clear()
+        large = self.count_queries(self.large)
+        for (name, params), count in large.items():
+            with self.subTest(view=name, params=params):
+                self.assertLessEqual(count, QUERY_BUDGETS[name])
+                self.assertEqual(count, small[(name, params)])
+
+    def test_cached_reports(self):
+        self.client.force_login(self.large)
+        for name, budget in CACHED_REPORT_BUDGETS.items():
+            with self.subTest(view=name):
+                self.client.get(reverse(name))
+                with self.assertNumQueries(budget):
+                    self.client.get(reverse(name))
+
+    def test_installments_do_not_depend_on_ledger_size(self):
+        # 할부 입력/수정/취소는 원장 크기와 관계없이 바뀐 회차만 반영해야 한다 (원장 전체 재계산 금지)
+        created, updated, cancelled = [], [], []
+        for user in (self.small, self.large):
+            self.client.force_login(user)
+            card = Account.objects.get(owner=user, name='신용카드')
+            account = Account.objects.filter(owner=user, type='비용').first()
+            cache.clear()  # 계정 디렉터리 캐시 상태를 같게
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.post(reverse('account:transaction_create'), {
+                    'date': '2035-01-10', 'item': '할부//12', 'memo': '', 'amount': '720000',
+                    'debit_account': account.pk, 'credit_account': card.pk,
+                })
+            created.append(self.statements(ctx))
+            plan = InstallmentPlan.objects.get(owner=user, item='할부')
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.post(reverse('account:installment_update', kwargs={'pk': plan.pk}), {
+                    'amount': '50000', 'months': '18', 'debit_account': '', 'credit_account': '',
+                })
+            updated.append(self.statements(ctx))
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.post(reverse('account:installment_cancel', kwargs={'pk': plan.pk}))
+            cancelled.append(self.statements(ctx))
+        self.assertEqual(created[0], created[1])
+        self.assertEqual(updated[0], updated[1])
+        self.assertEqual(cancelled[0], cancelled[1])
+
+    def statements(self, ctx):
+        # 스냅샷 bulk_create 는 DB 의 파라미터 수 제한에 따라 여러 INSERT 로 나뉠 수 있으므로 한 번으로 센다
+        snapshot_inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "account_monthlyaccountbalance"')]
+        return len(ctx.captured_queries) - len(snapshot_inserts) + min(1, len(snapshot_inserts))
+
+
+class BenchmarkCommandTests(TestCase):
+    """seed_benchmark_data 는 스냅샷이 맞는 원장을 만들고, run_benchmark 는 화면별 측정값을 JSON 으로 남긴다."""
+
+    def test_seed_and_run_benchmark(self):
+        call_command('seed_benchmark_data', '--users', '2', '--years', '2', '--accounts', '6', '--tx-per-month', '10',
+                     stdout=StringIO())
+        user = User.objects.get(username='bench_0')
+        self.assertEqual(User.objects.filter(username__startswith='bench_').count(), 2)
+        self.assertTrue(InstallmentPlan.objects.filter(owner=user).exists())
+        self.assertTrue(Transaction.objects.filter(owner=user, memo='체크카드 자동출금').exists())
+        self.assertTrue(Transaction.objects.filter(owner=user, is_repayment=True).exists())
+        # 체크카드는 자동출금으로 항상 0, 스냅샷은 재계산 결과와 같아야 한다
+        snapshots = sorted(MonthlyAccountBalance.objects.filter(owner=user).values_list('account_id', 'year', 'month', 'closing_balance'))
+        rebuild_monthly_balances(user)
+        self.assertEqual(snapshots, sorted(MonthlyAccountBalance.objects.filter(owner=user).values_list('account_id', 'year', 'month', 'closing_balance')))
+        check_card = Account.objects.get(owner=user, name='체크카드')
+        self.assertFalse(MonthlyAccountBalance.objects.filter(account=check_card).exclude(closing_balance=0).exists())
+
+        out = StringIO()
+        call_command('run_benchmark', '--repeat', '2', '--warmup', '0', '--cold', stdout=out, stderr=StringIO())
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['transactions'], Transaction.objects.filter(owner=user).count())
+        self.assertEqual(report['views']['transaction_list']['status'], 200)
+        self.assertGreater(report['views']['asset_status']['queries'], 0)
+        self.assertIn('peak', report['rss_mb'])
+
+
+class BudgetVsActualTests(TestCase):
+    """budget_vs_actual 은 계정 id 기준으로 예산과 월 실적을 한 번의 쿼리로 돌려준다."""
+
+    def test_budget_and_actual_per_account(self):
+        user = User.objects.create_user('tester', password='pw')
+        cash = Account.objects.create(owner=user, type='자산', name='현금')
+        food = Account.objects.create(owner=user, type='비용', name='식비')
+        rent = Account.objects.create(owner=user, type='비용', name='월세', category='FIXED')
+        salary = Account.objects.create(owner=user, type='수익', name='급여', category='FIXED')
+        Budget.objects.create(owner=user, account=food, year=2024, month=3, amount=100000)
+        Budget.objects.create(owner=user, account=food, year=2024, month=4, amount=999999)
+        for tx_date, amount, debit, credit in [
+            (date(2024, 3, 1), 30000, food, cash), (date(2024, 3, 31), 20000, food, cash),
+            (date(2024, 4, 1), 70000, food, cash), (date(2024, 3, 10), 5000, cash, food),  # 환불은 지출에 넣지 않는다
+            (date(2024, 3, 25), 3000000, cash, salary),
+        ]:
+            Transaction.objects.create(owner=user, date=tx_date, item='x', amount=amount, debit_account=debit, credit_account=credit)
+
+        with self.assertNumQueries(1):
+            rows = budget_vs_actual(user, 2024, 3)
+            values = {pk: (acc.budget_amount, acc.actual) for pk, acc in rows.items()}
+        self.assertEqual(values, {food.pk: (100000, 50000), rent.pk: (0, 0), salary.pk: (0, 3000000)})
+
+        self.client.force_login(user)
+        report = self.client.get(reverse('account:reports'), {'year': 2024, 'month': 3}).context['report_data']
+        self.assertEqual([(r['name'], r['spent'], r['budget'], r['usage_percent']) for r in report],
+                         [('식비', 50000, 100000, 50), ('월세', 0, 0, 0)])
+        response = self.client.get(reverse('account:budget_view'), {'year': 2024, 'month': 3})
+        self.assertEqual((response.context['total_income'], response.context['total_expense']), (3000000, 50000))
+
+
+class BudgetTrendTests(TestCase):
+    """예산 추이는 스냅샷에서 기간 전체를 읽고, 기간 길이와 관계없이 같은 수의 쿼리를 쓴다."""
+
+    def test_trend_window(self):
+        user = User.objects.create_user('tester', password='pw')
+        cash = Account.objects.create(owner=user, type='자산', name='현금')
+        food = Account.objects.create(owner=user, type='비용', name='식비')
+        Budget.objects.create(owner=user, account=food, year=2023, month=12, amount=40000)
+        for tx_date, amount in [(date(2023, 12, 31), 30000), (date(2024, 1, 1), 10000), (date(2022, 12, 5), 99999)]:
+            Transaction.objects.create(owner=user, date=tx_date, item='x', amount=amount, debit_account=food, credit_account=cash)
+        self.client.force_login(user)
+
+        counts = []
+        for months in (12, 60):
+            cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(reverse('account:budget_trend'), {'year': 2024, 'month': 6, 'months': months})
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+        response = self.client.get(reverse('account:budget_trend'), {'year': 2024, 'month': 6, 'months': 12})
+        context = response.context
+        self.assertEqual((context['periods'][0], context['periods'][-1]), (date(2023, 7, 1), date(2024, 6, 1)))
+        row = context['rows'][0]
+        self.assertEqual([cell['spent'] for cell in row['cells']][5:7], [30000, 10000])
+        self.assertEqual((row['spent'], row['budget'], context['total_spent']), (40000, 40000, 40000))
+        # 범위 밖 개월 수는 12~60 으로 제한
+        self.assertEqual(self.client.get(reverse('account:budget_trend'), {'months': 999}).context['months'], 60)
+
+
+class BudgetBulkTests(TestCase):
+    """한 달치 예산은 upsert 한 번으로, 예산 복사는 INSERT ... SELECT 한 번으로 처리한다."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='pw')
+        cls.other = User.objects.create_user('other', password='pw')
+        cls.expenses = [Account.objects.create(owner=cls.user, type='비용', name=f'비용{i}') for i in range(20)]
+        cls.income = Account.objects.create(owner=cls.user, type='수익', name='급여')
+        cls.foreign = Account.objects.create(owner=cls.other, type='비용', name='식비')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def budgets(self, year, month):
+        return dict(Budget.objects.filter(owner=self.user, year=year, month=month).values_list('account_id', 'amount'))
+
+    def test_form_and_json_upsert(self):
+        url = reverse('account:budget_bulk')
+        Budget.objects.create(owner=self.user, account=self.expenses[0], year=2024, month=3, amount=1)
+        Budget.objects.create(owner=self.user, account=self.expenses[1], year=2024, month=3, amount=1)
+        data = {'year': 2024, 'month': 3, **{f'amount_{acc.pk}': '10,000' for acc in self.expenses}}
+        data[f'amount_{self.expenses[1].pk}'] = ''  # 비우면 삭제
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(url, data)
+        self.assertEqual(sum(q['sql'].startswith('INSERT INTO "account_budget"') for q in ctx.captured_queries), 1)
+        budgets = self.budgets(2024, 3)
+        self.assertEqual(len(budgets), 19)
+        self.assertEqual(budgets[self.expenses[0].pk], 10000)
+        self.assertNotIn(self.expenses[1].pk, budgets)
+
+        response = self.client.post(url, {'year': 2024, 'month': 3, 'budgets': {str(self.expenses[2].pk): 500}}, content_type='application/json')
+        self.assertEqual(response.json(), {'year': 2024, 'month': 3, 'saved': 1})
+        self.assertEqual(self.budgets(2024, 3)[self.expenses[2].pk], 500)
+
+        # 다른 사용자/수익 계정, 음수 금액은 전체 거부
+        for budgets in ({str(self.foreign.pk): 1}, {str(self.income.pk): 1}, {str(self.expenses[3].pk): -1}):
+            response = self.client.post(url, {'year': 2024, 'month': 3, 'budgets': budgets}, content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(Budget.objects.filter(account__in=[self.foreign, self.income]).exists())
+
+    def test_copy_budgets_forward_and_last_month(self):
+        for acc in self.expenses[:3]:
+            Budget.objects.create(owner=self.user, account=acc, year=2023, month=12, amount=1000)
+        Budget.objects.create(owner=self.user, account=self.expenses[5], year=2024, month=2, amount=7)  # 대체되어야 함
+        Budget.objects.create(owner=self.other, account=self.foreign, year=2023, month=12, amount=3)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(reverse('account:budget_bulk'), {'year': 2023, 'month': 12, 'copy_months': 3})
+        self.assertEqual(sum(q['sql'].startswith('INSERT INTO "account_budget"') for q in ctx.captured_queries), 1)
+        for year, month in [(2024, 1), (2024, 2), (2024, 3)]:
+            self.assertEqual(self.budgets(year, month), {acc.pk: 1000 for acc in self.expenses[:3]})
+        self.assertEqual(self.budgets(2024, 4), {})
+        self.assertFalse(Budget.objects.filter(owner=self.other, year=2024).exists())
+
+        self.client.post(reverse('account:reports') + '?year=2024&month=5', {'copy_last_month_budget': '1'})
+        self.assertEqual(self.budgets(2024, 5), {})  # 4월 예산이 없으면 그대로
+        self.client.post(reverse('account:reports') + '?year=2024&month=4', {'copy_last_month_budget': '1'})
+        self.assertEqual(self.budgets(2024, 4), {acc.pk: 1000 for acc in self.expenses[:3]})
+
+
+class AccountDirectoryTests(TestCase):
+    """거래 입력/수정 화면은 캐시된 계정 디렉터리를 쓰고, 계정이 바뀌면 즉시 새 목록을 보여준다."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='pw')
+        cls.cash = Account.objects.create(owner=cls.user, type='자산', name='현금')
+        cls.card = Account.objects.create(owner=cls.user, type='부채', name='체크카드')
+        cls.food = Account.objects.create(owner=cls.user, type='비용', name='식비')
+        cls.foreign = Account.objects.create(owner=User.objects.create_user('other', password='pw'), type='비용', name='식비')
+        cls.tx = Transaction.objects.create(owner=cls.user, date=date(2024, 1, 5), item='점심', amount=9000,
+                                            debit_account=cls.food, credit_account=cls.cash)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def account_queries(self, url):
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        return response, [q['sql'] for q in ctx.captured_queries if 'FROM "account_account"' in q['sql']]
+
+    def test_entry_pages_use_cached_directory(self):
+        response, queries = self.account_queries(reverse('account:transaction_create'))
+        self.assertEqual(queries, [])
+        self.assertEqual([acc.name for acc in response.context['debit_accounts']['비용']], ['식비'])
+        _, queries = self.account_queries(reverse('account:transaction_update', kwargs={'pk': self.tx.pk}))
+        self.assertEqual(queries, [])
+
+        Account.objects.create(owner=self.user, type='비용', name='교통비')
+        response = self.client.get(reverse('account:transaction_create'))
+        self.assertEqual([acc.name for acc in response.context['debit_accounts']['비용']], ['교통비', '식비'])
+        self.assertNotIn('비용', response.context['credit_accounts'])
+
+    def test_directory_validates_accounts(self):
+        url = reverse('account:transaction_update', kwargs={'pk': self.tx.pk})
+        data = {'date': '2024-01-05', 'item': '점심', 'memo': '', 'amount': '9000', 'credit_account': self.cash.pk}
+        response = self.client.post(url, {**data, 'debit_account': self.foreign.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('debit_account', response.context['form'].errors)
+        self.client.post(url, {**data, 'debit_account': self.cash.pk, 'credit_account': self.card.pk})
+        self.tx.refresh_from_db()
+        self.assertEqual((self.tx.debit_account, self.tx.credit_account), (self.cash, self.card))
+
+        # 체크카드 결제는 디렉터리의 '현금' 계정으로 자동출금 거래를 만든다
+        create = {'date': '2024-01-06', 'item': '커피', 'memo': '', 'amount': '4500', 'debit_account': self.food.pk, 'credit_account': self.card.pk}
+        self.client.post(reverse('account:transaction_create'), create)
+        self.assertTrue(Transaction.objects.filter(memo='체크카드 자동출금', debit_account=self.card, credit_account=self.cash).exists())
+        response = self.client.post(reverse('account:transaction_create'), {**create, 'debit_account': self.foreign.pk})
+        self.assertEqual(response.status_code, 404)
+
+
+class TransactionSearchTests(TestCase):
+    """거래내역 통합 검색(q)은 단어마다 아이템 또는 메모에서 찾고, 모든 단어가 들어 있어야 한다."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='pw')
+        cash = Account.objects.create(owner=cls.user, type='자산', name='현금')
+        food = Account.objects.create(owner=cls.user, type='비용', name='식비')
+        for item, memo in [('쿠팡 로켓배송', '생수'), ('쿠팡이츠', '치킨 배달'), ('편의점', '생수 2L'), ('점심', '')]:
+            Transaction.objects.create(owner=cls.user, date=date(2024, 1, 5), item=item, memo=memo, amount=1000,
+                                       debit_account=food, credit_account=cash)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def items(self, q):
+        response = self.client.get(reverse('account:transaction_list'), {'year': 2024, 'month': 1, 'q': q})
+        return sorted(tx.item for tx in response.context['transactions'])
+
+    def test_terms_match_item_or_memo(self):
+        self.assertEqual(self.items('쿠팡'), ['쿠팡 로켓배송', '쿠팡이츠'])
+        self.assertEqual(self.items('생수'), ['쿠팡 로켓배송', '편의점'])
+        self.assertEqual(self.items('쿠팡  생수'), ['쿠팡 로켓배송'])
+        self.assertEqual(self.items("쿠팡 & '배달':*"), ['쿠팡이츠'])
+        self.assertEqual(len(self.items('  ')), 4)
+
+    def test_export_uses_search(self):
+        response = self.client.get(reverse('account:transaction_export'), {'year': 2024, 'month': 1, 'q': '생수'})
+        body = b''.join(response.streaming_content).decode('utf-8-sig') if response.streaming else response.content.decode('utf-8-sig')
+        self.assertIn('편의점', body)
+        self.assertNotIn('점심', body)
+
+
+class ItemSuggestTests(TestCase):
+    """아이템 자동완성은 거래 원장을 보지 않고 증분 갱신되는 ItemUsage 만 읽는다."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='pw')
+        cls.cash = Account.objects.create(owner=cls.user, type='자산', name='현금')
+        cls.card = Account.objects.create(owner=cls.user, type='부채', name='신용카드')
+        cls.food = Account.objects.create(owner=cls.user, type='비용', name='식비')
+        cls.cafe = Account.objects.create(owner=cls.user, type='비용', name='카페')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def add(self, item, day, amount, debit=None, credit=None):
+        return Transaction.objects.create(owner=self.user, date=date(2024, 1, day), item=item, amount=amount,
+                                          debit_account=debit or self.food, credit_account=credit or self.card)
+
+    def suggest(self, q):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('account:item_suggest'), {'q': q})
+        self.assertFalse([x for x in ctx.captured_queries if 'FROM "account_transaction"' in x['sql']])
+        return response.json()['items']
+
+    def test_prefix_ranking_and_accounts(self):
+        self.add('스타벅스', 3, 5000, debit=self.cafe)
+        self.add('스타벅스', 5, 6000, debit=self.cafe)
+        self.add('스타벅스', 9, 4500, credit=self.cash)  # 가장 최근이지만 덜 쓴 계정 조합
+        self.add('스시', 4, 30000)
+        self.add('편의점', 6, 3000)
+
+        items = self.suggest('스')
+        self.assertEqual([entry['item'] for entry in items], ['스타벅스', '스시'])
+        starbucks = items[0]
+        self.assertEqual(starbucks['count'], 3)
+        self.assertEqual((starbucks['debit_account']['name'], starbucks['credit_account']['name']), ('카페', '신용카드'))
+        self.assertEqual((starbucks['last_amount'], starbucks['last_used']), (4500, '2024-01-09'))
+        self.assertEqual(self.suggest('%'), [])
+
+    def test_signals_and_rebuild_agree(self):
+        tx = self.add('점심', 3, 9000)
+        self.add('점심', 2, 8000)
+        tx.item = '저녁'
+        tx.save()
+        other = self.add('점심', 7, 7000, credit=self.cash)
+        other.delete()
+        incremental = suggest_items(self.user, '')
+        self.assertEqual([(entry['item'], entry['count'], entry['last_amount']) for entry in incremental],
+                         [('저녁', 1, 9000), ('점심', 1, 8000)])
+        rebuild_item_usage(self.user)
+        self.assertEqual(suggest_items(self.user, ''), incremental)
+
+    def test_installments_and_query_count(self):
+        self.client.post(reverse('account:transaction_create'), {
+            'date': '2024-01-10', 'item': '노트북//12', 'memo': '', 'amount': '1200000',
+            'debit_account': self.food.pk, 'credit_account': self.card.pk,
+        })
+        self.assertEqual([(entry['item'], entry['count']) for entry in self.suggest('노트')], [('노트북', 12)])
+        with self.assertNumQueries(QUERY_BUDGETS['account:item_suggest']):
+            self.client.get(reverse('account:item_suggest'), {'q': '노트'})
+
+
+class NetWorthChartTests(TestCase):
+    """순자산 추이 차트는 자산 현황 페이지와 분리된 JSON 으로, 스냅샷 시작 잔액 + 구간별 누적 합계로 계산한다."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='pw')
+        cash = Account.objects.create(owner=cls.user, type='자산', name='현금')
+        card = Account.objects.create(owner=cls.user, type='부채', name='신용카드')
+        food = Account.objects.create(owner=cls.user, type='비용', name='식비')
+        salary = Account.objects.create(owner=cls.user, type='수익', name='급여')
+        for day, amount, debit, credit in [
+            (date(2024, 1, 5), 1000000, cash, salary),
+            (date(2024, 1, 20), 30000, food, card),
+            (date(2024, 2, 10), 30000, card, cash),  # 상환은 순자산을 바꾸지 않는다
+            (date(2024, 3, 3), 10000, food, cash),
+            (date.today() + timedelta(days=30), 500000, cash, salary),  # 미래 거래는 제외
+        ]:
+            Transaction.objects.create(owner=cls.user, date=day, item='거래', amount=amount, debit_account=debit, credit_account=credit)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_points_by_granularity(self):
+        monthly = net_worth_points(self.user, date(2024, 1, 1), date(2024, 3, 31), 'month')
+        self.assertEqual(monthly, [(date(2024, 1, 1), 970000), (date(2024, 2, 1), 970000), (date(2024, 3, 1), 960000)])
+        daily = net_worth_points(self.user, date(2024, 2, 15), date(2024, 3, 5), 'day')
+        self.assertEqual(daily[0], (date(2024, 2, 15), 970000))  # 1월 스냅샷 + 2월 1~15일 증감
+        self.assertEqual(len(daily), 20)
+        self.assertEqual(daily[-1], (date(2024, 3, 5), 960000))
+        weekly = net_worth_points(self.user, date(2024, 1, 1), date(2024, 1, 21), 'week')
+        self.assertEqual(weekly, [(date(2024, 1, 1), 1000000), (date(2024, 1, 8), 1000000), (date(2024, 1, 15), 970000)])
+
+    def test_endpoint_downsamples_long_ranges(self):
+        response = self.client.get(reverse('account:asset_status_chart'), {'range': '10Y', 'granularity': 'day'})
+        data = response.json()
+        self.assertTrue(data['downsampled'])
+        self.assertEqual(len(data['labels']), MAX_POINTS)
+        self.assertEqual((data['labels'][-1], data['net_worth_data'][-1]), (date.today().isoformat(), 960000))
+        self.assertIn(970000, data['net_worth_data'])
+
+        data = self.client.get(reverse('account:asset_status_chart'), {'start': '2024-01-01', 'end': '2024-03-31'}).json()
+        self.assertEqual(data['granularity'], 'day')
+        self.assertEqual((data['labels'][0], len(data['labels'])), ('2024-01-01', 91))
+        self.assertNotIn('chart_data_json', self.client.get(reverse('account:asset_status')).context)
+
+    def test_downsample_keeps_ends_and_spikes(self):
+        points = [(i, 100) for i in range(1000)]
+        points[537] = (537, 5000)
+        sampled = downsample(points, 50)
+        self.assertEqual(len(sampled), 50)
+        self.assertEqual((sampled[0], sampled[-1]), (points[0], points[-1]))
+        self.assertIn(points[537], sampled)
+
+
+class ConditionalGetTests(TestCase):
+    """읽기 전용 리포트 화면은 원장이 그대로면 집계 없이 304 를 돌려준다."""
+    VIEWS = ['account:asset_status', 'account:budget_view', 'account:reports', 'account:transaction_list']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='pw')
+        cls.cash = Account.objects.create(owner=cls.user, type='자산', name='현금')
+        cls.food = Account.objects.create(owner=cls.user, type='비용', name='식비')
+        cls.tx = Transaction.objects.create(owner=cls.user, date=date.today(), item='점심', amount=9000,
+                                            debit_account=cls.food, credit_account=cls.cash)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        # 폼이 있는 페이지는 처음 열 때 CSRF 쿠키를 발급하고, 쿠키가 ETag 에 들어가므로 미리 받아 둔다
+        self.client.get(reverse('account:reports'))
+
+    def test_not_modified_until_ledger_changes(self):
+        for name in self.VIEWS:
+            with self.subTest(view=name):
+                response = self.client.get(reverse(name), {'year': 2024, 'month': 5})
+                etag = response['ETag']
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('no-cache', response['Cache-Control'])
+                self.assertIn('private', response['Cache-Control'])
+                with self.assertNumQueries(3):  # 세션, 사용자, 원장 버전
+                    response = self.client.get(reverse(name), {'year': 2024, 'month': 5}, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual((response.status_code, response['ETag']), (304, etag))
+                response = self.client.get(reverse(name), {'year': 2024, 'month': 6}, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+        etag = self.client.get(reverse('account:reports'))['ETag']
+        previous = self.tx.updated_at
+        self.tx.amount = 12000
+        self.tx.save()
+        self.assertGreater(self.tx.updated_at, previous)
+        response = self.client.get(reverse('account:reports'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_post_is_not_conditional(self):
+        etag = self.client.get(reverse('account:reports'))['ETag']
+        response = self.client.post(reverse('account:reports'), {'amount': 'x'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_pending_message_is_not_hidden_by_304(self):
+        # 원장을 바꾸지 않고 메시지만 남기는 POST 후 리다이렉트
+        url = reverse('account:reports') + '?year=2024&month=5'
+        etag = self.client.get(url)['ETag']
+        response = self.client.post(url, {'copy_last_month_budget': '1'})
+        response = self.client.get(response['Location'], HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '복사할 전달 예산 데이터가 없습니다')
+        self.assertFalse(response.has_header('ETag'))
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+CACHED_AUTH = {'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db', 'AUTH_USER_CACHE_TIMEOUT': 300}
+
+
+class SessionAuthCacheTests(TestCase):
+    """cached_db 세션 + CachedModelBackend 는 로그인이 필요한 모든 화면에서 세션/사용자 조회 두 번을 없앤다."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = seed_ledger('tester', expense_accounts=2, transactions=50, years=1, seed=1)
+
+    def setUp(self):
+        cache.clear()
+
+    def count_queries(self):
+        # SessionMiddleware 는 처음 요청할 때 SESSION_ENGINE 을 읽으므로 설정마다 새 클라이언트를 쓴다
+        client = Client()
+        client.force_login(self.user)
+        requests, anonymous = view_requests(self.user)
+        counts = {}
+        for name, kwargs, params in requests:
+            if name in anonymous or name == 'account:logout':
+                continue
+            url = reverse(name, kwargs=kwargs)
+            client.get(url, params)  # 리포트/세션/사용자 캐시를 채운다
+            with CaptureQueriesContext(connection) as ctx:
+                response = client.get(url, params)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+            self.assertIn(response.status_code, (200, 302), name)
+            counts[(name, tuple(params))] = len(ctx.captured_queries)
+        return counts
+
+    def test_every_login_required_view_saves_two_queries(self):
+        default = self.count_queries()
+        with override_settings(**CACHED_AUTH):
+            cached = self.count_queries()
+        for key, count in default.items():
+            with self.subTest(view=key):
+                self.assertLessEqual(cached[key], count - 2)
+
+    @override_settings(**CACHED_AUTH)
+    def test_cached_user_is_forgotten_on_change(self):
+        client = Client()
+        client.force_login(self.user)
+        url = reverse('account:budget_view')
+        self.assertEqual(client.get(url).status_code, 200)
+        # 다른 곳에서 비밀번호를 바꾸면 기존 세션은 바로 로그아웃되어야 한다 (세션 해시 불일치)
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('changed')
+        user.save()
+        self.assertEqual(client.get(url).status_code, 302)
+
+    def test_purge_sessions_in_batches(self):
+        now = timezone.now()
+        Session.objects.bulk_create(
+            [Session(session_key=f'expired{i}', session_data='', expire_date=now - timedelta(days=1)) for i in range(5)]
+            + [Session(session_key='active', session_data='', expire_date=now + timedelta(days=1))]
+        )
+        out = StringIO()
+        with CaptureQueriesContext(connection) as ctx:
+            call_command('purge_sessions', '--batch-size', '2', stdout=out)
+        self.assertIn('5개', out.getvalue())
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['active'])
+        self.assertEqual(sum(q['sql'].startswith('DELETE') for q in ctx.captured_queries), 3)
@@ -15,10 +15,16 @@ urlpatterns = [
     # 가계부 기능 URL (접두사 없이)
     path('transaction/new/', views.transaction_create, name='transaction_create'), # 거래입력을 첫 번째로
     path('list/', views.transaction_list, name='transaction_list'),
+    path('export/', views.transaction_export, name='transaction_export'),
+    path('transaction/items/', views.item_suggest, name='item_suggest'),
     path('transaction/<int:pk>/update/', views.transaction_update, name='transaction_update'),
     path('transaction/<int:pk>/delete/', views.transaction_delete, name='transaction_delete'),
+    path('installment/<int:pk>/cancel/', views.installment_cancel, name='installment_cancel'),
+    path('installment/<int:pk>/update/', views.installment_update, name='installment_update'),
     path('status/', views.asset_status, name='asset_status'),
+    path('status/chart-data/', views.asset_status_chart, name='asset_status_chart'),
     path('budget/', views.budget_view, name='budget_view'),
+    path('budget/bulk/', views.budget_bulk, name='budget_bulk'),
 
     # 환경설정 페이지 URL 추가
     path('settings/', views.settings_view, name='settings'), 
@@ -27,6 +33,10 @@ urlpatterns = [
     path('account/<int:pk>/update/', views.account_update, name='account_update'),
     path('account/<int:pk>/delete/', views.account_delete, name='account_delete'),
     
+    # 요청 측정값 (Prometheus)
+    path('metrics/', views.metrics_view, name='metrics'),
+
     #예산 및 통계계 관련
     path('reports/', views.reports_view, name='reports'),
+    path('reports/trend/', views.budget_trend, name='budget_trend'),
 ]
\ No newline at end of file
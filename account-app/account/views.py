@@ -1,21 +1,39 @@
 # account/views.py
 
 import json
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate, logout, update_session_auth_hash
 from django.contrib.auth.decorators import login_required
-from .forms import CustomUserCreationForm, TransactionForm, UserProfileForm, PasswordChangeForm, AccountForm, TransactionPresetForm, BudgetForm
+from .forms import CustomUserCreationForm, TransactionForm, UserProfileForm, PasswordChangeForm, AccountForm, TransactionPresetForm, BudgetForm, InstallmentUpdateForm
 from django.contrib.auth.forms import AuthenticationForm
 from django.urls import reverse
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
 from django.contrib import messages
-from .models import Account, Transaction, TransactionPreset, Budget
-from datetime import date, datetime
+from .models import Account, Transaction, TransactionPreset, Budget, InstallmentPlan
+from .balances import latest_closing_balances, monthly_spending
+from .ledger import account_totals, budget_vs_actual, month_window, in_month, in_period_range
+from .cache import cached_report, acached_report
+from .conditional import conditional_report
+from .directory import account_directory
+from .concurrency import async_login_required, gather_queries
+from .instrumentation import registry as metrics_registry
+from .pagination import KEYSET_ORDERING, decode_cursor, encode_cursor, after_cursor
+from .filters import filter_transactions
+from .ledger_io import achunked, csv_lines, transaction_rows
+from .installments import parse_installment_item, create_installment_plan, cancel_remaining_installments, update_remaining_installments
+from .budgets import MAX_COPY_MONTHS, copy_budgets, parse_budget_amount, save_month_budgets
+from .items import MAX_SUGGEST_LIMIT, SUGGEST_LIMIT, suggest_items
+from .networth import DEFAULT_RANGE, GRANULARITIES, MAX_POINTS, RANGES, default_granularity, downsample, net_worth_points
+from datetime import date
 from django.utils.dateparse import parse_date
 from dateutil.relativedelta import relativedelta
 from decimal import Decimal
-from django.db.models import Sum, F, Window, Q
+from django.db.models import Sum, F, Window, Q, Case, When, Value
 from django.db.models.functions import Coalesce
-from django.db import transaction
 
 # --- 인증 관련 뷰 ---
 
@@ -66,9 +84,25 @@ def logout_view(request):
     logout(request)
     return redirect('account:login')
 
+def metrics_view(request):
+    # Prometheus 수집용. 토큰이 설정되어 있으면 Bearer 토큰으로, 아니면 staff 로그인으로 확인
+    if not settings.REQUEST_METRICS_ENABLED:
+        raise Http404
+    token = settings.REQUEST_METRICS_TOKEN
+    if token:
+        allowed = constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    else:
+        allowed = request.user.is_authenticated and request.user.is_staff
+    if not allowed:
+        raise Http404
+    return HttpResponse(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 # --- 핵심 기능 뷰 ---
 
+TRANSACTION_PAGE_SIZE = 100
+
 @login_required
+@conditional_report('transaction_list')
 def transaction_list(request):
     transactions = Transaction.objects.filter(owner=request.user).select_related('debit_account', 'credit_account')
     
@@ -76,82 +110,80 @@ def transaction_list(request):
     q_account = request.GET.get('account', '')
     q_debit = request.GET.get('debit_account', '')
     q_credit = request.GET.get('credit_account', '')
+    q_text = request.GET.get('q', '')
     q_item = request.GET.get('item', '')
     q_memo = request.GET.get('memo', '')
-    q_start = request.GET.get('start_date', '')
-    q_end = request.GET.get('end_date', '')
     q_year = request.GET.get('year', '')
     q_month = request.GET.get('month', '')
 
-    if q_year and q_month:
-        try:
-            year, month = int(q_year), int(q_month)
-            start_date_obj = date(year, month, 1)
-            end_date_obj = start_date_obj + relativedelta(months=1) - relativedelta(days=1)
-        except (ValueError, TypeError):
-            start_date_obj = today.replace(day=1)
-            end_date_obj = start_date_obj + relativedelta(months=1) - relativedelta(days=1)
-    elif q_start and q_end:
-        start_date_obj = date.fromisoformat(q_start)
-        end_date_obj = date.fromisoformat(q_end)
-    else:
-        start_date_obj = today - relativedelta(months=1)
-        end_date_obj = today
-
-    transactions = transactions.filter(date__range=[start_date_obj, end_date_obj])
-
-    if q_debit:
-        transactions = transactions.filter(debit_account_id=q_debit)
-    if q_credit:
-        transactions = transactions.filter(credit_account_id=q_credit)
-    if q_account:
-        transactions = transactions.filter(
-            Q(debit_account_id=q_account) | Q(credit_account_id=q_account)
-        )
-    if q_item:
-        transactions = transactions.filter(item__icontains=q_item)
-    if q_memo:
-        transactions = transactions.filter(memo__icontains=q_memo)
-    
-    transactions = transactions.order_by('-date', '-created_at')
-    
-    period_total = transactions.aggregate(total=Sum('amount'))['total'] or Decimal(0)
+    transactions, start_date_obj, end_date_obj = filter_transactions(transactions, request.GET, today)
 
+    transactions = transactions.order_by(*KEYSET_ORDERING)
+    
     cumulative_total = None
     selected_account = None
     account_id_for_cumulative = q_account or q_debit or q_credit
-    
     if account_id_for_cumulative:
-        try:
-            selected_account = Account.objects.get(id=account_id_for_cumulative, owner=request.user)
-            if selected_account.type in ['자산', '부채']:
-                initial_debits = Transaction.objects.filter(owner=request.user, debit_account=selected_account, date__lt=start_date_obj).aggregate(sum=Sum('amount'))['sum'] or Decimal(0)
-                initial_credits = Transaction.objects.filter(owner=request.user, credit_account=selected_account, date__lt=start_date_obj).aggregate(sum=Sum('amount'))['sum'] or Decimal(0)
-                
-                if selected_account.type == '자산':
-                    balance = initial_debits - initial_credits
-                else:
-                    balance = initial_credits - initial_debits
-
-                temp_transactions = list(transactions.order_by('date', 'created_at'))
-                for tx in temp_transactions:
-                    if tx.debit_account == selected_account:
-                        balance += tx.amount if selected_account.type == '자산' else -tx.amount
-                    elif tx.credit_account == selected_account:
-                        balance -= tx.amount if selected_account.type == '자산' else -tx.amount
-                    tx.balance = balance
-                
-                transactions = sorted(temp_transactions, key=lambda x: (x.date, x.created_at), reverse=True)
-                cumulative_total = balance
-        except Account.DoesNotExist:
-            pass
+        selected_account = Account.objects.filter(id=account_id_for_cumulative, owner=request.user).first()
+    show_balance = selected_account is not None and selected_account.type in ['자산', '부채']
+
+    # --- 키셋 페이지네이션: ?after=<토큰> 이후 PAGE_SIZE 건만 조회 ---
+    cursor = decode_cursor(request.GET.get('after', ''))
+    page = transactions.filter(after_cursor(cursor)) if cursor else transactions
+
+    if show_balance:
+        sign = 1 if selected_account.type == '자산' else -1
+        # 기초 잔액: 기간 시작일 이전의 선택 계정 (차변 합계 - 대변 합계)
+        before = account_totals(request.user, cutoffs=[start_date_obj], account_ids=[selected_account.pk])
+        opening_debit, opening_credit = before.get(selected_account.pk, {}).get(start_date_obj, (Decimal(0), Decimal(0)))
+        opening_balance = opening_debit - opening_credit
+        # 선택 계정 기준 거래의 증감액 (차변 +, 대변 -)
+        signed_amount = (
+            Case(When(debit_account=selected_account, then=F('amount')), default=Value(Decimal(0)))
+            - Case(When(credit_account=selected_account, then=F('amount')), default=Value(Decimal(0)))
+        )
+        # 누적 증감액(윈도 함수)은 페이지 조회 쿼리에서 함께 계산한다.
+        # 커서 이후 행은 오름차순으로 보면 범위의 앞부분이므로 누적 합계가 그대로 유효하다.
+        page = page.annotate(
+            signed_amount=signed_amount,
+            running_change=Window(Sum('signed_amount'), order_by=[F('date').asc(), F('created_at').asc(), F('id').asc()]),
+        )
+        totals = transactions.aggregate(total=Sum('amount'), net=Sum(signed_amount))
+    else:
+        totals = transactions.aggregate(total=Sum('amount'))
+    period_total = totals['total'] or Decimal(0)
+
+    page = list(page[:TRANSACTION_PAGE_SIZE + 1])
+    has_next = len(page) > TRANSACTION_PAGE_SIZE
+    page = page[:TRANSACTION_PAGE_SIZE]
+
+    if show_balance:
+        for tx in page:
+            tx.balance = sign * (opening_balance + tx.running_change)
+        cumulative_total = sign * (opening_balance + (totals['net'] or Decimal(0)))
+
+    next_query = None
+    if has_next:
+        params = request.GET.copy()
+        params['after'] = encode_cursor(page[-1])
+        next_query = params.urlencode()
+    first_query = None
+    if cursor:
+        params = request.GET.copy()
+        params.pop('after', None)
+        first_query = params.urlencode()
+    export_params = request.GET.copy()
+    export_params.pop('after', None)
 
     all_accounts = Account.objects.filter(owner=request.user)
     years = range(2020, today.year + 2)
     months = range(1, 13)
     
     context = {
-        'transactions': transactions,
+        'transactions': page,
+        'next_query': next_query,
+        'first_query': first_query,
+        'export_query': export_params.urlencode(),
         'all_accounts': all_accounts,
         'period_total': period_total,
         'cumulative_total': cumulative_total,
@@ -162,6 +194,7 @@ def transaction_list(request):
             'account': q_account,
             'debit_account': q_debit, 
             'credit_account': q_credit,
+            'q': q_text,
             'item': q_item, 
             'memo': q_memo, 
             'start_date': start_date_obj.strftime('%Y-%m-%d'),
@@ -183,34 +216,26 @@ def transaction_create(request):
         debit_account_id = request.POST.get('debit_account')
         credit_account_id = request.POST.get('credit_account')
 
-        debit_account = get_object_or_404(Account, id=debit_account_id, owner=request.user)
-        credit_account = get_object_or_404(Account, id=credit_account_id, owner=request.user)
+        accounts = account_directory(request.user)
+        debit_account = accounts.get(debit_account_id)
+        credit_account = accounts.get(credit_account_id)
+        if debit_account is None or credit_account is None:
+            raise Http404
         start_date = parse_date(date_str)
         
-        if '//' in item:
-            parts = item.split('//')
-            if len(parts) == 2:
-                item_name = parts[0].strip()
-                try:
-                    months = int(parts[1])
-                    monthly_amount = round(amount / months)
-
-                    for i in range(months):
-                        transaction_date = start_date + relativedelta(months=i)
-                        Transaction.objects.create(
-                            owner=request.user,
-                            date=transaction_date, item=item_name,
-                            memo=f"{item_name} ({i+1}/{months}회차)", amount=monthly_amount,
-                            debit_account=debit_account, credit_account=credit_account,
-                            is_repayment=is_repayment
-                        )
-                    messages.success(request, f'{months}개월 할부 거래가 성공적으로 입력되었습니다!')
-                except (ValueError, ZeroDivisionError):
-                    messages.error(request, "할부 개월수가 잘못되었습니다. '아이템//숫자' 형식으로 입력해주세요.")
-                    return redirect(reverse('account:transaction_create'))
-            else:
-                messages.error(request, "할부 형식이 잘못되었습니다. '아이템//숫자' 형식으로 입력해주세요.")
-                return redirect(reverse('account:transaction_create'))
+        try:
+            installment = parse_installment_item(item)
+        except ValueError:
+            messages.error(request, "할부 개월수가 잘못되었습니다. '아이템//숫자' 형식으로 입력해주세요.")
+            return redirect(reverse('account:transaction_create'))
+
+        if installment:
+            item_name, months = installment
+            create_installment_plan(
+                request.user, item_name, amount, months, start_date,
+                debit_account, credit_account, is_repayment=is_repayment,
+            )
+            messages.success(request, f'{months}개월 할부 거래가 성공적으로 입력되었습니다!')
         else:
             Transaction.objects.create(
                 owner=request.user,
@@ -219,38 +244,29 @@ def transaction_create(request):
                 is_repayment=is_repayment
             )
             if credit_account.name == '체크카드':
-                try:
-                    cash_account = Account.objects.get(owner=request.user, name='현금')
+                cash_account = accounts.by_name.get('현금')
+                if cash_account:
                     Transaction.objects.create(
                         owner=request.user,
                         date=start_date, item=item, memo="체크카드 자동출금", amount=amount,
                         debit_account=credit_account,
                         credit_account=cash_account
                     )
-                except Account.DoesNotExist:
+                else:
                     messages.warning(request, "'현금' 계정이 없어 체크카드 자동출금 거래를 생성하지 못했습니다.")
             
             messages.success(request, '거래가 성공적으로 입력되었습니다!')
 
         return redirect(reverse('account:transaction_create'))
 
-    debit_accounts = {}
-    credit_accounts = {}
-    
-    for acc in Account.objects.filter(owner=request.user).exclude(type='수익').order_by('name'):
-        if acc.type not in debit_accounts: debit_accounts[acc.type] = []
-        debit_accounts[acc.type].append(acc)
-
-    for acc in Account.objects.filter(owner=request.user).exclude(type='비용').order_by('name'):
-        if acc.type not in credit_accounts: credit_accounts[acc.type] = []
-        credit_accounts[acc.type].append(acc)
-
+    # 계정 목록은 계정이 바뀔 때까지 캐시된 디렉터리를 사용
+    accounts = account_directory(request.user)
     fixed_presets = TransactionPreset.objects.filter(owner=request.user, preset_type='FIXED').order_by('day_of_month', 'name')
     frequent_presets = TransactionPreset.objects.filter(owner=request.user, preset_type='FREQUENT').order_by('name')
     recent_transactions = Transaction.objects.filter(owner=request.user).select_related('debit_account', 'credit_account').order_by('-created_at')[:20]
 
     context = {
-        'debit_accounts': debit_accounts, 'credit_accounts': credit_accounts,
+        'debit_accounts': accounts.debit_accounts, 'credit_accounts': accounts.credit_accounts,
         'today': date.today(), 'fixed_presets': fixed_presets,
         'frequent_presets': frequent_presets, 'recent_transactions': recent_transactions,
     }
@@ -261,29 +277,48 @@ def transaction_update(request, pk):
     transaction = get_object_or_404(Transaction, pk=pk, owner=request.user)
     next_url = request.GET.get('next', reverse('account:transaction_list'))
 
+    accounts = account_directory(request.user)
     if request.method == 'POST':
-        form = TransactionForm(request.POST, instance=transaction, user=request.user)
+        form = TransactionForm(request.POST, instance=transaction, accounts=accounts)
         if form.is_valid():
             form.save()
             return redirect(next_url)
     else:
-        form = TransactionForm(instance=transaction, user=request.user)
-    
-    debit_accounts = {}
-    credit_accounts = {}
-    for acc in Account.objects.filter(owner=request.user).exclude(type='수익').order_by('name'):
-        if acc.type not in debit_accounts: debit_accounts[acc.type] = []
-        debit_accounts[acc.type].append(acc)
-    for acc in Account.objects.filter(owner=request.user).exclude(type='비용').order_by('name'):
-        if acc.type not in credit_accounts: credit_accounts[acc.type] = []
-        credit_accounts[acc.type].append(acc)
-    
+        form = TransactionForm(instance=transaction, accounts=accounts)
+
     context = {
         'form': form, 'transaction': transaction, 'next': next_url,
-        'debit_accounts': debit_accounts, 'credit_accounts': credit_accounts,
+        'debit_accounts': accounts.debit_accounts, 'credit_accounts': accounts.credit_accounts,
     }
+    if transaction.installment_plan_id:
+        context['installment_form'] = InstallmentUpdateForm(accounts=accounts)
     return render(request, 'account/transaction_update_form.html', context)
 
+@login_required
+def transaction_export(request):
+    # 거래내역 화면과 같은 조건으로 CSV 를 스트리밍 (import_data 와 같은 열 구성)
+    transactions, start_date_obj, end_date_obj = filter_transactions(
+        Transaction.objects.filter(owner=request.user), request.GET, date.today()
+    )
+    lines = csv_lines(transaction_rows(transactions))
+    if isinstance(request, ASGIRequest):
+        lines = achunked(lines)  # ASGI 에서는 sync iterator 를 통째로 버퍼링하므로 async iterator 로 넘긴다
+    response = StreamingHttpResponse(lines, content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="transactions_{start_date_obj:%Y%m%d}_{end_date_obj:%Y%m%d}.csv"'
+    return response
+
+@login_required
+def item_suggest(request):
+    # 아이템 입력 자동완성. 거래 원장 대신 ItemUsage 접두어 인덱스만 읽는다
+    try:
+        limit = min(max(int(request.GET.get('limit', SUGGEST_LIMIT)), 1), MAX_SUGGEST_LIMIT)
+    except (ValueError, TypeError):
+        limit = SUGGEST_LIMIT
+    suggestions = suggest_items(request.user, request.GET.get('q', '')[:100], limit)
+    for suggestion in suggestions:
+        suggestion['last_amount'] = int(suggestion['last_amount'])
+    return JsonResponse({'items': suggestions})
+
 @login_required
 def transaction_delete(request, pk):
     transaction = get_object_or_404(Transaction, pk=pk, owner=request.user)
@@ -295,59 +330,102 @@ def transaction_delete(request, pk):
 
 
 @login_required
-def asset_status(request):
+def installment_cancel(request, pk):
+    # 오늘 이후 남은 할부 회차를 한 번에 취소
+    plan = get_object_or_404(InstallmentPlan, pk=pk, owner=request.user)
+    next_url = request.GET.get('next', reverse('account:transaction_list'))
+    if request.method == 'POST':
+        cancelled = cancel_remaining_installments(plan, date.today() + relativedelta(days=1))
+        messages.success(request, f"'{plan.item}' 할부의 남은 {cancelled}회차를 취소했습니다.")
+    return redirect(next_url)
+
+
+
+@login_required
+def installment_update(request, pk):
+    # 오늘 이후 남은 할부 회차의 금액/개월수/계정을 한 번에 수정
+    plan = get_object_or_404(InstallmentPlan, pk=pk, owner=request.user)
+    next_url = request.GET.get('next', reverse('account:transaction_list'))
+    if request.method == 'POST':
+        form = InstallmentUpdateForm(request.POST, accounts=account_directory(request.user))
+        if not form.is_valid():
+            messages.error(request, '할부 수정 값이 올바르지 않습니다.')
+            return redirect(next_url)
+        try:
+            updated = update_remaining_installments(plan, date.today() + relativedelta(days=1), **form.cleaned_data)
+        except ValueError:
+            messages.error(request, '이미 지난 회차보다 적은 개월수로 줄일 수 없습니다.')
+        else:
+            messages.success(request, f"'{plan.item}' 할부의 남은 {updated}회차를 수정했습니다.")
+    return redirect(next_url)
+
+@async_login_required
+@conditional_report('asset_status')
+async def asset_status(request):
     today = date.today()
-    selected_year = int(request.GET.get('year', today.year))
-    selected_month = int(request.GET.get('month', today.month))
-    
+    try:
+        selected_year = int(request.GET.get('year', today.year))
+        selected_month = int(request.GET.get('month', today.month))
+        month_window(selected_year, selected_month)
+    except (ValueError, TypeError):
+        selected_year = today.year
+        selected_month = today.month
+
+    user = request.user
+
+    async def compute():
+        # 월별 현황 / 계정 잔액은 서로 독립적이므로 함께 실행. 순자산 추이 차트는 페이지가 뜬 뒤 asset_status_chart 로 따로 불러온다
+        monthly, balances = await gather_queries(
+            lambda: _asset_status_monthly(user, selected_year, selected_month),
+            lambda: _asset_status_balances(user, today),
+        )
+        return _asset_status_context(selected_year, selected_month, today, monthly, balances)
+
+    # 원장이 바뀌지 않았으면 캐시된 집계 결과를 그대로 사용
+    context = await acached_report(
+        user, 'asset_status', {'year': selected_year, 'month': selected_month, 'today': today}, compute,
+        version=request.ledger_version,
+    )
+    return await sync_to_async(render)(request, 'account/asset_status.html', context)
+
+def _asset_status_monthly(user, selected_year, selected_month):
     # --- 월별 현황 계산 ---
-    monthly_transactions = Transaction.objects.filter(
-        owner=request.user,
-        date__year=selected_year,
-        date__month=selected_month
+    monthly_transactions = Transaction.objects.filter(in_month(selected_year, selected_month), owner=user)
+    # 수입/비용/저축/부채상환을 조건부 합계 한 번으로 계산
+    return monthly_transactions.aggregate(
+        income=Coalesce(Sum('amount', filter=Q(credit_account__type='수익')), Decimal(0)),
+        expense=Coalesce(Sum('amount', filter=Q(debit_account__type='비용')), Decimal(0)),
+        savings=Coalesce(Sum('amount', filter=Q(debit_account__type='자산', debit_account__category='SAVING')), Decimal(0)),
+        repayments=Coalesce(Sum('amount', filter=Q(is_repayment=True)), Decimal(0)),
     )
-    monthly_income = monthly_transactions.filter(credit_account__type='수익').aggregate(total=Coalesce(Sum('amount'), Decimal(0)))['total']
-    monthly_expense = monthly_transactions.filter(debit_account__type='비용').aggregate(total=Coalesce(Sum('amount'), Decimal(0)))['total']
-    monthly_savings = monthly_transactions.filter(
-        debit_account__type='자산', debit_account__category='SAVING'
-    ).aggregate(total=Coalesce(Sum('amount'), Decimal(0)))['total']
-    monthly_repayments = monthly_transactions.filter(is_repayment=True).aggregate(total=Coalesce(Sum('amount'), Decimal(0)))['total']
-    monthly_net_profit = monthly_income - monthly_expense
-    available_cash = monthly_net_profit - monthly_savings - monthly_repayments
 
+def _asset_status_balances(user, today):
     # --- 자산/부채 잔액 계산 ---
-    accounts = Account.objects.filter(owner=request.user)
-    
-    all_debits = {
-        item['debit_account_id']: item['total'] for item in
-        Transaction.objects.filter(owner=request.user).values('debit_account_id').annotate(total=Sum('amount'))
-    }
-    all_credits = {
-        item['credit_account_id']: item['total'] for item in
-        Transaction.objects.filter(owner=request.user).values('credit_account_id').annotate(total=Sum('amount'))
-    }
-    
-    current_debits = {
-        item['debit_account_id']: item['total'] for item in
-        Transaction.objects.filter(owner=request.user, date__lte=today).values('debit_account_id').annotate(total=Sum('amount'))
-    }
-    current_credits = {
-        item['credit_account_id']: item['total'] for item in
-        Transaction.objects.filter(owner=request.user, date__lte=today).values('credit_account_id').annotate(total=Sum('amount'))
-    }
+    # 최종 잔액은 월별 스냅샷에서, 현재 잔액은 최종 잔액에서 오늘 이후 거래분을 빼서 구한다.
+    accounts = list(Account.objects.filter(owner=user))
+    closing_balances = latest_closing_balances(user)
+    future_totals = account_totals(user, since=today + relativedelta(days=1))
 
     for acc in accounts:
-        total_debit = all_debits.get(acc.id, Decimal(0))
-        total_credit = all_credits.get(acc.id, Decimal(0))
-        current_debit = current_debits.get(acc.id, Decimal(0))
-        current_credit = current_credits.get(acc.id, Decimal(0))
+        total = closing_balances.get(acc.id, Decimal(0))
+        future_debit, future_credit = future_totals.get(acc.id, {}).get(None, (Decimal(0), Decimal(0)))
+        current = total - future_debit + future_credit
 
         if acc.type in ['자산', '비용']:
-            acc.current_balance = current_debit - current_credit
-            acc.total_balance = total_debit - total_credit
+            acc.current_balance = current
+            acc.total_balance = total
         else:
-            acc.current_balance = current_credit - current_debit
-            acc.total_balance = total_credit - total_debit
+            acc.current_balance = -current
+            acc.total_balance = -total
+    return accounts
+
+def _asset_status_context(selected_year, selected_month, today, monthly_totals, accounts):
+    monthly_income = monthly_totals['income']
+    monthly_expense = monthly_totals['expense']
+    monthly_savings = monthly_totals['savings']
+    monthly_repayments = monthly_totals['repayments']
+    monthly_net_profit = monthly_income - monthly_expense
+    available_cash = monthly_net_profit - monthly_savings - monthly_repayments
 
     assets = [acc for acc in accounts if acc.type == '자산' and acc.category != 'SAVING']
     savings = [acc for acc in accounts if acc.type == '자산' and acc.category == 'SAVING']
@@ -384,114 +462,81 @@ def asset_status(request):
         'available_cash': available_cash,
         'years': range(2020, today.year + 2
                        ), 'months': range(1, 13),
+        'chart_ranges': RANGES, 'default_chart_range': DEFAULT_RANGE,
     }
+    return context
 
-    chart_data = {
-        'labels': [],
-        'net_worth_data': [],
-    }
+def _date_param(value):
+    # YYYY-MM-DD 가 아니거나 없는 날짜면 None
+    try:
+        return parse_date(value or '')
+    except ValueError:
+        return None
 
-    # --- 기간 설정 로직 수정: 최근 1년 (현재 월 포함) ---
+@login_required
+def asset_status_chart(request):
+    # 순자산 추이 차트 데이터 (JSON). range 는 1M~10Y 또는 start/end 날짜, granularity 는 day/week/month (생략 시 기간에 맞춰 선택)
     today = date.today()
-    # 루프 종료일은 이번 달의 오늘 날짜
-    end_date = today 
-    # 루프 시작일은 11개월 전의 1일 (오늘이 8월이면 작년 9월 1일부터 시작)
-    start_date = (today - relativedelta(months=11)).replace(day=1)
-
-    # 설정된 기간 내에 거래가 있는 경우에만 차트 데이터 생성
-    if Transaction.objects.filter(owner=request.user, date__gte=start_date).exists():
-        current_date = start_date
-        
-        # start_date부터 end_date까지 월별로 순회
-        while current_date <= end_date:
-            # 해당 월의 마지막 날짜 계산
-            month_end_date = current_date + relativedelta(months=1) - relativedelta(days=1)
-            # 단, 루프의 마지막 달에는 오늘 날짜를 기준으로 계산
-            if current_date.year == end_date.year and current_date.month == end_date.month:
-                month_end_date = end_date
-
-            # 해당 월말까지의 자산/부채 계산
-            asset_accounts = Account.objects.filter(owner=request.user, type='자산')
-            liabilities_accounts = Account.objects.filter(owner=request.user, type='부채')
-
-            total_assets_at_month_end = 0
-            for acc in asset_accounts:
-                debits = Transaction.objects.filter(owner=request.user, debit_account=acc, date__lte=month_end_date).aggregate(sum=Coalesce(Sum('amount'), Decimal(0)))['sum']
-                credits = Transaction.objects.filter(owner=request.user, credit_account=acc, date__lte=month_end_date).aggregate(sum=Coalesce(Sum('amount'), Decimal(0)))['sum']
-                total_assets_at_month_end += debits - credits
-
-            total_liabilities_at_month_end = 0
-            for acc in liabilities_accounts:
-                debits = Transaction.objects.filter(owner=request.user, debit_account=acc, date__lte=month_end_date).aggregate(sum=Coalesce(Sum('amount'), Decimal(0)))['sum']
-                credits = Transaction.objects.filter(owner=request.user, credit_account=acc, date__lte=month_end_date).aggregate(sum=Coalesce(Sum('amount'), Decimal(0)))['sum']
-                total_liabilities_at_month_end += credits - debits
-
-            net_worth_at_month_end = total_assets_at_month_end - total_liabilities_at_month_end
-            
-            chart_data['labels'].append(current_date.strftime('%Y-%m'))
-            chart_data['net_worth_data'].append(float(net_worth_at_month_end))
-            
-            # 다음 달로 이동
-            current_date += relativedelta(months=1)
-
-    # context에 chart_data_json 추가 (이 부분은 그대로 유지)
-    context['chart_data_json'] = json.dumps(chart_data)
-    # --- ▲▲▲▲▲ 여기까지 코드 추가 ▲▲▲▲▲ ---
-
+    chart_range = request.GET.get('range', DEFAULT_RANGE)
+    if chart_range not in RANGES:
+        chart_range = DEFAULT_RANGE
+    end = min(_date_param(request.GET.get('end')) or today, today)  # 미래 거래는 제외
+    start = _date_param(request.GET.get('start'))
+    oldest = end - RANGES['10Y'] + relativedelta(days=1)
+    if start is None or start > end:
+        start = end - RANGES[chart_range] + relativedelta(days=1)
+    start = max(start, oldest)
+    granularity = request.GET.get('granularity')
+    if granularity not in GRANULARITIES:
+        granularity = default_granularity(start, end)
+
+    def compute():
+        points = net_worth_points(request.user, start, end, granularity)
+        sampled = downsample(points, MAX_POINTS)
+        label_format = '%Y-%m' if granularity == 'month' else '%Y-%m-%d'
+        return {
+            'start': start.isoformat(), 'end': end.isoformat(), 'granularity': granularity,
+            'points': len(points), 'downsampled': len(sampled) < len(points),
+            'labels': [bucket.strftime(label_format) for bucket, _ in sampled],
+            'net_worth_data': [float(value) for _, value in sampled],
+        }
 
-    return render(request, 'account/asset_status.html', context)
+    data = cached_report(request.user, 'asset_status_chart', {'start': start, 'end': end, 'granularity': granularity}, compute)
+    return JsonResponse(data)
 
 @login_required
+@conditional_report('budget_view')
 def budget_view(request):
     today = date.today()
     try:
         selected_year = int(request.GET.get('year', today.year))
         selected_month = int(request.GET.get('month', today.month))
-        target_date = date(selected_year, selected_month, 1)
+        month_window(selected_year, selected_month)
     except (ValueError, TypeError):
-        target_date = today
         selected_year = today.year
         selected_month = today.month
 
-    start_of_month = target_date.replace(day=1)
-    end_of_month = start_of_month + relativedelta(months=1) - relativedelta(days=1)
-
-    income_transactions = Transaction.objects.filter(
-        owner=request.user, date__range=[start_of_month, end_of_month], credit_account__type='수익'
-    )
-    expense_transactions = Transaction.objects.filter(
-        owner=request.user, date__range=[start_of_month, end_of_month], debit_account__type='비용'
+    context = cached_report(
+        request.user, 'budget_view', {'year': selected_year, 'month': selected_month, 'today': today},
+        lambda: _budget_view_context(request.user, selected_year, selected_month, today),
+        version=request.ledger_version,
     )
+    return render(request, 'account/budget_view.html', context)
 
-    income_actuals = {
-        item['credit_account__name']: item['total']
-        for item in income_transactions.values('credit_account__name').annotate(total=Sum('amount'))
-    }
-    expense_actuals = {
-        item['debit_account__name']: item['total']
-        for item in expense_transactions.values('debit_account__name').annotate(total=Sum('amount'))
-    }
-
-    all_income_accounts = Account.objects.filter(owner=request.user, type='수익')
-    all_expense_accounts = Account.objects.filter(owner=request.user, type='비용')
-
+def _budget_view_context(user, selected_year, selected_month, today):
+    # 해당 월 수익(대변)/비용(차변) 실적을 계정별로 한 번에 조회
     fixed_income_details = []
     other_income_total = 0
-    for acc in all_income_accounts:
-        actual = income_actuals.get(acc.name, 0)
-        if acc.category == 'FIXED':
-            fixed_income_details.append({'name': acc.name, 'actual': actual})
-        else:
-            other_income_total += actual
-
     fixed_expense_details = []
     other_expense_total = 0
-    for acc in all_expense_accounts:
-        actual = expense_actuals.get(acc.name, 0)
+    for acc in budget_vs_actual(user, selected_year, selected_month).values():
         if acc.category == 'FIXED':
-            fixed_expense_details.append({'name': acc.name, 'actual': actual})
+            details = fixed_income_details if acc.type == '수익' else fixed_expense_details
+            details.append({'name': acc.name, 'actual': acc.actual})
+        elif acc.type == '수익':
+            other_income_total += acc.actual
         else:
-            other_expense_total += actual
+            other_expense_total += acc.actual
 
     total_income = sum(item['actual'] for item in fixed_income_details) + other_income_total
     total_expense = sum(item['actual'] for item in fixed_expense_details) + other_expense_total
@@ -509,7 +554,7 @@ def budget_view(request):
         'total_expense': total_expense,
         'net_total': total_income - total_expense,
     }
-    return render(request, 'account/budget_view.html', context)
+    return context
 
 @login_required
 def settings_view(request):
@@ -611,50 +656,26 @@ def account_delete(request, pk):
 
 
 @login_required
+@conditional_report('reports')
 def reports_view(request):
     today = date.today()
     try:
         year = int(request.GET.get('year', today.year))
         month = int(request.GET.get('month', today.month))
+        month_window(year, month)
     except (ValueError, TypeError):
         year = today.year
         month = today.month
 
-    # '전달 예산 가져오기' 버튼 처리
+    # '전달 예산 가져오기' 버튼 처리: 현재 달 예산을 지우고 전달 예산으로 대체 (INSERT ... SELECT 한 번)
     if 'copy_last_month_budget' in request.POST:
-        # 1. 이전 달 날짜 계산
-        current_month_start = date(year, month, 1)
-        last_month_end = current_month_start - relativedelta(days=1)
-        last_month_year = last_month_end.year
-        last_month_month = last_month_end.month
-        
-        # 2. 이전 달 예산 조회
-        last_month_budgets = Budget.objects.filter(
-            owner=request.user,
-            year=last_month_year,
-            month=last_month_month
-        )
-
-        if last_month_budgets.exists():
-            # 3. 현재 달 예산을 모두 지우고, 이전 달 예산을 새로 생성 (원자적 트랜잭션)
-            with transaction.atomic():
-                Budget.objects.filter(owner=request.user, year=year, month=month).delete()
-                new_budgets = []
-                for budget in last_month_budgets:
-                    new_budgets.append(
-                        Budget(
-                            owner=request.user,
-                            year=year,
-                            month=month,
-                            account=budget.account,
-                            amount=budget.amount
-                        )
-                    )
-                Budget.objects.bulk_create(new_budgets)
-            messages.success(request, f'{last_month_year}년 {last_month_month}월의 예산을 성공적으로 복사했습니다.')
+        current_month_start, _ = month_window(year, month)
+        last_month = current_month_start - relativedelta(months=1)
+        if copy_budgets(request.user, last_month, current_month_start):
+            messages.success(request, f'{last_month.year}년 {last_month.month}월의 예산을 성공적으로 복사했습니다.')
         else:
             messages.info(request, '복사할 전달 예산 데이터가 없습니다.')
-        
+
         return redirect(reverse('account:reports') + f'?year={year}&month={month}')
 
 
@@ -673,26 +694,26 @@ def reports_view(request):
     else:
         form = BudgetForm(user=request.user)
 
-    # --- 데이터 준비 (이전과 동일) ---
-    all_expense_accounts = Account.objects.filter(owner=request.user, type='비용').order_by('name')
-    fixed_expense_accounts = all_expense_accounts.filter(category='FIXED')
-    
-    monthly_spending_query = Transaction.objects.filter(
-        owner=request.user, date__year=year, date__month=month, debit_account__type='비용'
-    ).values('debit_account__name').annotate(total_spent=Sum('amount'))
-    
-    spending_dict = {item['debit_account__name']: item['total_spent'] for item in monthly_spending_query}
+    context = cached_report(
+        request.user, 'reports', {'year': year, 'month': month, 'today': today},
+        lambda: _reports_context(request.user, year, month, today),
+        version=getattr(request, 'ledger_version', None),  # POST 는 조건부 처리를 건너뛴다
+    )
+    context = {**context, 'form': form}
+    return render(request, 'account/reports.html', context)
 
-    budgets = Budget.objects.filter(owner=request.user, year=year, month=month)
-    budget_dict = {b.account.name: b.amount for b in budgets}
+def _reports_context(user, year, month, today):
+    # --- 데이터 준비: 비용 계정별 예산과 지출을 한 번의 쿼리로 ---
+    expense_accounts = [acc for acc in budget_vs_actual(user, year, month).values() if acc.type == '비용']
 
     # --- 고정 비용 세부 내역 만들기 (이전과 동일) ---
     fixed_expense_details = []
-    for account in fixed_expense_accounts:
-        spent = spending_dict.get(account.name, Decimal(0))
+    for account in expense_accounts:
+        if account.category != 'FIXED':
+            continue
         fixed_expense_details.append({
             'debit_account__name': account.name,
-            'total_spent': spent,
+            'total_spent': account.actual,
         })
     fixed_expenses_total = sum(item['total_spent'] for item in fixed_expense_details)
     for item in fixed_expense_details:
@@ -701,17 +722,15 @@ def reports_view(request):
 
     # --- 전체 리포트 데이터 만들기 (이전과 동일) ---
     report_data = []
-    for account in all_expense_accounts:
-        account_name = account.name
-        spent = spending_dict.get(account_name, Decimal(0))
-        budget = budget_dict.get(account_name, Decimal(0))
+    for account in expense_accounts:
+        spent, budget = account.actual, account.budget_amount
         usage_percent = int((spent / budget * 100)) if budget > 0 else 0
         report_data.append({
-            'name': account_name, 'spent': spent, 'budget': budget, 'usage_percent': usage_percent,
+            'name': account.name, 'spent': spent, 'budget': budget, 'usage_percent': usage_percent,
         })
 
     # --- 월별 예산 합계 계산 (추가된 부분) ---
-    total_budget = sum(budget_dict.values())
+    total_budget = sum(account.budget_amount for account in expense_accounts)
     
     context = {
         'year': year,
@@ -722,6 +741,137 @@ def reports_view(request):
         'total_budget': total_budget,  # <-- 템플릿에 전달할 예산 합계
         'years': range(today.year - 3, today.year + 2),
         'months': range(1, 13),
-        'form': form,
     }
-    return render(request, 'account/reports.html', context)
\ No newline at end of file
+    return context
+
+TREND_MONTHS = (12, 24, 36, 48, 60)
+
+@login_required
+def budget_trend(request):
+    today = date.today()
+    try:
+        year = int(request.GET.get('year', today.year))
+        month = int(request.GET.get('month', today.month))
+        month_window(year, month)
+    except (ValueError, TypeError):
+        year = today.year
+        month = today.month
+    try:
+        months = int(request.GET.get('months', 12))
+    except (ValueError, TypeError):
+        months = 12
+    months = min(max(months, TREND_MONTHS[0]), TREND_MONTHS[-1])
+
+    context = cached_report(
+        request.user, 'budget_trend', {'year': year, 'month': month, 'months': months, 'today': today},
+        lambda: _budget_trend_context(request.user, year, month, months, today),
+    )
+    return render(request, 'account/budget_trend.html', context)
+
+def _budget_trend_context(user, year, month, months, today):
+    # 기간의 월별 지출은 스냅샷에서, 예산은 예산 테이블에서 각각 범위 조회 한 번으로 읽는다
+    end = date(year, month, 1)
+    start = end - relativedelta(months=months - 1)
+    periods = [start + relativedelta(months=i) for i in range(months)]
+    spending = monthly_spending(user, start, end)
+    budgets = {
+        (account_id, y, m): amount
+        for account_id, y, m, amount in Budget.objects.filter(owner=user).filter(in_period_range(start, end))
+        .values_list('account_id', 'year', 'month', 'amount')
+    }
+
+    rows = []
+    for account in Account.objects.filter(owner=user, type='비용').order_by('name'):
+        cells = [
+            {'spent': spending.get((account.id, p.year, p.month), Decimal(0)),
+             'budget': budgets.get((account.id, p.year, p.month), Decimal(0))}
+            for p in periods
+        ]
+        spent = sum(cell['spent'] for cell in cells)
+        budget = sum(cell['budget'] for cell in cells)
+        rows.append({
+            'name': account.name, 'cells': cells, 'spent': spent, 'budget': budget,
+            'usage_percent': int(spent / budget * 100) if budget > 0 else 0,
+        })
+
+    totals = [
+        {'spent': sum(row['cells'][i]['spent'] for row in rows), 'budget': sum(row['cells'][i]['budget'] for row in rows)}
+        for i in range(months)
+    ]
+    return {
+        'year': year,
+        'month': month,
+        'months': months,
+        'periods': periods,
+        'rows': rows,
+        'totals': totals,
+        'total_spent': sum(total['spent'] for total in totals),
+        'total_budget': sum(total['budget'] for total in totals),
+        'years': range(today.year - 5, today.year + 2),
+        'month_choices': range(1, 13),
+        'month_counts': TREND_MONTHS,
+    }
+
+@login_required
+def budget_bulk(request):
+    """한 달치 비용 계정 예산을 한 번에 입력/수정한다.
+
+    폼 POST: amount_<계정 id> 필드 (비우면 예산 삭제), copy_months 가 있으면 이 달 예산을 다음 N개월에 복사.
+    JSON POST: {"year": 2024, "month": 3, "budgets": {"<계정 id>": 금액 또는 null}} -> {"saved": 건수}
+    """
+    today = date.today()
+    is_json = request.content_type == 'application/json'
+    try:
+        data = json.loads(request.body) if is_json and request.method == 'POST' else request.POST or request.GET
+        year = int(data.get('year', today.year))
+        month = int(data.get('month', today.month))
+        month_start, _ = month_window(year, month)
+    except (ValueError, TypeError, AttributeError):
+        if is_json:
+            return JsonResponse({'error': '잘못된 요청입니다.'}, status=400)
+        year, month = today.year, today.month
+        month_start, _ = month_window(year, month)
+    redirect_url = reverse('account:budget_bulk') + f'?year={year}&month={month}'
+
+    if request.method == 'POST' and 'copy_months' in request.POST:
+        try:
+            months = int(request.POST['copy_months'])
+            copied = copy_budgets(request.user, month_start, month_start + relativedelta(months=1), months)
+        except ValueError:
+            messages.error(request, f'복사할 개월 수는 1~{MAX_COPY_MONTHS} 사이여야 합니다.')
+            return redirect(redirect_url)
+        if copied:
+            messages.success(request, f'{year}년 {month}월 예산을 다음 {months}개월에 복사했습니다.')
+        else:
+            messages.info(request, '복사할 예산이 없습니다.')
+        return redirect(redirect_url)
+
+    if request.method == 'POST':
+        try:
+            if is_json:
+                amounts = {int(pk): parse_budget_amount(value) for pk, value in data.get('budgets', {}).items()}
+            else:
+                amounts = {
+                    int(key.removeprefix('amount_')): parse_budget_amount(value)
+                    for key, value in request.POST.items() if key.startswith('amount_')
+                }
+            saved = save_month_budgets(request.user, year, month, amounts)
+        except (ValueError, TypeError, AttributeError):
+            if is_json:
+                return JsonResponse({'error': '계정 또는 금액이 잘못되었습니다.'}, status=400)
+            messages.error(request, '계정 또는 금액이 잘못되었습니다. 금액은 0 이상의 정수로 입력해주세요.')
+            return redirect(redirect_url)
+        if is_json:
+            return JsonResponse({'year': year, 'month': month, 'saved': saved})
+        messages.success(request, f'{year}년 {month}월 예산 {saved}건을 저장했습니다.')
+        return redirect(redirect_url)
+
+    accounts = [acc for acc in budget_vs_actual(request.user, year, month).values() if acc.type == '비용']
+    return render(request, 'account/budget_bulk.html', {
+        'year': year,
+        'month': month,
+        'accounts': accounts,
+        'years': range(today.year - 3, today.year + 2),
+        'months': range(1, 13),
+        'max_copy_months': MAX_COPY_MONTHS,
+    })
@@ -0,0 +1,141 @@
+"""
+Transaction 복합 인덱스(0012_transaction_indexes) 효과 확인용 벤치마크.
+
+로컬 PostgreSQL 에 대량의 거래(기본 100만 건)를 생성한 뒤, 각 뷰가 실제로 사용하는 쿼리의
+EXPLAIN (ANALYZE) 결과를 인덱스 삭제 전/후로 비교한다.
+인덱스 삭제는 트랜잭션 안에서 수행하고 롤백하므로 스키마는 바뀌지 않는다.
+
+사용법 (account-app 디렉터리에서, DJANGO_SETTINGS_MODULE/POSTGRES_* 환경변수 설정 후):
+    python benchmarks/explain_indexes.py --rows 1000000
+    python benchmarks/explain_indexes.py --reseed --verbose
+"""
+
+import argparse
+import os
+import re
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'theprepared_ac.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.db.models import Sum  # noqa: E402
+from account.models import Account, Transaction, TransactionPreset  # noqa: E402
+from account.signals import signals_suspended  # noqa: E402
+
+BENCH_USERNAME = 'bench_explain'
+NEW_INDEXES = [
+    'tx_owner_date_created', 'tx_debit_date_amount', 'tx_credit_date_amount',
+    'tx_owner_recent', 'tx_owner_repayment', 'preset_owner_type',
+]
+
+
+def seed(rows, users):
+    """벤치마크 사용자 + 다른 사용자들의 거래를 generate_series 로 한 번에 생성한다."""
+    # 거래마다 신호(스냅샷/아이템 사용 빈도/원장 버전)가 실행되지 않도록 신호를 끄고 거래를 먼저 지운다
+    previous = User.objects.filter(username__startswith=BENCH_USERNAME)
+    with signals_suspended():
+        Transaction.objects.filter(owner__in=previous).delete()
+        previous.delete()
+    owners = [User.objects.create_user(f'{BENCH_USERNAME}{i or ""}') for i in range(users)]
+    table = Transaction._meta.db_table
+    for owner in owners:
+        accounts = [
+            Account.objects.create(owner=owner, type=acc_type, name=f'{acc_type}{i}')
+            for acc_type in ['자산', '부채', '수익', '비용'] for i in range(8)
+        ]
+        TransactionPreset.objects.bulk_create([
+            TransactionPreset(owner=owner, name=f'preset{i}', preset_type='FIXED' if i % 2 else 'FREQUENT',
+                              item=f'item{i}', amount=1000, day_of_month=i % 28 + 1,
+                              debit_account=accounts[i], credit_account=accounts[-i - 1])
+            for i in range(10)
+        ])
+        ids = [acc.id for acc in accounts]
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                INSERT INTO {table} (date, item, memo, amount, debit_account_id, credit_account_id,
+                                     is_repayment, created_at, updated_at, owner_id)
+                SELECT DATE '2015-01-01' + (g %% 3650),
+                       'item' || (g %% 500), NULL, (g %% 100000) + 1,
+                       (%s::bigint[])[1 + (g %% 32)], (%s::bigint[])[1 + ((g * 7 + 3) %% 32)],
+                       (g %% 50 = 0), NOW() - (g || ' seconds')::interval, NOW(), %s
+                FROM generate_series(1, %s) AS g
+            """, [ids, list(reversed(ids)), owner.id, rows // users])
+    with connection.cursor() as cursor:
+        cursor.execute(f'ANALYZE {table}')
+    return owners[0]
+
+
+def bench_queries(owner):
+    account = Account.objects.filter(owner=owner, type='자산').first()
+    start, end = date(2022, 3, 1), date(2022, 3, 31)
+    return {
+        'transaction_list (owner + date range page)': Transaction.objects.filter(
+            owner=owner, date__range=[start, end]).order_by('-date', '-created_at', '-id')[:101],
+        'opening balance (debit_account + date__lt)': Transaction.objects.filter(
+            debit_account=account, date__lt=start).values('debit_account').annotate(total=Sum('amount')).order_by(),
+        'opening balance (credit_account + date__lt)': Transaction.objects.filter(
+            credit_account=account, date__lt=start).values('credit_account').annotate(total=Sum('amount')).order_by(),
+        'recent_transactions (owner, -created_at)': Transaction.objects.filter(
+            owner=owner).order_by('-created_at')[:20],
+        'monthly repayments (is_repayment partial)': Transaction.objects.filter(
+            owner=owner, is_repayment=True, date__range=[start, end]).values('owner').annotate(total=Sum('amount')).order_by(),
+        'fixed presets (owner, preset_type)': TransactionPreset.objects.filter(owner=owner, preset_type='FIXED'),
+    }
+
+
+def summarize(plan):
+    nodes = re.findall(r'(Seq Scan|Index Only Scan|Index Scan|Bitmap Index Scan|Bitmap Heap Scan)', plan)
+    timing = re.search(r'Execution Time: ([\d.]+) ms', plan)
+    return ', '.join(dict.fromkeys(nodes)) or '-', float(timing.group(1)) if timing else None
+
+
+def explain_all(queries, verbose):
+    results = {}
+    for label, qs in queries.items():
+        plan = qs.explain(analyze=True, buffers=True)
+        results[label] = summarize(plan)
+        if verbose:
+            print(f'--- {label}\n{plan}\n')
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000, help='생성할 전체 거래 수')
+    parser.add_argument('--users', type=int, default=10, help='거래를 나눠 가질 사용자 수')
+    parser.add_argument('--reseed', action='store_true', help='기존 벤치마크 데이터를 지우고 다시 생성')
+    parser.add_argument('--verbose', action='store_true', help='전체 실행 계획 출력')
+    args = parser.parse_args()
+
+    if connection.vendor != 'postgresql':
+        sys.exit('이 벤치마크는 PostgreSQL 에서만 실행할 수 있습니다.')
+
+    owner = User.objects.filter(username=BENCH_USERNAME).first()
+    if owner is None or args.reseed:
+        print(f'{args.rows:,}건 생성 중...')
+        owner = seed(args.rows, args.users)
+    queries = bench_queries(owner)
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for name in NEW_INDEXES:
+                cursor.execute(f'DROP INDEX IF EXISTS {connection.ops.quote_name(name)}')
+        before = explain_all(queries, args.verbose)
+        transaction.set_rollback(True)
+    after = explain_all(queries, args.verbose)
+
+    print(f"{'query':<48} {'before':<40} {'after':<40}")
+    for label in queries:
+        (b_nodes, b_ms), (a_nodes, a_ms) = before[label], after[label]
+        print(f'{label:<48} {b_nodes[:28]:<28} {b_ms or 0:>9.2f}ms  {a_nodes[:28]:<28} {a_ms or 0:>9.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+ASGI 에서 거래내역 CSV 내보내기(export/)가 실제로 스트리밍되는지 확인하는 벤치마크.
+
+서버 없이 같은 프로세스에서 ASGI 애플리케이션을 직접 호출해, 첫 바이트까지의 시간(TTFB), 전체 시간,
+응답 청크 수, 요청 중 최대 Python 메모리(tracemalloc)를 잰다. 커밋을 바꿔 가며 같은 명령을 실행해 비교한다.
+
+사용법 (account-app 디렉터리에서, DJANGO_SETTINGS_MODULE/POSTGRES_* 환경변수 설정 후):
+    python manage.py seed_benchmark_data --users 1 --tx-per-month 2000 --years 3
+    python benchmarks/export_asgi.py --username bench_0 --label after
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'theprepared_ac.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.asgi import get_asgi_application  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from account.models import Transaction  # noqa: E402
+
+
+async def export_once(application, path, query, session_key):
+    """export/ 를 한 번 요청하고 (TTFB 초, 전체 초, 청크 수, 바이트 수) 를 돌려준다."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'root_path': '', 'query_string': query.encode(),
+        'headers': [(b'host', b'localhost'), (b'cookie', f'{settings.SESSION_COOKIE_NAME}={session_key}'.encode())],
+        'server': ('localhost', 80), 'client': ('127.0.0.1', 50000),
+    }
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await asyncio.Future()  # 클라이언트가 끊지 않는다
+
+    started = time.perf_counter()
+    first_byte, chunks, size, status = None, 0, 0, None
+
+    async def send(message):
+        nonlocal first_byte, chunks, size, status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif message['type'] == 'http.response.body' and message.get('body'):
+            if first_byte is None:
+                first_byte = time.perf_counter() - started
+            chunks += 1
+            size += len(message['body'])
+
+    await application(scope, receive, send)
+    if status != 200:
+        raise SystemExit(f'export/ 응답 코드 {status}: 사용자/세션 설정을 확인하세요.')
+    return first_byte, time.perf_counter() - started, chunks, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--username', default='bench_0')
+    parser.add_argument('--query', default='start_date=1900-01-01&end_date=2999-12-31', help='export/ 검색 조건 (기본: 전체 기간)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--label', default='')
+    args = parser.parse_args()
+
+    user = User.objects.get(username=args.username)
+    client = Client()
+    client.force_login(user)
+    session_key = client.cookies[settings.SESSION_COOKIE_NAME].value
+    application = get_asgi_application()
+    path = reverse('account:transaction_export')
+
+    runs = []
+    for _ in range(args.repeat):
+        tracemalloc.start()
+        ttfb, total, chunks, size = asyncio.run(export_once(application, path, args.query, session_key))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        runs.append({'ttfb_ms': round(ttfb * 1000, 1), 'total_ms': round(total * 1000, 1), 'chunks': chunks,
+                     'bytes': size, 'peak_mb': round(peak / 2**20, 1)})
+    best = min(runs, key=lambda run: run['total_ms'])
+    print(json.dumps({
+        'label': args.label, 'db': connection.vendor,
+        'transactions': Transaction.objects.filter(owner=user).count(), **best,
+    }, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""실행 중인 서버에 요청을 보내 transaction_create / transaction_list 지연 시간(p50/p99)을 잰다.
+
+DB 연결 설정(DB_CONN_MAX_AGE, DB_CONN_HEALTH_CHECKS 등)만 바꿔 서버를 두 번 띄우고 결과를 비교한다.
+표준 라이브러리만 사용하므로 서버와 다른 머신에서도 실행할 수 있다.
+
+    python benchmarks/load_views.py --url http://127.0.0.1:8000 --username bench --password ... \\
+        --requests 500 --concurrency 8 --label conn_max_age_60
+"""
+
+import argparse
+import http.cookiejar
+import json
+import re
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # POST 후 리다이렉트를 따라가지 않아야 저장 자체의 지연 시간만 잰다
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def login(base_url, username, password):
+    jar = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar), _NoRedirect)
+    opener.open(f'{base_url}/login/').read()
+    data = urllib.parse.urlencode({'username': username, 'password': password, 'csrfmiddlewaretoken': csrf_token(jar)}).encode()
+    try:
+        opener.open(urllib.request.Request(f'{base_url}/login/', data=data, headers={'Referer': f'{base_url}/login/'}))
+    except urllib.error.HTTPError as e:
+        if e.code != 302:
+            raise
+    if not any(c.name == 'sessionid' for c in jar):
+        raise SystemExit('로그인 실패: 사용자 이름/비밀번호를 확인하세요.')
+    return opener, jar
+
+
+def csrf_token(jar):
+    # 로그인하면 토큰이 바뀌므로 요청 직전에 쿠키에서 읽는다
+    return next(c.value for c in jar if c.name == 'csrftoken')
+
+
+def timed(opener, request):
+    started = time.perf_counter()
+    try:
+        with opener.open(request) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return (time.perf_counter() - started) * 1000, status
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--username', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--requests', type=int, default=300, help='엔드포인트별 요청 수')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--label', default='', help='결과 JSON 에 남길 설정 이름')
+    parser.add_argument('--paths', nargs='*', default=[], help='추가로 잴 GET 경로 (예: /status/ /reports/)')
+    args = parser.parse_args()
+    base_url = args.url.rstrip('/')
+
+    # 워커(스레드)마다 별도 세션으로 로그인
+    local = threading.local()
+
+    def session():
+        if not hasattr(local, 'opener'):
+            local.opener, local.jar = login(base_url, args.username, args.password)
+        return local.opener, local.jar
+
+    opener, _ = session()
+    form = opener.open(f'{base_url}/transaction/new/').read().decode()
+    account_ids = re.findall(r'<option value="(\d+)"', form)
+    if len(account_ids) < 2:
+        raise SystemExit('계정이 2개 이상 있어야 합니다.')
+
+    def create(_):
+        opener, jar = session()
+        data = urllib.parse.urlencode({
+            'date': time.strftime('%Y-%m-%d'), 'item': 'load-benchmark', 'memo': '', 'amount': '1000',
+            'debit_account': account_ids[0], 'credit_account': account_ids[1], 'csrfmiddlewaretoken': csrf_token(jar),
+        }).encode()
+        return timed(opener, urllib.request.Request(f'{base_url}/transaction/new/', data=data, headers={'Referer': base_url}))
+
+    def list_view(_):
+        opener, _ = session()
+        return timed(opener, urllib.request.Request(f'{base_url}/list/?account={account_ids[0]}'))
+
+    def form_view(_):
+        opener, _ = session()
+        return timed(opener, urllib.request.Request(f'{base_url}/transaction/new/'))
+
+    def get_view(path):
+        def run(_):
+            opener, _ = session()
+            return timed(opener, urllib.request.Request(f'{base_url}{path}'))
+        return run
+
+    endpoints = [('transaction_create GET', form_view), ('transaction_create POST', create), ('transaction_list', list_view)]
+    endpoints += [(path, get_view(path)) for path in args.paths]
+
+    report = {'label': args.label, 'concurrency': args.concurrency, 'endpoints': {}}
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for name, func in endpoints:
+            started = time.perf_counter()
+            results = list(pool.map(func, range(args.requests)))
+            elapsed = time.perf_counter() - started
+            latencies = [ms for ms, _ in results]
+            errors = sum(1 for _, status in results if status >= 400)
+            report['endpoints'][name] = {
+                'p50_ms': round(statistics.median(latencies), 1),
+                'p99_ms': round(percentile(latencies, 99), 1),
+                'rps': round(len(results) / elapsed, 1),
+                'errors': errors,
+            }
+            print(f"{name:<26} p50 {report['endpoints'][name]['p50_ms']:>7} ms  "
+                  f"p99 {report['endpoints'][name]['p99_ms']:>7} ms  {report['endpoints'][name]['rps']:>7} req/s  오류 {errors}")
+    print(json.dumps(report, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
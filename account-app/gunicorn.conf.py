@@ -0,0 +1,42 @@
+# account-app/gunicorn.conf.py
+# gunicorn -c gunicorn.conf.py 로 실행한다. 모든 값은 환경변수로 바꿀 수 있다.
+#
+#   SERVER_MODE=wsgi (기본)  gthread 워커: 프로세스 × 스레드로 동시 요청 처리
+#   SERVER_MODE=asgi         uvicorn 워커: async 리포트 뷰가 집계 쿼리를 동시에 실행
+#
+# DB 연결 수는 대략 workers × threads (ASGI 는 workers × 스레드 풀 크기) 이므로
+# PostgreSQL max_connections(기본 100) 를 넘지 않도록 GUNICORN_MAX_WORKERS 로 상한을 둔다.
+
+import multiprocessing
+import os
+
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get(
+    'GUNICORN_WORKERS',
+    min(multiprocessing.cpu_count() * 2 + 1, int(os.environ.get('GUNICORN_MAX_WORKERS', 8))),
+))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'theprepared_ac.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+    # 워커가 설정을 읽기 전에 기본값을 정한다 (앱은 fork 이후 각 워커에서 import 된다)
+    os.environ.setdefault('REPORT_PARALLEL_QUERIES', '1')
+    # async 뷰의 DB 작업은 스레드 풀에서 실행되므로 영구 연결 대신 요청마다 정리
+    os.environ.setdefault('DB_CONN_MAX_AGE', '0')
+else:
+    wsgi_app = 'theprepared_ac.wsgi:application'
+    worker_class = 'gthread' if threads > 1 else 'sync'
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+# 메모리 누수 대비: 일정 요청 수마다 워커 재시작 (동시에 재시작하지 않도록 jitter)
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOGLEVEL', 'info')
@@ -42,6 +42,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'account.instrumentation.RequestMetricsMiddleware',  # REQUEST_METRICS_ENABLED=1 일 때만 동작
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -53,9 +54,16 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'theprepared_ac.urls'
 
+# 요청별 SQL/템플릿/뷰/전체 시간 측정 (Server-Timing 헤더, account.metrics 로그, /metrics/)
+REQUEST_METRICS_ENABLED = os.environ.get('REQUEST_METRICS_ENABLED', '0') == '1'
+# 측정할 요청 비율 (0~1). 운영에서는 0.1 정도로 낮춰 사용
+REQUEST_METRICS_SAMPLE_RATE = float(os.environ.get('REQUEST_METRICS_SAMPLE_RATE', 1.0))
+# /metrics/ 를 Prometheus 가 가져갈 때 쓰는 Bearer 토큰. 비어 있으면 staff 로그인 사용자만 볼 수 있다
+REQUEST_METRICS_TOKEN = os.environ.get('REQUEST_METRICS_TOKEN', '')
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'account.instrumentation.TimedDjangoTemplates' if REQUEST_METRICS_ENABLED else 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -77,15 +85,74 @@ WSGI_APPLICATION = 'theprepared_ac.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql_psycopg2',
+        'ENGINE': 'django.db.backends.postgresql',
         'NAME': os.environ.get('POSTGRES_DB_A', 'account_db'), # docker-compose.yml의 POSTGRES_DB_A 사용
         'USER': os.environ.get('POSTGRES_USER', 'user'),
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD', 'password'),
         'HOST': os.environ.get('POSTGRES_HOST', 'postgres_db'), # docker-compose.yml의 postgres_db 서비스 이름
-        'PORT': '5432',
+        'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+        # 요청마다 새로 연결하지 않고 워커별 연결을 재사용 (초). 0 이면 요청마다 연결, 'None' 이면 무기한
+        'CONN_MAX_AGE': None if os.environ.get('DB_CONN_MAX_AGE') == 'None' else int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        # 재사용 전에 연결이 살아 있는지 확인 (DB 재시작 후 첫 요청 오류 방지)
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', '1') == '1',
+        # PgBouncer transaction pooling 뒤에서는 서버 측 커서(iterator)를 끈다
+        'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('DB_DISABLE_SERVER_SIDE_CURSORS', '0') == '1',
+        'OPTIONS': {
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5)),
+        },
+    }
+}
+
+
+# Cache
+# 리포트 캐시 등에 사용. 기본은 프로세스 내 locmem 이며 DJANGO_CACHE_BACKEND=file|redis 로 바꿀 수 있다.
+# 캐시 무효화는 DB 의 LedgerVersion 으로 판단하므로 locmem 을 여러 워커에서 써도 오래된 결과를 보여주지 않는다.
+
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'theprepared-ac'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', '/tmp/theprepared_ac_cache'),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),  # redis 패키지 필요
+}
+_cache_backend, _cache_location = CACHE_BACKENDS[os.environ.get('DJANGO_CACHE_BACKEND', 'locmem')]
+
+CACHES = {
+    'default': {
+        'BACKEND': _cache_backend,
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', _cache_location),
     }
 }
 
+REPORT_CACHE_ALIAS = 'default'
+REPORT_CACHE_TIMEOUT = int(os.environ.get('REPORT_CACHE_TIMEOUT', 60 * 60))
+# async 리포트 뷰의 집계 쿼리를 별도 스레드/DB 연결에서 동시에 실행 (ASGI 모드에서 켬)
+REPORT_PARALLEL_QUERIES = os.environ.get('REPORT_PARALLEL_QUERIES', '0') == '1'
+
+# 워커들이 함께 쓰는 캐시인지 (locmem 은 워커마다 따로라 다른 워커의 로그아웃/비밀번호 변경을 알 수 없다)
+_shared_cache = _cache_backend != CACHE_BACKENDS['locmem'][0]
+
+
+# Sessions / Authentication
+# DJANGO_SESSION_ENGINE=db|cached_db|signed_cookies. 기본은 공유 캐시면 cached_db, 아니면 db.
+# - cached_db: 세션을 캐시에서 먼저 읽어 요청마다의 django_session 조회를 없앤다 (쓰기는 DB 에도 한다)
+# - signed_cookies: 세션을 서명된 쿠키에 담아 DB 를 쓰지 않는다. 로그아웃해도 탈취된 쿠키는 만료 전까지 유효하다
+# 만료된 세션 행은 purge_sessions 명령으로 나눠서 지운다.
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_ENGINES[os.environ.get('DJANGO_SESSION_ENGINE', 'cached_db' if _shared_cache else 'db')]
+
+# 로그인한 사용자 조회(auth_user)를 캐시 (초, 0 이면 끔). 기본은 공유 캐시면 300초, 아니면 끔.
+# ModelBackend 는 이미 발급된 세션(백엔드 경로가 세션에 저장된다)을 위해 남겨 둔다.
+AUTHENTICATION_BACKENDS = [
+    'account.auth.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+AUTH_USER_CACHE_ALIAS = 'default'
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', 300 if _shared_cache else 0))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -129,4 +196,16 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-LOGIN_URL = 'account:login'
\ No newline at end of file
+LOGIN_URL = 'account:login'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # 요청 측정 로그는 JSON 한 줄씩 출력 (gunicorn errorlog 와 같은 stderr)
+        'account.metrics': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
\ No newline at end of file